@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import logging
+from typing import List, Type, TypeVar
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from app.schemas.bulk import BulkRow
+
+logger = logging.getLogger("app")
+
+ItemType = TypeVar("ItemType", bound=BaseModel)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+MAX_BULK_ROWS = 100_000
+
+
+def _validate_row(model: Type[ItemType], index: int, raw) -> BulkRow[ItemType]:
+    try:
+        return BulkRow(index=index, item=model.model_validate(raw))
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+        return BulkRow(index=index, error=errors or str(e))
+
+
+def _check_size(count: int) -> None:
+    if count > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"Bulk payload exceeds the limit of {MAX_BULK_ROWS} rows.")
+
+
+async def _read_ndjson(request: Request, model: Type[ItemType]) -> List[BulkRow[ItemType]]:
+    """Parses the body line by line while it streams in, so it is never held in memory whole."""
+    rows: List[BulkRow[ItemType]] = []
+    buffer = b""
+
+    def consume(line: bytes) -> None:
+        line = line.strip()
+        if not line:
+            return
+        index = len(rows)
+        _check_size(index + 1)
+        try:
+            rows.append(_validate_row(model, index, json.loads(line)))
+        except json.JSONDecodeError as e:
+            rows.append(BulkRow(index=index, error=f"Invalid JSON: {e.msg}"))
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            consume(line)
+    consume(buffer)
+    return rows
+
+
+async def _read_csv(request: Request, model: Type[ItemType]) -> List[BulkRow[ItemType]]:
+    """
+    Parses a CSV body whose header row names the model's fields. Empty cells count as
+    missing, so optional fields fall back to their defaults.
+    """
+    try:
+        text = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV body must be UTF-8 encoded.")
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    rows: List[BulkRow[ItemType]] = []
+    try:
+        for index, record in enumerate(reader):
+            _check_size(index + 1)
+            if None in record:
+                rows.append(BulkRow(index=index, error=f"Row has more cells than the {len(reader.fieldnames or ())} header columns."))
+                continue
+            rows.append(_validate_row(model, index, {field: value for field, value in record.items() if value not in ("", None)}))
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV body (line {reader.line_num}): {e}")
+    return rows
+
+
+async def parse_bulk_body(request: Request, model: Type[ItemType]) -> List[BulkRow[ItemType]]:
+    """
+    Reads a bulk payload, either a JSON array, NDJSON (one JSON object per line) or CSV
+    with a header row, depending on the Content-Type. Rows are validated one by one, so
+    a bad row is reported in its result instead of rejecting the whole batch.
+
+    Raises:
+        HTTPException (status_code=400): If the body is not a JSON array or is malformed (JSON or CSV).
+        HTTPException (status_code=413): If the payload has more than MAX_BULK_ROWS rows.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        rows = await _read_ndjson(request, model)
+    elif content_type in CSV_MEDIA_TYPES:
+        rows = await _read_csv(request, model)
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e.msg}")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Bulk payload must be a JSON array, NDJSON or CSV.")
+        _check_size(len(payload))
+        rows = [_validate_row(model, index, raw) for index, raw in enumerate(payload)]
+
+    logger.debug(f"Parsed bulk payload of {len(rows)} rows ({content_type or 'unspecified content type'})")
+    return rows
+
+
+def bulk_request_body(model: Type[BaseModel]) -> dict:
+    """OpenAPI request body for routes that read a bulk payload of `model` items from the raw request."""
+    array_schema = {"type": "array", "items": model.model_json_schema()}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": array_schema},
+                "application/x-ndjson": {"schema": model.model_json_schema()},
+                "text/csv": {"schema": {"type": "string", "description": f"Header row with the fields of {model.__name__}, then one row per item."}},
+            },
+        }
+    }
@@ -0,0 +1,41 @@
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar, Union
+from fastapi import Request, Response
+from pydantic import BaseModel
+from app.cache.result_cache import result_cache
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def cached_json_response(
+    request: Request,
+    key: Hashable,
+    produce: Callable[[], Awaitable[ModelType]],
+    immutable: Callable[[ModelType], bool] = lambda _: True,
+) -> Union[Response, ModelType]:
+    """
+    Serves an immutable result from the result cache as pre-serialized JSON with a strong
+    ETag, answering 304 Not Modified when the client already holds that version.
+
+    On a miss `produce` runs as usual; its result is cached only if `immutable` says it can
+    never change again, otherwise it is returned as is and the route serializes it normally.
+    """
+    entry = result_cache.get(key)
+    if entry is None:
+        result = await produce()
+        if not immutable(result):
+            return result
+        entry = result_cache.put(key, result.model_dump_json().encode())
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        result_cache.record_not_modified()
+        return Response(status_code=304, headers={"ETag": entry.etag})
+    return Response(content=entry.body, media_type="application/json", headers={"ETag": entry.etag})
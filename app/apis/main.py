@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.apis.routes import participant_routes, lottery_routes, ballot_routes, winner_ballots_routes
+from app.apis.routes import participant_routes, lottery_routes, ballot_routes, winner_ballots_routes, metrics_routes
 
 main_router = APIRouter(prefix="/api/v1", tags=["lottery"])
 
@@ -8,3 +8,4 @@ main_router.include_router(participant_routes.router)
 main_router.include_router(lottery_routes.router)
 main_router.include_router(ballot_routes.router)
 main_router.include_router(winner_ballots_routes.router)
+main_router.include_router(metrics_routes.router)
@@ -0,0 +1,53 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from app.apis.serialization import json_response
+from app.schemas.pagination import Page
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    limit: int
+    after: Optional[int] = None
+
+
+def encode_cursor(key: int) -> str:
+    """Opaque cursor for the key of the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Raises:
+        HTTPException (status_code=400): If the cursor was not produced by encode_cursor.
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        key = None
+    if not isinstance(key, int) or isinstance(key, bool):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+    return key
+
+
+async def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"),
+    after: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+) -> PageParams:
+    """Dependency reading the keyset pagination query parameters of list endpoints."""
+    return PageParams(limit=limit, after=decode_cursor(after) if after else None)
+
+
+def paged_response(page: Page) -> Response:
+    """
+    Returns the page items (RowDicts, see app.schemas.rows) as a plain JSON array, encoded
+    in one pass, and advertises the next page's cursor in the X-Next-Cursor header.
+    """
+    headers = {NEXT_CURSOR_HEADER: encode_cursor(page.next_key)} if page.next_key is not None else None
+    return json_response(page.items, headers=headers)
@@ -1,46 +1,94 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from typing import List
 
-from app.services.ballot_service import BallotService
-from app.schemas.ballots import (BallotResponse, BallotCreate)
+from app.services.ballot_service import BallotService, get_ballot_service_provider, get_ballot_read_service_provider
+from app.schemas.ballots import (BallotResponse, BallotCreate, BallotBulkItem, BallotBulkResponse)
+from app.schemas.bulk import BulkRow
+from app.apis.bulk_payload import parse_bulk_body, bulk_request_body
+from app.apis.pagination import PageParams, page_params, paged_response
+from app.apis.streaming import NDJSON_RESPONSE, ndjson_response, stream_requested
 
 router = APIRouter()
 
+async def read_bulk_ballots(request: Request) -> List[BulkRow[BallotBulkItem]]:
+    return await parse_bulk_body(request, BallotBulkItem)
+
+# Registered before "/ballot/{user_id}" so "bulk" is not matched as a user ID
+@router.post("/ballot/bulk",
+             response_model=BallotBulkResponse,
+             summary="Create many ballots in one request",
+             openapi_extra=bulk_request_body(BallotBulkItem))
+async def create_ballots_bulk(
+    rows: List[BulkRow[BallotBulkItem]] = Depends(read_bulk_ballots),
+    service: BallotService = Depends(get_ballot_service_provider),
+):
+    """
+    Registers a batch of ballots sent as a JSON array or NDJSON (`Content-Type: application/x-ndjson`),
+    each row with a `user_id` and an optional `lottery_date`.
+    Returns a result per row; rows that fail are reported without rejecting the batch.
+    """
+    return await service.create_ballots_bulk(rows)
+
 @router.post("/ballot/{user_id}", 
              response_model=BallotResponse,
              status_code=201,
              summary="Create a new ballot")
-def create_ballot(
+async def create_ballot(
     user_id: int,
-    service: BallotService = Depends(BallotService),
+    service: BallotService = Depends(get_ballot_service_provider),
 ):
     """
     Registers a new ballot. Raises 400 if already exists.
     """
-    return service.create_ballot(user_id=user_id)
+    return await service.create_ballot(user_id=user_id)
 
 @router.post("/ballot", 
              response_model=BallotResponse,
              status_code=201,
              summary="Create a new ballot with a specific expiry date")
-def create_ballot_with_expiry_date(
+async def create_ballot_with_expiry_date(
     req : BallotCreate,
-    service: BallotService = Depends(BallotService),
+    service: BallotService = Depends(get_ballot_service_provider),
 ):
     """
     Registers a new ballot. Raises 400 if already exists.
     """
-    return service.create_ballot_with_date(req)
+    return await service.create_ballot_with_date(req)
 
 @router.get("/ballot/{user_id}",
              response_model=List[BallotResponse],
+             responses=NDJSON_RESPONSE,
              summary="List of ballots per user")
-def list_ballots_by_user(
+async def list_ballots_by_user(
     user_id: int,
-    service: BallotService = Depends(BallotService),
+    page: PageParams = Depends(page_params),
+    stream: bool = Depends(stream_requested),
+    service: BallotService = Depends(get_ballot_read_service_provider),
+):
+    """
+    Lists Ballots by UserID one page at a time, ordered by ballot ID. Raises 404 if the user has no ballots.
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `?stream=true` or `Accept: application/x-ndjson`, every ballot of the user is streamed as NDJSON instead.
+    """
+    if stream:
+        return ndjson_response(lambda session: BallotService.for_session(session).stream_ballots_by_user(user_id))
+    return paged_response(await service.list_ballots_by_user(user_id=user_id, limit=page.limit, after=page.after))
+
+@router.get("/ballot/lottery/{lottery_id}",
+             response_model=List[BallotResponse],
+             responses=NDJSON_RESPONSE,
+             summary="List of ballots per lottery")
+async def list_ballots_by_lottery(
+    lottery_id: int,
+    page: PageParams = Depends(page_params),
+    stream: bool = Depends(stream_requested),
+    service: BallotService = Depends(get_ballot_read_service_provider),
 ):
     """
-    Lists Ballots by UserID. Raises 404 if list is empty.
+    Lists the ballots of a lottery one page at a time, ordered by ballot ID.
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `?stream=true` or `Accept: application/x-ndjson`, every ballot of the lottery is streamed as NDJSON instead.
     """
-    
-    return service.list_ballots_by_user(user_id=user_id)
\ No newline at end of file
+    if stream:
+        return ndjson_response(lambda session: BallotService.for_session(session).stream_ballots_by_lottery(lottery_id))
+    return paged_response(await service.list_ballots_by_lottery(lottery_id=lottery_id, limit=page.limit, after=page.after))
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from datetime import date
 from typing import List, Optional
 
-from app.services.lottery_service import LotteryService
+from app.services.lottery_service import LotteryService, get_lottery_service_provider, get_lottery_read_service_provider
 from app.schemas.ballots import (BallotResponse)
 from app.schemas.winning_ballot import (WinningBallotResponse)
-from app.schemas.lottery import LotteryResponse,CreateLotteryRequest
+from app.schemas.lottery import LotteryResponse,CreateLotteryRequest, CatchUpDrawResponse
 from app.services.lottery_service import LotteryAlreadyExistsError,LotteryServiceError, LotteryNotFoundError
+from app.services.catch_up_service import CatchUpDrawService, DEFAULT_BATCH_SIZE, DEFAULT_WORKERS, get_catch_up_service_provider
+from app.apis.serialization import json_response
+from app.apis.pagination import PageParams, page_params, paged_response
+from app.apis.streaming import NDJSON_RESPONSE, ndjson_response, stream_requested
+from app.apis.http_cache import cached_json_response
 import logging 
 
 logger = logging.getLogger("app")
@@ -17,9 +22,9 @@ router = APIRouter()
              response_model=LotteryResponse,
              status_code=201,
              summary="Create a new lottery")
-def create_lottery(
+async def create_lottery(
     payload: CreateLotteryRequest,
-    service: LotteryService = Depends(LotteryService),
+    service: LotteryService = Depends(get_lottery_service_provider),
 ):
     """
     Creates a new lottery for the specified date.
@@ -32,7 +37,7 @@ def create_lottery(
     """
     try:
         logger.info(f"API: Attempting to create lottery for date: {payload.target_date}")
-        lottery = service.create_lottery(target_date=payload.target_date)
+        lottery = await service.create_lottery(target_date=payload.target_date)
         return lottery
     except LotteryAlreadyExistsError as e:
         logger.warning(f"API Error: {str(e)}")
@@ -44,50 +49,76 @@ def create_lottery(
 @router.post("/lottery/close",
              response_model=WinningBallotResponse,
              summary="Close lottery and Draw Winner Ballot")
-def close_lottery_and_draw(
-    service: LotteryService = Depends(LotteryService),
+async def close_lottery_and_draw(
+    service: LotteryService = Depends(get_lottery_service_provider),
 ):
     """
     Closes lottery and Draws winner. Raises 400 if already exists.
     """
-    return service.close_lottery_and_draw()
+    return await service.close_lottery_and_draw()
+
+@router.post("/lottery/close/catch-up",
+             response_model=CatchUpDrawResponse,
+             summary="Close and draw every overdue lottery")
+async def catch_up_overdue_lotteries(
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=500, description="Lotteries fetched and drawn per batch"),
+    workers: int = Query(DEFAULT_WORKERS, ge=1, le=16, description="Lotteries drawn concurrently"),
+    service: CatchUpDrawService = Depends(get_catch_up_service_provider),
+):
+    """
+    Closes and draws all open lotteries dated before today, e.g. after a missed nightly run.
+    Returns a per-lottery report with status, duration and ballot throughput.
+    """
+    return await service.draw_overdue_lotteries(batch_size=batch_size, workers=workers)
 
 @router.get("/lottery",
              response_model=List[LotteryResponse],
+             responses=NDJSON_RESPONSE,
              summary="List all lotteries")
-def list_all_lotteries(
-    service: LotteryService = Depends(LotteryService),
+async def list_all_lotteries(
+    from_date: Optional[date] = Query(None, alias="from", description="Only lotteries dated on or after this day"),
+    to_date: Optional[date] = Query(None, alias="to", description="Only lotteries dated on or before this day"),
+    page: PageParams = Depends(page_params),
+    stream: bool = Depends(stream_requested),
+    service: LotteryService = Depends(get_lottery_read_service_provider),
 ):
     """
-    Retrieves a list of all lotteries.
+    Retrieves lotteries one page at a time, ordered by lottery ID, optionally within a date range (`from`, `to`).
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `?stream=true` or `Accept: application/x-ndjson`, every matching lottery is streamed as NDJSON instead.
     """
-    logger.debug("API: Fetching all lotteries.")
-    return service.get_all_lotteries()
+    if stream:
+        return ndjson_response(
+            lambda session: LotteryService.for_session(session).stream_all_lotteries(from_date=from_date, to_date=to_date)
+        )
+    logger.debug("API: Fetching a page of lotteries.")
+    lotteries = await service.get_all_lotteries(limit=page.limit, after=page.after, from_date=from_date, to_date=to_date)
+    return paged_response(lotteries)
 
 @router.get("/lottery/open",
              response_model=List[LotteryResponse],
              summary="List all open lotteries")
-def list_open_lotteries(
-    service: LotteryService = Depends(LotteryService),
+async def list_open_lotteries(
+    service: LotteryService = Depends(get_lottery_read_service_provider),
 ):
     """
     Retrieves a list of all lotteries that are currently open (not closed).
     """
     logger.debug("API: Fetching all open lotteries.")
-    return service.get_open_lotteries()
+    return json_response(await service.get_open_lotteries())
 
 @router.get("/lottery/active-today",
             response_model=Optional[LotteryResponse],
             summary="Get today's active lottery")
-def get_todays_active_lottery(
-    service: LotteryService = Depends(LotteryService),
+async def get_todays_active_lottery(
+    service: LotteryService = Depends(get_lottery_read_service_provider),
 ):
     """
     Retrieves the active (open) lottery for the current date.
     Returns the lottery details if found and open, otherwise returns null/None.
     """
     logger.debug("API: Fetching active lottery for today.")
-    lottery = service.get_active_lottery_for_today()
+    lottery = await service.get_active_lottery_for_today()
     if not lottery:
         logger.info("API: No active lottery found for today.")
     return lottery
@@ -95,26 +126,30 @@ def get_todays_active_lottery(
 @router.get("/lottery/{lottery_id}",
              response_model=LotteryResponse,
              summary="Get a lottery by its ID")
-def get_lottery(
+async def get_lottery(
     lottery_id: int,
-    service: LotteryService = Depends(LotteryService),
+    request: Request,
+    service: LotteryService = Depends(get_lottery_read_service_provider),
 ):
     """
     Retrieves a specific lottery by its unique ID.
+    A closed lottery never changes again, so it is cached and served with an ETag (304 on If-None-Match);
+    open lotteries are always read from the database.
 
     Raises:
     - `404 Not Found`: If the lottery with the given ID does not exist.
     """
     logger.debug(f"API: Fetching lottery by ID: {lottery_id}")
-    lottery = service.get_lottery(lottery_id)
-    return lottery
+    return await cached_json_response(
+        request, ("lottery", lottery_id), lambda: service.get_lottery(lottery_id), immutable=lambda lottery: lottery.closed
+    )
 
 @router.get("/lottery/by-date/{target_date}",
              response_model=LotteryResponse,
              summary="Get a lottery by its date")
-def get_lottery_by_date(
+async def get_lottery_by_date(
     target_date: date,
-    service: LotteryService = Depends(LotteryService)
+    service: LotteryService = Depends(get_lottery_read_service_provider)
 ):
     """
     Retrieves a specific lottery by its date.
@@ -123,6 +158,6 @@ def get_lottery_by_date(
     - `404 Not Found`: If no lottery exists for the given date.
     """
     logger.debug(f"API: Fetching lottery by date: {target_date}")
-    lottery = service.get_lottery_by_target_date(target_date)
+    lottery = await service.get_lottery_by_target_date(target_date)
     return lottery
 
@@ -0,0 +1,31 @@
+from typing import List
+from fastapi import APIRouter
+
+from app.cache.result_cache import result_cache
+from app.db.database import db
+from app.schemas.metrics import PoolStats, ResultCacheStats
+
+router = APIRouter()
+
+@router.get("/metrics/cache",
+             response_model=ResultCacheStats,
+             summary="Result cache counters")
+async def get_result_cache_stats():
+    """
+    Hit/miss counters and size of the in-process cache of immutable results
+    (closed lotteries and winners). Counters are per process.
+    """
+    return result_cache.stats()
+
+
+@router.get("/metrics/pool",
+             response_model=List[PoolStats],
+             summary="Connection pool telemetry")
+async def get_pool_stats():
+    """
+    One entry per connection pool, the primary's first, then each read replica's:
+    checked-out connections and overflow, checkout wait histogram and timeouts,
+    connection ages, and connections held longer than the leak threshold.
+    Counters are per process.
+    """
+    return db.pool_stats()
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from datetime import date
 from typing import List, Optional
 import logging
-from app.services.participant_service import ParticipantService
-from app.schemas.participant import ( ParticipantCreate, ParticipantResponse )
+from app.services.participant_service import ParticipantService, get_participant_service_provider, get_participant_read_service_provider
+from app.apis.bulk_payload import parse_bulk_body, bulk_request_body
+from app.apis.pagination import PageParams, page_params, paged_response
+from app.apis.streaming import NDJSON_RESPONSE, ndjson_response, stream_requested
+from app.schemas.participant import ( ParticipantCreate, ParticipantResponse, ParticipantBulkResponse )
+from app.schemas.bulk import BulkRow
 from app.schemas.ballots import (BallotCreate, BallotResponse)
 
 logger = logging.getLogger("app")
@@ -11,43 +15,68 @@ logger = logging.getLogger("app")
 
 router = APIRouter()
 
+async def read_bulk_participants(request: Request) -> List[BulkRow[ParticipantCreate]]:
+    return await parse_bulk_body(request, ParticipantCreate)
+
+@router.post("/participant/bulk",
+             response_model=ParticipantBulkResponse,
+             summary="Register many participants in one request",
+             openapi_extra=bulk_request_body(ParticipantCreate))
+async def register_participants_bulk(
+    rows: List[BulkRow[ParticipantCreate]] = Depends(read_bulk_participants),
+    service: ParticipantService = Depends(get_participant_service_provider),
+):
+    """
+    Registers a batch of participants sent as a JSON array, NDJSON (`Content-Type: application/x-ndjson`)
+    or CSV with a header row (`Content-Type: text/csv`), each row with a `first_name`, `last_name` and `birth_date`.
+    Returns a result per row: `created`, `duplicate` (first name already registered or repeated in the batch) or `failed`.
+    """
+    return await service.register_participants_bulk(rows)
+
 @router.post("/participant",
              response_model=ParticipantResponse,
              status_code=201,
              summary="Create a new participant")
-def create_ballot(
+async def create_ballot(
     participant_in: ParticipantCreate,
-    service: ParticipantService = Depends(ParticipantService),
+    service: ParticipantService = Depends(get_participant_service_provider),
 ):
     """
     Registers a new participant. Raises 400 if already exists.
     """
-    return service.register_participant(participant_in)
+    return await service.register_participant(participant_in)
 
 @router.get("/participant",
              response_model=List[ParticipantResponse],
-             summary="Get all participants")
-def get_participants_list(
-    service: ParticipantService = Depends(ParticipantService)
+             responses=NDJSON_RESPONSE,
+             summary="List participants")
+async def get_participants_list(
+    page: PageParams = Depends(page_params),
+    stream: bool = Depends(stream_requested),
+    service: ParticipantService = Depends(get_participant_read_service_provider)
 ):
     """
-    Retrieve all participants.
+    Retrieve participants one page at a time, ordered by user ID.
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `?stream=true` or `Accept: application/x-ndjson`, every participant is streamed as NDJSON instead.
     """
-    participants = service.list_all_participants()
-    return participants
+    if stream:
+        return ndjson_response(lambda session: ParticipantService.for_session(session).stream_all_participants())
+    participants = await service.list_all_participants(limit=page.limit, after=page.after)
+    return paged_response(participants)
 
 
 @router.get("/participant/{user_id}", 
             response_model=Optional[ParticipantResponse], 
             summary="Get a Participant by its ID")
-def get_participant_by_id(
+async def get_participant_by_id(
     user_id : int,
-    service: ParticipantService = Depends(ParticipantService)
+    service: ParticipantService = Depends(get_participant_read_service_provider)
 ):
     """
     Retrieve participant by id.
     """
-    participants = service.get_participant_by_id(user_id=user_id)
+    participants = await service.get_participant_by_id(user_id=user_id)
     return participants
 
 
@@ -1,9 +1,12 @@
 from app.models.winning_ballots import WinningBallot
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from datetime import date
 from typing import List
 
-from app.services.winner_service import WinnerService
+from app.services.winner_service import WinnerService, get_winner_read_service_provider
+from app.apis.pagination import PageParams, page_params, paged_response
+from app.apis.streaming import NDJSON_RESPONSE, ndjson_response, stream_requested
+from app.apis.http_cache import cached_json_response
 from app.schemas.ballots import (BallotResponse)
 from app.schemas.winning_ballot import (WinningBallotResponse)
 
@@ -12,35 +15,50 @@ router = APIRouter()
 
 @router.get("/winner-ballot", 
              response_model=List[WinningBallotResponse],
+             responses=NDJSON_RESPONSE,
              summary="Get all winning ballots")
-def get_all_winners(
-    service: WinnerService = Depends(WinnerService),
+async def get_all_winners(
+    page: PageParams = Depends(page_params),
+    stream: bool = Depends(stream_requested),
+    service: WinnerService = Depends(get_winner_read_service_provider),
 ):
     """
-    Get all winning ballots. 
+    Get winning ballots one page at a time, ordered by lottery ID.
+    The cursor of the next page, if any, is returned in the `X-Next-Cursor` header.
+    With `?stream=true` or `Accept: application/x-ndjson`, every winning ballot is streamed as NDJSON instead.
     """
-    return service.list_all_winning_ballots()
+    if stream:
+        return ndjson_response(lambda session: WinnerService.for_session(session).stream_all_winning_ballots())
+    return paged_response(await service.list_all_winning_ballots(limit=page.limit, after=page.after))
 
 @router.get("/winner-ballot/by-date",
              response_model=WinningBallotResponse,
              summary="Get a winner by a given winning date")
-def get_winner_by_winning_date(
+async def get_winner_by_winning_date(
     winning_date : date,
-    service: WinnerService = Depends(WinnerService),
+    request: Request,
+    service: WinnerService = Depends(get_winner_read_service_provider),
 ):
     """
     Get a winning ballot by Date. Raises 400 if already exists.
+    Winners never change, so the result is cached and served with an ETag (304 on If-None-Match).
     """
-    return service.get_winner_by_winning_date(winning_date)
+    return await cached_json_response(
+        request, ("winner-by-date", winning_date), lambda: service.get_winner_by_winning_date(winning_date)
+    )
 
 @router.get("/winner-ballot/{lottery_id}",
              response_model=WinningBallotResponse,
              summary="Get a winner by a given winning lottery ID")
-def get_winner_by_lottery_id(
+async def get_winner_by_lottery_id(
     lottery_id : int,
-    service: WinnerService = Depends(WinnerService),
+    request: Request,
+    service: WinnerService = Depends(get_winner_read_service_provider),
 ):
     """
     Get a winning lottery by ID. Raises 400 if already exists.
+    Winners never change, so the result is cached and served with an ETag (304 on If-None-Match).
     """
-    return service.get_winner_by_lottery_id(lottery_id)
\ No newline at end of file
+    return await cached_json_response(
+        request, ("winner-by-lottery", lottery_id), lambda: service.get_winner_by_lottery_id(lottery_id)
+    )
\ No newline at end of file
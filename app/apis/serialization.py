@@ -0,0 +1,20 @@
+from typing import Any, Mapping, Optional
+import orjson
+from fastapi import Response
+
+
+def json_bytes(content: Any) -> bytes:
+    """
+    Encodes plain data (dicts, lists, dates, ...) with orjson. The output matches FastAPI's
+    own encoding of the response models: compact separators, UTF-8, ISO dates.
+    """
+    return orjson.dumps(content)
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    A JSON response written straight from plain data. Returning a Response makes FastAPI
+    skip the response_model validation and serialization, which stays declared on the
+    route for the OpenAPI schema only.
+    """
+    return Response(content=json_bytes(content), media_type="application/json", headers=headers)
@@ -0,0 +1,59 @@
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Union
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.apis.bulk_payload import NDJSON_MEDIA_TYPES
+from app.apis.serialization import json_bytes
+from app.schemas.rows import RowDict
+from app.db.database import db
+
+logger = logging.getLogger("app")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Lines buffered per write: one write per server-side cursor chunk instead of one per row
+LINES_PER_WRITE = 1000
+
+NDJSON_RESPONSE: Dict[Union[int, str], Dict[str, Any]] = {
+    200: {
+        "description": "A JSON array page, or every row as NDJSON when streaming is requested.",
+        "content": {NDJSON_MEDIA_TYPE: {}},
+    }
+}
+
+
+async def stream_requested(
+    request: Request,
+    stream: bool = Query(False, description="Stream every row as NDJSON instead of returning one page"),
+) -> bool:
+    """Dependency: True if the client asked for NDJSON, via ?stream=true or the Accept header."""
+    accept = request.headers.get("accept", "").lower()
+    return stream or any(media_type in accept for media_type in NDJSON_MEDIA_TYPES)
+
+
+def ndjson_response(produce: Callable[[AsyncSession], AsyncIterable[RowDict]]) -> StreamingResponse:
+    """
+    Streams the items produced by `produce` as NDJSON, one JSON object per line.
+
+    The request's session is closed before a streaming body starts to be sent, so
+    `produce` gets a dedicated read session (a replica when configured) that lives as
+    long as the stream. Items are
+    written as they come off the server-side cursor: the first bytes go out before the
+    query has finished and memory stays bounded by one chunk of rows.
+    """
+    async def body() -> AsyncIterator[bytes]:
+        async with db.read_session_scope() as session:
+            lines = []
+            count = 0
+            async for item in produce(session):
+                lines.append(json_bytes(item))
+                if len(lines) >= LINES_PER_WRITE:
+                    count += len(lines)
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                count += len(lines)
+                yield b"\n".join(lines) + b"\n"
+            logger.debug(f"Streamed {count} NDJSON rows")
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,45 @@
+import logging
+import threading
+from datetime import date
+from typing import Dict, Optional
+
+logger = logging.getLogger("app")
+
+
+class LotteryIdCache:
+    """
+    Per-process map of lottery date -> lottery_id for open lotteries.
+
+    A lottery's id never changes once its row exists, so the ballot path only needs to
+    look it up once per day. The whole map is dropped when the calendar date changes,
+    since the nightly close runs right after, and a date is evicted as soon as this
+    process closes its lottery. Closed lotteries are never cached.
+    """
+    def __init__(self):
+        self._ids: Dict[date, int] = {}
+        self._day: date = date.today()
+        self._lock = threading.Lock()
+
+    def _roll_day(self) -> None:
+        today = date.today()
+        if today != self._day:
+            logger.debug(f"Lottery id cache: date changed to {today}, dropping {len(self._ids)} entries")
+            self._ids.clear()
+            self._day = today
+
+    def get(self, lottery_date: date) -> Optional[int]:
+        with self._lock:
+            self._roll_day()
+            return self._ids.get(lottery_date)
+
+    def put(self, lottery_date: date, lottery_id: int) -> None:
+        with self._lock:
+            self._roll_day()
+            self._ids[lottery_date] = lottery_id
+
+    def invalidate(self, lottery_date: date) -> None:
+        with self._lock:
+            self._ids.pop(lottery_date, None)
+
+
+lottery_id_cache = LotteryIdCache()
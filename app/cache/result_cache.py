@@ -0,0 +1,92 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+logger = logging.getLogger("app")
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    body: bytes
+    etag: str
+
+
+class ResultCache:
+    """
+    In-process LRU cache of pre-serialized JSON responses that can never change again
+    (closed lotteries and their winners), keyed by what identifies the result.
+
+    Bounded both by entry count (RESULT_CACHE_MAX_ENTRIES) and total body size
+    (RESULT_CACHE_MAX_BYTES); the least recently used entries are evicted first.
+    Nothing is ever invalidated, so only immutable results may be stored.
+    """
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        """Strong ETag: a digest of the exact response bytes."""
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def get(self, key: Hashable) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResult:
+        entry = CachedResult(body=body, etag=self.make_etag(body))
+        if len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+        return entry
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+            }
+
+
+result_cache = ResultCache(
+    max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+)
@@ -1,72 +1,231 @@
+import logging
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import ssl
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
+from app.db.pool import PoolMetrics, PoolSettings
+from app.db.query_stats import instrument_queries
+from app.db.replicas import ReplicaRouter, RecentWriters, read_from_primary
 
 # Load environment variables first
 load_dotenv()
 
+logger = logging.getLogger("app")
+
+# Async drivers DB_DRIVER can select: asyncpg (default) or psycopg (version 3)
+ASYNC_DRIVERS = ("asyncpg", "psycopg")
+
+
+def _async_url(url: str, driver: str) -> URL:
+    """URLs naming the default or psycopg2 driver are switched to `driver`; async drivers are kept."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgresql+psycopg2"):
+        parsed = parsed.set(drivername=f"postgresql+{driver}")
+    return parsed
+
+
+def _prepare_threshold(value: str) -> Optional[int]:
+    """DB_PREPARE_THRESHOLD: executions before psycopg prepares a statement; "none" never prepares."""
+    return None if value.lower() == "none" else int(value)
+
+
 class Database:
     def __init__(self):
         # Get database URL from environment variables
-        self.SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL") 
-        
-        if not self.SQLALCHEMY_DATABASE_URL:            
+        self.SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL")
+
+        if not self.SQLALCHEMY_DATABASE_URL:
             raise ValueError("DATABASE_URL not found in environment variables")
 
-        # SSL/TLS configuration
-        connect_args = self._get_ssl_config()
-        
+        # Driver for URLs that do not name an async one, and psycopg's prepared statements
+        self.driver = os.getenv("DB_DRIVER", "asyncpg").lower()
+        if self.driver not in ASYNC_DRIVERS:
+            raise ValueError(f"DB_DRIVER must be one of {ASYNC_DRIVERS}, got {self.driver!r}")
+        self.prepare_threshold = _prepare_threshold(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+
+        # Pool sizes and timeouts (DB_POOL_* variables); every pool reports to a PoolMetrics
+        self.pool_settings = PoolSettings.from_env()
+        self.pool_metrics: List[PoolMetrics] = []
+
         # Create engine
-        self.engine = create_engine(
-            self.SQLALCHEMY_DATABASE_URL,
-            pool_size=20,
-            max_overflow=30,
-            pool_recycle=3600,  # Recycle connections every hour
-            echo=False,  
-            connect_args=connect_args
+        # Async all the way down: a request waiting on the database does not hold a thread.
+        self.engine = self._create_engine("primary", self.SQLALCHEMY_DATABASE_URL)
+
+        # Optional read replicas, comma separated; reads fall back to the primary without them.
+        # pool_pre_ping: a replica that went away is detected at checkout, so the router can fail over.
+        replica_urls = [url.strip() for url in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if url.strip()]
+        self.replicas = ReplicaRouter(
+            [
+                self._create_engine(f"replica-{index}", url, pool_pre_ping=True)
+                for index, url in enumerate(replica_urls)
+            ],
+            retry_seconds=float(os.getenv("REPLICA_RETRY_SECONDS", "30")),
         )
-        
+        self.recent_writers = RecentWriters(window_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")))
+
         # Configure session factory
-        self.SessionLocal = sessionmaker(
-            autocommit=False,
+        # expire_on_commit=False: repositories load rows with INSERT/UPDATE ... RETURNING,
+        # expiring them on commit would trigger a second SELECT per write (and an implicit
+        # lazy load, which an AsyncSession refuses to do).
+        self.SessionLocal = async_sessionmaker(
             autoflush=False,
+            expire_on_commit=False,
             bind=self.engine
         )
+        # Read sessions are bound per call to a replica connection (or the primary engine)
+        self.ReadSessionLocal = async_sessionmaker(
+            autoflush=False,
+            expire_on_commit=False,
+        )
 
-    def _get_ssl_config(self):
-        """Configure SSL settings based on environment variables"""
-        connect_args = {}
-        
-        # Get SSL parameters from environment
+    def _create_engine(self, name: str, url: str, **options) -> AsyncEngine:
+        async_url = _async_url(url, self.driver)
+        engine = create_async_engine(
+            async_url,
+            echo=False,
+            connect_args=self._get_connect_args(async_url.get_driver_name()),
+            **self.pool_settings.engine_options(),
+            **options
+        )
+        metrics = PoolMetrics(name, leak_seconds=self.pool_settings.leak_seconds)
+        metrics.attach(engine)
+        self.pool_metrics.append(metrics)
+        # Statement count and time of the current request (Server-Timing, request log)
+        instrument_queries(engine)
+        return engine
+
+    def _get_connect_args(self, driver: str) -> dict:
+        """
+        Driver arguments. psycopg takes the libpq SSL keywords and prepares a statement once it
+        ran DB_PREPARE_THRESHOLD times (0: on first use, at the cost of a separate round-trip
+        to prepare it); asyncpg takes SSL as one `ssl`
+        argument and prepares every statement through its own statement cache.
+        """
+        if driver == "psycopg":
+            connect_args = self._get_libpq_ssl_config()
+            connect_args["prepare_threshold"] = self.prepare_threshold
+            return connect_args
+        return self._get_ssl_config()
+
+    @staticmethod
+    def _get_ssl_env():
+        """SSL parameters from the environment: (mode, root cert, cert, key)."""
         ssl_mode = os.getenv("SSL_MODE")
-        ssl_root_cert = os.getenv("SSL_ROOT_CERT")
-        ssl_cert = os.getenv("SSL_CERT")
-        ssl_key = os.getenv("SSL_KEY")
         env = os.getenv("ENV", "development")
 
         # Auto-enforce SSL in production if not explicitly configured
         if env == "production" and not ssl_mode:
             ssl_mode = "require"
+        return ssl_mode, os.getenv("SSL_ROOT_CERT"), os.getenv("SSL_CERT"), os.getenv("SSL_KEY")
+
+    def _get_libpq_ssl_config(self) -> dict:
+        """SSL settings as libpq connection keywords (psycopg)"""
+        ssl_mode, ssl_root_cert, ssl_cert, ssl_key = self._get_ssl_env()
+        keywords = {"sslmode": ssl_mode, "sslrootcert": ssl_root_cert, "sslcert": ssl_cert, "sslkey": ssl_key}
+        return {keyword: value for keyword, value in keywords.items() if value}
+
+    def _get_ssl_config(self):
+        """Configure SSL settings based on environment variables (asyncpg takes them as one `ssl` argument)"""
+        connect_args = {}
+
+        # Get SSL parameters from environment
+        ssl_mode, ssl_root_cert, ssl_cert, ssl_key = self._get_ssl_env()
 
         # Apply SSL configuration
         if ssl_mode:
-            connect_args["sslmode"] = ssl_mode
-            if ssl_root_cert:
-                connect_args["sslrootcert"] = ssl_root_cert
-            if ssl_cert:
-                connect_args["sslcert"] = ssl_cert
-            if ssl_key:
-                connect_args["sslkey"] = ssl_key
+            if ssl_root_cert or ssl_cert:
+                context = ssl.create_default_context(cafile=ssl_root_cert)
+                # Same checks as libpq: "require" verifies the CA only when a root cert is given,
+                # "verify-ca" skips the host name, "verify-full" checks both.
+                if ssl_mode == "verify-ca" or (ssl_mode == "require" and ssl_root_cert):
+                    context.check_hostname = False
+                elif ssl_mode != "verify-full":
+                    context.check_hostname = False
+                    context.verify_mode = ssl.CERT_NONE
+                if ssl_cert:
+                    context.load_cert_chain(ssl_cert, ssl_key)
+                connect_args["ssl"] = context
+            else:
+                connect_args["ssl"] = ssl_mode
 
         return connect_args
 
-    def get_db(self):
-        """Dependency for FastAPI or other frameworks"""
-        db = self.SessionLocal()
+    async def get_db(self):
+        """
+        Dependency for FastAPI or other frameworks.
+        Unit of work: the request's repositories share this session and only flush;
+        it commits once after the handler returns and rolls back if the handler raises.
+        """
+        async with self.SessionLocal() as db:
+            try:
+                yield db
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+    @asynccontextmanager
+    async def session_scope(self):
+        """Same unit of work as get_db, for code running outside a request (jobs, scripts, workers)."""
+        async with self.SessionLocal() as db:
+            try:
+                yield db
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+    async def get_read_db(self):
+        """
+        Dependency for read-only routes: a session on a read replica, picked round-robin.
+        Falls back to the primary when no replica is configured or reachable, and while the
+        client is inside its read-your-writes window. Nothing is written.
+        """
+        async with self.read_session_scope() as db:
+            yield db
+
+    @asynccontextmanager
+    async def read_session_scope(self):
+        """Same as get_read_db, for read-only work outside the request's dependencies (streamed responses)."""
+        connection = None if read_from_primary.get() else await self.replicas.connect()
+        db = self.ReadSessionLocal(bind=connection if connection is not None else self.engine)
         try:
             yield db
+            # End the read-only transaction with COMMIT, same effect as ROLLBACK here, because
+            # psycopg forgets every statement it prepared on the connection at a ROLLBACK
+            await db.commit()
         finally:
-            db.close()
+            await db.close()
+            if connection is not None:
+                await connection.close()
+
+    async def check_pool_budget(self) -> None:
+        """
+        At startup: checks, for the primary and each replica, that the pools of every process
+        together fit in that server's max_connections (see PoolSettings.check_budget).
+        """
+        for metrics in self.pool_metrics:
+            if metrics.engine is None:
+                continue
+            try:
+                async with metrics.engine.connect() as connection:
+                    server_max_connections = int((await connection.execute(text("SHOW max_connections"))).scalar())
+            except Exception as e:
+                logger.warning(f"Could not read max_connections of {metrics.name} to check the pool sizes: {e}")
+                continue
+            self.pool_settings.check_budget(metrics.name, server_max_connections)
+
+    def pool_stats(self) -> List[dict]:
+        """Telemetry of the primary's pool, then each replica's."""
+        return [metrics.stats() for metrics in self.pool_metrics]
+
+    async def dispose(self) -> None:
+        """Closes the pooled connections of the primary and the replicas (shutdown, end of a script)."""
+        await self.engine.dispose()
+        await self.replicas.dispose()
 
 db = Database()
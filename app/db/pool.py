@@ -0,0 +1,300 @@
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, cast
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger("app")
+
+# Set per request by the request logger: names who holds a checked-out connection in leak reports.
+# Unset (jobs, scripts), the asyncio task name is used instead.
+connection_holder: ContextVar[Optional[str]] = ContextVar("connection_holder", default=None)
+
+# Upper bounds, in milliseconds, of the checkout wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Held connections are checked for leaks at most this often
+LEAK_CHECK_INTERVAL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """
+    Sizes and timeouts of the connection pools, read from the environment.
+
+    DB_POOL_MODE=fixed (default) takes DB_POOL_SIZE and DB_MAX_OVERFLOW as they are.
+    DB_POOL_MODE=budget splits the connection budget given in the environment
+    (DB_MAX_CONNECTIONS minus DB_RESERVED_CONNECTIONS) between the processes sharing the
+    server (DB_POOL_PROCESSES, else WEB_CONCURRENCY, else 1): each process keeps half of
+    its share open and may overflow into the other half. The pools are built before any
+    connection is made, so the server's max_connections is only checked at startup
+    (check_budget), where a budget it cannot honour stops the service.
+    Replica pools get the same sizes and are checked against their own server.
+    """
+    mode: str
+    pool_size: int
+    max_overflow: int
+    timeout: float
+    recycle: int
+    leak_seconds: float
+    processes: int
+    max_connections: int
+    reserved_connections: int
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        processes = int(os.getenv("DB_POOL_PROCESSES") or os.getenv("WEB_CONCURRENCY") or "1")
+        max_connections = int(os.getenv("DB_MAX_CONNECTIONS", "100"))
+        reserved_connections = int(os.getenv("DB_RESERVED_CONNECTIONS", "10"))
+        mode = os.getenv("DB_POOL_MODE", "fixed").lower()
+        if mode == "budget":
+            share = max(1, (max_connections - reserved_connections) // max(1, processes))
+            pool_size = max(1, share // 2)
+            max_overflow = share - pool_size
+        elif mode == "fixed":
+            pool_size = int(os.getenv("DB_POOL_SIZE", "20"))
+            max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+        else:
+            raise ValueError(f"DB_POOL_MODE must be 'fixed' or 'budget', got {mode!r}")
+        return cls(
+            mode=mode,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+            leak_seconds=float(os.getenv("DB_POOL_LEAK_SECONDS", "60")),
+            processes=processes,
+            max_connections=max_connections,
+            reserved_connections=reserved_connections,
+        )
+
+    @property
+    def connections_per_process(self) -> int:
+        return self.pool_size + self.max_overflow
+
+    def engine_options(self) -> dict:
+        """Keyword arguments for create_async_engine."""
+        return {
+            "poolclass": InstrumentedPool,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout,
+            "pool_recycle": self.recycle,
+        }
+
+    def check_budget(self, name: str, server_max_connections: int) -> None:
+        """
+        Compares what every process filling its pool would open with what the server of pool
+        `name` accepts. Over budget, DB_POOL_MODE=budget raises ValueError (the budget in the
+        environment is wrong), DB_POOL_MODE=fixed only warns.
+        """
+        available = server_max_connections - self.reserved_connections
+        planned = self.connections_per_process * self.processes
+        if planned > available:
+            message = (
+                f"Connection pools of {name} may open {planned} connections ({self.processes} processes x "
+                f"{self.connections_per_process}) but the server allows {available} "
+                f"(max_connections={server_max_connections}, {self.reserved_connections} reserved)"
+            )
+            if self.mode == "budget":
+                raise ValueError(f"{message}; set DB_MAX_CONNECTIONS to at most {server_max_connections}")
+            logger.warning(
+                f"{message}; lower DB_POOL_SIZE/DB_MAX_OVERFLOW or set DB_POOL_MODE=budget "
+                f"with DB_MAX_CONNECTIONS={server_max_connections}"
+            )
+        elif self.mode == "budget" and server_max_connections != self.max_connections:
+            logger.info(
+                f"Pools sized for DB_MAX_CONNECTIONS={self.max_connections}, the server of {name} allows "
+                f"max_connections={server_max_connections}"
+            )
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports how long every checkout waited to its PoolMetrics."""
+    metrics: Optional["PoolMetrics"] = None
+    # Keep logging under sqlalchemy.pool: named after this module, the pool's own logs would go to the "app" logger
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "InstrumentedPool":
+        # dispose() swaps in a fresh pool; event listeners carry over, the metrics must too
+        pool = cast(InstrumentedPool, super().recreate())
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """
+    Telemetry of one engine's connection pool, fed by SQLAlchemy pool events: checkout
+    wait histogram and timeouts, connection opens/closes and ages, and a leak detector
+    that reports connections checked out for longer than `leak_seconds`.
+    Counters are per process.
+    """
+    def __init__(self, name: str, leak_seconds: float):
+        self.name = name
+        self.leak_seconds = leak_seconds
+        self.engine: Optional[AsyncEngine] = None
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.leaks = 0
+        # id(connection record) -> time the DBAPI connection was opened
+        self._opened_at: Dict[int, float] = {}
+        # id(connection record) -> (checkout time, holder, already reported as a leak)
+        self._held: Dict[int, Tuple[float, str, bool]] = {}
+        self._next_leak_check = 0.0
+        self._lock = threading.Lock()
+
+    def attach(self, engine: AsyncEngine) -> None:
+        pool = engine.sync_engine.pool
+        if isinstance(pool, InstrumentedPool):
+            pool.metrics = self
+        self.engine = engine
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "close", self._on_close)
+        event.listen(pool, "detach", self._on_detach)
+        event.listen(pool, "invalidate", self._on_invalidate)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        waited_ms = seconds * 1000
+        with self._lock:
+            self._wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, waited_ms)] += 1
+            self._wait_total_ms += waited_ms
+            self._wait_max_ms = max(self._wait_max_ms, waited_ms)
+            if timed_out:
+                self.timeouts += 1
+        if timed_out:
+            logger.warning(f"Pool {self.name}: no connection available after {seconds:.1f}s, checkout timed out")
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+            self._opened_at[id(connection_record)] = time.monotonic()
+
+    def _on_close(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            if self._opened_at.pop(id(connection_record), None) is not None:
+                self.closes += 1
+
+    def _on_detach(self, dbapi_connection, connection_record) -> None:
+        # A detached connection leaves the pool for good and is never checked in
+        self._on_close(dbapi_connection, connection_record)
+        with self._lock:
+            self._held.pop(id(connection_record), None)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        holder = connection_holder.get() or self._task_name()
+        now = time.monotonic()
+        with self._lock:
+            self.checkouts += 1
+            self._held[id(connection_record)] = (now, holder, False)
+        if now >= self._next_leak_check:
+            self.check_leaks()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            held = self._held.pop(id(connection_record), None)
+        if held is not None and held[2]:
+            logger.info(f"Pool {self.name}: connection held by {held[1]} returned after {time.monotonic() - held[0]:.1f}s")
+
+    @staticmethod
+    def _task_name() -> str:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return task.get_name() if task is not None else threading.current_thread().name
+
+    def check_leaks(self) -> List[dict]:
+        """Connections checked out for longer than leak_seconds; each is logged once as a possible leak."""
+        now = time.monotonic()
+        self._next_leak_check = now + LEAK_CHECK_INTERVAL_SECONDS
+        if self.leak_seconds <= 0:
+            return []
+        held_too_long, newly_found = [], []
+        with self._lock:
+            for key, (checked_out_at, holder, reported) in self._held.items():
+                held_seconds = now - checked_out_at
+                if held_seconds < self.leak_seconds:
+                    continue
+                held_too_long.append({"holder": holder, "held_s": round(held_seconds, 1)})
+                if not reported:
+                    self._held[key] = (checked_out_at, holder, True)
+                    self.leaks += 1
+                    newly_found.append((holder, held_seconds))
+        for holder, held_seconds in newly_found:
+            logger.warning(
+                f"Pool {self.name}: connection held by {holder} for {held_seconds:.0f}s "
+                f"(threshold {self.leak_seconds:.0f}s), possible leak"
+            )
+        return held_too_long
+
+    def stats(self) -> dict:
+        pool = self.engine.sync_engine.pool if self.engine is not None else None
+        if not isinstance(pool, QueuePool):
+            # Sizes and counters below only exist on queue pools
+            pool = None
+        held_too_long = self.check_leaks()
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - opened_at for opened_at in self._opened_at.values()]
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS_MS + ("+Inf",), self._wait_buckets):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            waits = sum(self._wait_buckets)
+            return {
+                "name": self.name,
+                "pool_size": pool.size() if pool is not None else 0,
+                "max_overflow": pool._max_overflow if pool is not None else 0,
+                "timeout_s": pool.timeout() if pool is not None else 0.0,
+                "checked_out": pool.checkedout() if pool is not None else 0,
+                "checked_in": pool.checkedin() if pool is not None else 0,
+                "overflow": max(0, pool.overflow()) if pool is not None else 0,
+                "connections": len(ages),
+                "oldest_connection_age_s": round(max(ages), 1) if ages else 0.0,
+                "mean_connection_age_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_ms": {
+                    "count": waits,
+                    "sum": round(self._wait_total_ms, 3),
+                    "max": round(self._wait_max_ms, 3),
+                    "buckets": buckets,
+                },
+                "leak_threshold_s": self.leak_seconds,
+                "leaks": self.leaks,
+                "held_too_long": held_too_long,
+            }
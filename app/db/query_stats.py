@@ -0,0 +1,77 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger("app")
+
+# A statement shape running more than this many times in one request is logged as a possible N+1 (0 disables)
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("DB_REPEATED_STATEMENT_THRESHOLD", "20"))
+
+# Characters of a repeated statement quoted in the warning
+STATEMENT_PREVIEW_CHARS = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """
+    Statements one request ran on any engine (primary or replica) and the time spent
+    in them, counted per statement shape. Parameters are sent bound, so the SQL text
+    is the shape: the same query with other values counts as a repeat.
+    """
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str) -> None:
+        self.statements += 1
+        self.shapes[statement] += 1
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing metric of the database work, e.g. db;dur=3.21;desc="5 statements"."""
+        plural = "" if self.statements == 1 else "s"
+        return f'db;dur={self.milliseconds:.2f};desc="{self.statements} statement{plural}"'
+
+    def warn_repeated(self, label: str, threshold: int = REPEATED_STATEMENT_THRESHOLD) -> None:
+        """Logs every statement shape that ran more than threshold times; usually a lazy load or a query in a loop."""
+        if threshold <= 0:
+            return
+        for statement, count in self.shapes.items():
+            if count > threshold:
+                preview = _WHITESPACE.sub(" ", statement).strip()[:STATEMENT_PREVIEW_CHARS]
+                logger.warning(f"{label} ran the same statement {count} times, possible N+1: {preview}")
+
+
+# Set per request by the request logger; unset (jobs, scripts), statements are not counted
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement)
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = query_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Counts the statements the engine runs, and their time, into the current request's QueryStats."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,98 @@
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger("app")
+
+# Set per request by the read routing middleware: True while the client is inside its
+# read-your-writes window, so its reads are served by the primary instead of a replica.
+read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+
+class ReplicaRouter:
+    """
+    Hands out connections to read replicas in round-robin order.
+
+    A replica that fails to connect is skipped for `retry_seconds`, then tried again;
+    when no replica is usable, connect() returns None and the caller falls back to the primary.
+    """
+    def __init__(self, engines: List[AsyncEngine], retry_seconds: float = 30.0):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        # Only advanced when there are engines (connect() returns early otherwise)
+        self._next = itertools.cycle(range(len(engines)))
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def _candidates(self) -> List[int]:
+        """Replica indexes to try, starting from the next one in the rotation, healthy ones first."""
+        with self._lock:
+            start = next(self._next)
+            now = time.monotonic()
+            order = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+            return [i for i in order if self._down_until.get(i, 0.0) <= now]
+
+    async def connect(self) -> Optional[AsyncConnection]:
+        if not self.engines:
+            return None
+        for index in self._candidates():
+            engine = self.engines[index]
+            try:
+                connection = await engine.connect()
+            except Exception as e:
+                with self._lock:
+                    self._down_until[index] = time.monotonic() + self.retry_seconds
+                logger.warning(f"Read replica {engine.url!r} unavailable, skipping it for {self.retry_seconds}s: {e}")
+                continue
+            if index in self._down_until:
+                with self._lock:
+                    self._down_until.pop(index, None)
+                logger.info(f"Read replica {engine.url!r} is back")
+            return connection
+        logger.warning("No read replica available, reading from the primary")
+        return None
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+class RecentWriters:
+    """
+    Remembers, per client, when its last write succeeded. Reads within `window_seconds`
+    of that write go to the primary, so a client always sees its own writes even when
+    the replicas lag behind. Per process: across workers the client carries the time of
+    its last write itself (see app.middleware.read_routing).
+    """
+    def __init__(self, window_seconds: float = 5.0, max_clients: int = 100_000):
+        self.window_seconds = window_seconds
+        self.max_clients = max_clients
+        self._last_write: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, client: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._last_write) >= self.max_clients:
+                self._prune(now)
+            self._last_write[client] = now
+
+    def wrote_recently(self, client: str) -> bool:
+        with self._lock:
+            last_write = self._last_write.get(client)
+        return last_write is not None and time.monotonic() - last_write < self.window_seconds
+
+    def _prune(self, now: float) -> None:
+        """Drops clients whose window has passed; clears everything if all are still recent."""
+        expired = [client for client, at in self._last_write.items() if now - at >= self.window_seconds]
+        for client in expired:
+            del self._last_write[client]
+        if len(self._last_write) >= self.max_clients:
+            self._last_write.clear()
@@ -474,7 +474,7 @@ def register_exception_handlers(app: FastAPI):
             extra={
                 "path": request.url.path,
                 "method": request.method,
-                "model": str(exc.model),
+                "model": exc.title,
                 "errors": exc.errors()
             }
         )
@@ -0,0 +1,67 @@
+import time
+from fastapi import Request
+from app.db.database import db
+from app.db.replicas import read_from_primary
+
+# Methods that never write; any other successful request opens the client's read-your-writes window
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Time of the client's last write (epoch milliseconds), handed back to the client so that any
+# worker, not only the one that handled the write, routes its next reads to the primary.
+# Browsers return the cookie by themselves; other clients can echo the header.
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
+
+def client_key(request: Request) -> str:
+    """Identifies the client for read-your-writes: the X-Client-ID header if sent, else the client address."""
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    return request.client.host if request.client else ""
+
+
+def wrote_recently(request: Request) -> bool:
+    """
+    Whether the client's last write is within the read-your-writes window: as carried by the
+    request (last_write cookie or X-Last-Write header), or as recorded by this process.
+    A client can only move its own reads to the primary, so the value is not authenticated;
+    a time in the future (forged, or from a clock ahead of ours) is ignored, so that it cannot
+    keep the client's reads on the primary past the window.
+    """
+    last_write = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if last_write:
+        try:
+            elapsed_ms = time.time() * 1000 - int(last_write)
+        except ValueError:
+            elapsed_ms = None
+        if elapsed_ms is not None and 0 <= elapsed_ms < db.recent_writers.window_seconds * 1000:
+            return True
+    return db.recent_writers.wrote_recently(client_key(request))
+
+
+async def route_reads(request: Request, call_next):
+    """
+    Keeps a client's reads on the primary for a short window after its last write,
+    so it sees its own writes even when the read replicas lag behind.
+    """
+    if not db.replicas:
+        return await call_next(request)
+
+    if request.method in SAFE_METHODS:
+        token = read_from_primary.set(wrote_recently(request))
+        try:
+            return await call_next(request)
+        finally:
+            read_from_primary.reset(token)
+
+    response = await call_next(request)
+    if response.status_code < 400:
+        db.recent_writers.record(client_key(request))
+        last_write = str(int(time.time() * 1000))
+        response.headers[LAST_WRITE_HEADER] = last_write
+        response.set_cookie(
+            LAST_WRITE_COOKIE, last_write,
+            max_age=max(1, int(db.recent_writers.window_seconds + 0.999)), httponly=True, samesite="lax",
+        )
+    return response
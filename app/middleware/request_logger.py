@@ -4,6 +4,8 @@ import uuid
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
 from starlette.responses import StreamingResponse  # Import StreamingResponse
+from app.db.pool import connection_holder
+from app.db.query_stats import QueryStats, query_stats
 
 logger = logging.getLogger("app")  # Get logger instance
 
@@ -13,6 +15,11 @@ async def log_requests(request: Request, call_next):
     # Generate unique request ID
     request_id = str(uuid.uuid4())
     request.state.request_id = request_id
+    # Names the request in the pool's leak reports
+    connection_holder.set(f"{request.method} {request.url.path} [{request_id}]")
+    # Collects the statements the request runs; those of a streamed body run after this returns and are not counted
+    stats = QueryStats()
+    query_stats.set(stats)
 
     # Log request start
     logger.info(
@@ -45,6 +52,7 @@ async def log_requests(request: Request, call_next):
 
     # Add request ID to response headers
     response.headers["X-Request-ID"] = request_id
+    response.headers.append("Server-Timing", f"{stats.server_timing()}, app;dur={process_time:.2f}")
 
     # Calculate response size, handling StreamingResponse
     response_size = 0
@@ -66,8 +74,11 @@ async def log_requests(request: Request, call_next):
             "request_id": request_id,
             "processing_time": formatted_process_time,
             "status_code": response.status_code,
-            "response_size": response_size  # Use calculated response_size
+            "response_size": response_size,  # Use calculated response_size
+            "db_statements": stats.statements,
+            "db_time": f"{stats.milliseconds:.2f}ms"
         }
     )
+    stats.warn_repeated(f"{request.method} {request.url.path} [{request_id}]")
 
     return response
\ No newline at end of file
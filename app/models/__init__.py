@@ -2,4 +2,5 @@ from .base import Base
 from .participant import Participant
 from .lottery import Lottery
 from .ballot import Ballot
-from .winning_ballots import WinningBallot
\ No newline at end of file
+from .winning_ballots import WinningBallot
+from .draw_run import DrawRun
\ No newline at end of file
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, ForeignKey, Index, Integer, String, Date
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Date, Sequence
 from sqlalchemy.types import BigInteger
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
+# Hands out blocks of ballot number seeds; see app.repositories.ballot_number_allocator
+BALLOT_NUMBER_SEQUENCE = Sequence('ballot_number_seq', increment=1000, metadata=Base.metadata)
+
 class Ballot(Base):
     __tablename__ = 'ballots'
 
@@ -11,6 +14,8 @@ class Ballot(Base):
     lottery_id = Column(Integer, ForeignKey('lotteries.lottery_id'), nullable=False)
     ballot_number = Column(BigInteger, unique=True)
     expiry_date = Column(Date)
+    # Uniform random rank drawn at insert time; the lowest rank of a lottery is its winner in "rank" draw mode
+    draw_rank = Column(BigInteger)
 
     users = relationship("Participant", back_populates="ballots") 
     lottery = relationship("Lottery", back_populates="ballots") 
@@ -18,7 +23,8 @@ class Ballot(Base):
     winning_entry = relationship("WinningBallot", back_populates="ballot", uselist=False)
 
     __table_args__ = (
-        Index('idx_ballots_user', 'user_id'),
-        Index('idx_ballots_lottery', 'lottery_id'),
+        Index('idx_ballots_user', 'user_id', 'ballot_id'),
+        Index('idx_ballots_lottery', 'lottery_id', 'ballot_id'),
+        Index('idx_ballots_lottery_rank', 'lottery_id', 'draw_rank'),
     )
     
\ No newline at end of file
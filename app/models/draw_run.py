@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Date, DateTime, Integer, Text
+from app.models.base import Base
+
+
+class DrawRun(Base):
+    __tablename__ = 'drawruns'
+
+    run_date = Column(Date, primary_key=True)
+    status = Column(Text, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+    lotteries_drawn = Column(Integer, nullable=False, default=0)
+    detail = Column(Text)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Boolean, Integer
+from sqlalchemy import Column, Date, Boolean, Index, Integer, text
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -12,3 +12,7 @@ class Lottery(Base):
     ballots = relationship("Ballot", back_populates="lottery")
     winning_ballot_entry = relationship("WinningBallot", back_populates="lottery", uselist=False)
 
+    __table_args__ = (
+        Index('idx_lotteries_open_date', 'lottery_date', postgresql_where=text('NOT closed')),
+    )
+
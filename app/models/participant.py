@@ -6,7 +6,8 @@ class Participant(Base):
     __tablename__ = 'participants'
 
     user_id = Column(Integer, primary_key=True, autoincrement=True)
-    first_name = Column(Text, nullable=False)
+    # Registration dedupes on first name; the unique index backs INSERT ... ON CONFLICT DO NOTHING
+    first_name = Column(Text, nullable=False, unique=True)
     last_name = Column(Text, nullable=False)
     birth_date = Column(Date, nullable=False)
 
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import os
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger("app")
+
+# Ballot numbers are 11 digits: [10_000_000_000, 99_999_999_999]. Numbers issued before
+# the allocator were random and at most 10 digits, so the two ranges can never overlap.
+BALLOT_NUMBER_MIN = 10_000_000_000
+BALLOT_NUMBER_SPACE = 90_000_000_000
+
+# Must match INCREMENT BY of ballot_number_seq: each nextval reserves this many sequence values
+BALLOT_NUMBER_BLOCK_SIZE = 1000
+
+_DEFAULT_KEY = "lottery-ballot-numbers"
+_MASK64 = (1 << 64) - 1
+
+
+class FeistelPermutation:
+    """
+    Keyed bijection of [0, domain_size).
+
+    A balanced Feistel network over the smallest even bit width covering the domain is a
+    permutation of that power-of-two range whatever the round function; values that land
+    outside the domain are fed through again (cycle walking) until they fall inside, which
+    keeps it a permutation of the domain itself. Distinct inputs therefore always give
+    distinct outputs, while consecutive inputs look unrelated without the key.
+    """
+    def __init__(self, key: bytes, domain_size: int, rounds: int = 6):
+        self.domain_size = domain_size
+        self.rounds = rounds
+        bits = max(domain_size - 1, 1).bit_length()
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self._round_keys = [
+            int.from_bytes(hashlib.blake2b(key, digest_size=8, person=b"ballot-round", salt=bytes([r]) * 16).digest(), "big")
+            for r in range(rounds)
+        ]
+
+    def _round(self, round_key: int, value: int) -> int:
+        # splitmix64 finalizer over the keyed half-block: cheap, and well mixed enough to hide the order
+        x = ((value ^ round_key) * 0x9E3779B97F4A7C15) & _MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return (x ^ (x >> 31)) & self.half_mask
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self.half_mask
+        for round_key in self._round_keys:
+            left, right = right, left ^ self._round(round_key, right)
+        return (left << self.half_bits) | right
+
+    def permute(self, value: int) -> int:
+        if not 0 <= value < self.domain_size:
+            raise ValueError(f"{value} is outside the permutation domain [0, {self.domain_size}).")
+        value = self._encrypt(value)
+        while value >= self.domain_size:
+            value = self._encrypt(value)
+        return value
+
+
+class BallotNumberAllocator:
+    """
+    Hands out ballot numbers that are unique by construction but look random.
+
+    Every number is the keyed permutation of a distinct sequence value, so no two
+    allocations can collide and no insert needs a retry. Sequence values are reserved
+    from Postgres in blocks of BALLOT_NUMBER_BLOCK_SIZE (one nextval per block), which
+    keeps processes and replicas disjoint with one round-trip per thousand ballots.
+    The key (BALLOT_NUMBER_KEY) must never change once numbers have been issued.
+
+    There is no lock: the event loop runs the bookkeeping between awaits atomically, and
+    the only await is the block reservation, so a caller never waits on another caller's
+    round-trip. Callers that run out together each reserve a block; the ones that find the
+    current block refilled on their return keep theirs as a spare for the next refill.
+    """
+    def __init__(self, key: bytes):
+        self._permutation = FeistelPermutation(key, BALLOT_NUMBER_SPACE)
+        self._next = 0
+        self._end = 0
+        self._spare_blocks: List[int] = []
+
+    async def allocate(self, next_block: Callable[[], Awaitable[int]], count: int = 1) -> List[int]:
+        """
+        Returns `count` fresh ballot numbers. `next_block` reserves a new block and returns
+        its first sequence value; it is only awaited when the current block runs out.
+        """
+        sequence_values: List[int] = []
+        while len(sequence_values) < count:
+            if self._next >= self._end:
+                if self._spare_blocks:
+                    start = self._spare_blocks.pop()
+                else:
+                    start = await next_block()
+                    if self._next < self._end:
+                        # Another caller refilled the current block while this one waited
+                        self._spare_blocks.append(start)
+                        continue
+                self._next, self._end = start, start + BALLOT_NUMBER_BLOCK_SIZE
+            take = min(count - len(sequence_values), self._end - self._next)
+            sequence_values.extend(range(self._next, self._next + take))
+            self._next += take
+        return [BALLOT_NUMBER_MIN + self._permutation.permute(v) for v in sequence_values]
+
+
+def _load_key() -> bytes:
+    key = os.getenv("BALLOT_NUMBER_KEY")
+    if not key:
+        logger.warning("BALLOT_NUMBER_KEY is not set; using the built-in key. Ballot numbers stay unique but are predictable.")
+        key = _DEFAULT_KEY
+    return key.encode()
+
+
+ballot_number_allocator = BallotNumberAllocator(_load_key())
@@ -1,84 +1,173 @@
-from app.models.ballot import Ballot
-from app.repositories.base_repository import BaseRepository
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from app.models.ballot import Ballot, BALLOT_NUMBER_SEQUENCE
+from app.repositories.base_repository import BaseRepository, STREAM_CHUNK_SIZE
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, insert, Row
 from fastapi import Depends
 import logging 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple, Sequence
 from datetime import date
-import random
-import string 
+import secrets
 from app.db.database import db
+from app.schemas.pagination import Page
+from app.repositories.ballot_number_allocator import ballot_number_allocator
 from app.repositories.interfaces.ballot_repo_interface import BallotRepositoryInterface
 logger = logging.getLogger("app")
 
 class BallotRepository(BaseRepository[Ballot], BallotRepositoryInterface):
-    def __init__(self, session: Session):
+    # Listings return what BallotResponse shows; draw_rank stays internal
+    read_columns = (Ballot.ballot_id, Ballot.user_id, Ballot.lottery_id, Ballot.ballot_number, Ballot.expiry_date)
+
+    def __init__(self, session: AsyncSession):
         super().__init__(session, Ballot)
 
-    def _init_ballot(self, user_id: int, lottery_id: int,  expiry_date: date) -> Ballot:
-        b = self.model()
-        b.user_id = user_id
-        b.lottery_id = lottery_id
-        b.ballot_number = ''.join(random.choices(string.digits, k=10))
-        b.expiry_date = expiry_date
-        return b
+    async def _next_ballot_number_block(self) -> int:
+        """Reserves a block of ballot number sequence values and returns its first value."""
+        return (await self.session.execute(select(BALLOT_NUMBER_SEQUENCE.next_value()))).scalar_one()
+
+    async def _next_ballot_number(self) -> int:
+        return (await ballot_number_allocator.allocate(self._next_ballot_number_block))[0]
+
+    def _ballot_values(self, user_id: int, lottery_id: int, expiry_date: date, ballot_number: int) -> dict:
+        return {
+            "user_id": user_id,
+            "lottery_id": lottery_id,
+            "ballot_number": ballot_number,
+            "expiry_date": expiry_date,
+            "draw_rank": secrets.randbits(63),
+        }
 
-    def create_ballot(
+    async def create_ballot(
         self,
         user_id: int,
         lottery_id: int,
         expiry_date: date
     ) -> Ballot:
-        """Create and persist a new Ballot."""
+        """Insert a new Ballot with INSERT ... RETURNING; committed with the unit of work."""
         logger.debug(f"Creating Ballot for User={user_id}, Lottery={lottery_id}")
-        ballot = self._init_ballot(
-            user_id=user_id,
-            lottery_id=lottery_id,
-            expiry_date=expiry_date
+        ballot = await self._insert_returning(
+            **self._ballot_values(user_id, lottery_id, expiry_date, await self._next_ballot_number())
         )
-        self.session.add(ballot)
-        self.session.commit()
-        self.session.refresh(ballot)
         logger.info(f"Created Ballot with ID={ballot.ballot_id}")
         return ballot
 
-    def create_ballot_with_date(
+    async def create_ballot_with_date(
         self,
         user_id: int,
         lottery_id: int,
         expiry_date: date
     ) -> Ballot:
-        """Create and persist a new Ballot."""
+        """Insert a new Ballot with INSERT ... RETURNING; committed with the unit of work."""
         logger.debug(f"Creating Ballot for User={user_id}, Lottery={lottery_id}")
-        ballot = self._init_ballot(
-            user_id=user_id,
-            lottery_id=lottery_id,
-            expiry_date=expiry_date
+        ballot = await self._insert_returning(
+            **self._ballot_values(user_id, lottery_id, expiry_date, await self._next_ballot_number())
         )
-        self.session.add(ballot)
-        self.session.commit()
-        self.session.refresh(ballot)
         logger.info(f"Created Ballot with ID={ballot.ballot_id}")
         return ballot
 
-    def get_ballot(self, ballot_id: int) -> Optional[Ballot]:
+    async def create_ballots_bulk(self, ballots: List[Tuple[int, int, date]]) -> Sequence[Row]:
+        """
+        Insert many ballots, given as (user_id, lottery_id, expiry_date), with one
+        multi-row INSERT ... RETURNING. Rows come back in input order.
+        Runs in a savepoint: on error only this batch is rolled back, the exception is
+        re-raised and the surrounding unit of work stays usable.
+        """
+        logger.debug(f"Bulk creating {len(ballots)} Ballots")
+        stmt = insert(Ballot).returning(
+            Ballot.ballot_id,
+            Ballot.user_id,
+            Ballot.lottery_id,
+            Ballot.ballot_number,
+            Ballot.expiry_date,
+            sort_by_parameter_order=True,
+        )
+        ballot_numbers = await ballot_number_allocator.allocate(self._next_ballot_number_block, count=len(ballots))
+        params = [
+            self._ballot_values(user_id, lottery_id, expiry_date, ballot_number)
+            for (user_id, lottery_id, expiry_date), ballot_number in zip(ballots, ballot_numbers)
+        ]
+        try:
+            async with self.session.begin_nested():
+                rows = (await self.session.execute(stmt, params)).all()
+        except Exception as e:
+            logger.error(f"Failed to bulk create {len(ballots)} Ballots. Rolled back to savepoint. Error: {e}")
+            raise
+        logger.info(f"Bulk created {len(rows)} Ballots")
+        return rows
+
+    async def get_ballot(self, ballot_id: int) -> Optional[Ballot]:
         """Retrieve a ballot by its primary key."""
-        return self.get(ballot_id)
-
-    def list_by_user(self, user_id: int) -> List[Ballot]:
-        """List ballots belonging to a given user."""
-        logger.debug(f"Listing Ballots for User={user_id}")
-        stmt = select(Ballot).where(Ballot.user_id == user_id)
-        result = self.session.execute(stmt)
-        return result.scalars().all()
-
-    def list_by_lottery(self, lottery_id: int) -> List[Ballot]:
-        """List ballots for a specific lottery."""
-        logger.debug(f"Listing Ballots for Lottery={lottery_id}")
-        stmt = select(Ballot).where(Ballot.lottery_id == lottery_id)
-        result = self.session.execute(stmt)
-        return result.scalars().all()
-
-def get_ballot_repository_provider(session: Session = Depends(db.get_db)) -> BallotRepositoryInterface:
+        return await self.get(ballot_id)
+
+    async def list_by_user(self, user_id: int, limit: int, after: Optional[int] = None) -> Page[Row]:
+        """List one page of ballot rows belonging to a given user, ordered by ballot_id (idx_ballots_user)."""
+        logger.debug(f"Listing Ballots for User={user_id} after Ballot={after} (limit {limit})")
+        stmt = self._select_rows().where(Ballot.user_id == user_id)
+        return await self._keyset_page(stmt, Ballot.ballot_id, limit, after)
+
+    def stream_by_user(self, user_id: int, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Row]:
+        """Stream every ballot row of a user, ordered by ballot_id, through a server-side cursor."""
+        logger.debug(f"Streaming Ballots for User={user_id}")
+        stmt = self._select_rows().where(Ballot.user_id == user_id).order_by(Ballot.ballot_id)
+        return self._stream(stmt, chunk_size)
+
+    async def list_by_lottery(self, lottery_id: int, limit: int, after: Optional[int] = None) -> Page[Row]:
+        """List one page of ballot rows for a specific lottery, ordered by ballot_id (idx_ballots_lottery)."""
+        logger.debug(f"Listing Ballots for Lottery={lottery_id} after Ballot={after} (limit {limit})")
+        stmt = self._select_rows().where(Ballot.lottery_id == lottery_id)
+        return await self._keyset_page(stmt, Ballot.ballot_id, limit, after)
+
+    def stream_by_lottery(self, lottery_id: int, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Row]:
+        """Stream every ballot row of a lottery, ordered by ballot_id, through a server-side cursor."""
+        logger.debug(f"Streaming Ballots for Lottery={lottery_id}")
+        stmt = self._select_rows().where(Ballot.lottery_id == lottery_id).order_by(Ballot.ballot_id)
+        return self._stream(stmt, chunk_size)
+
+    async def count_by_lottery(self, lottery_id: int) -> int:
+        """Count ballots for a specific lottery without loading them."""
+        logger.debug(f"Counting Ballots for Lottery={lottery_id}")
+        stmt = select(func.count()).select_from(Ballot).where(Ballot.lottery_id == lottery_id)
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def get_ballot_id_at(self, lottery_id: int, position: int) -> Optional[int]:
+        """
+        Fetch the ID of the ballot at a 0-based position within a lottery, ordered by ballot ID.
+        Served from the (lottery_id, ballot_id) index, so only a single integer is materialized.
+        """
+        logger.debug(f"Fetching Ballot at Position={position} for Lottery={lottery_id}")
+        stmt = (
+            select(Ballot.ballot_id)
+            .where(Ballot.lottery_id == lottery_id)
+            .order_by(Ballot.ballot_id)
+            .offset(position)
+            .limit(1)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def get_lowest_ranked_ballot_id(self, lottery_id: int) -> Optional[int]:
+        """
+        Fetch the ID of the lottery's ballot with the lowest draw_rank.
+        A single probe of the (lottery_id, draw_rank) index, whatever the ballot count.
+        """
+        logger.debug(f"Fetching lowest ranked Ballot for Lottery={lottery_id}")
+        stmt = (
+            select(Ballot.ballot_id)
+            .where(Ballot.lottery_id == lottery_id)
+            .order_by(Ballot.draw_rank.asc().nulls_last())
+            .limit(1)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def has_unranked_ballots(self, lottery_id: int) -> bool:
+        """
+        Whether the lottery has ballots without a draw_rank (inserted before ranks were
+        assigned). A single probe of the (lottery_id, draw_rank) index.
+        """
+        stmt = select(
+            select(Ballot.ballot_id)
+            .where(Ballot.lottery_id == lottery_id, Ballot.draw_rank.is_(None))
+            .exists()
+        )
+        return (await self.session.execute(stmt)).scalar_one()
+
+async def get_ballot_repository_provider(session: AsyncSession = Depends(db.get_db)) -> BallotRepositoryInterface:
     return BallotRepository(session=session)
\ No newline at end of file
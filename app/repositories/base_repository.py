@@ -1,23 +1,123 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import Generic, TypeVar, Type, List, Optional, Any
+from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, inspect, Row, Select
+from typing import AsyncIterator, Generic, TypeVar, Type, List, Optional, Any, Tuple, Sequence
 from app.models.base import Base
+from app.schemas.pagination import Page
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Rows fetched per round-trip when streaming through a server-side cursor
+STREAM_CHUNK_SIZE = 1000
+
 class BaseRepository(Generic[ModelType]):
     """Generic base repository for CRUD operations."""
-    def __init__(self, session: Session, model: Type[ModelType]):
+    # Columns returned by the read-only listings (see _select_rows); empty means all mapped columns
+    read_columns: Tuple = ()
+
+    def __init__(self, session: AsyncSession, model: Type[ModelType]):
         self.session = session
         self.model = model
 
-    def get(self, pk : Any) -> Optional[ModelType]:
-        return self.session.get(self.model, pk)
+    async def get(self, pk : Any) -> Optional[ModelType]:
+        return await self.session.get(self.model, pk)
 
-    def list_all(self) -> List[ModelType]:
-        result = self.session.execute(select(self.model))
+    async def list_all(self) -> Sequence[ModelType]:
+        result = await self.session.execute(select(self.model))
         return result.scalars().all()
 
-    def _refresh(self, obj: ModelType) -> ModelType:
-        self.session.refresh(obj)
-        return obj
\ No newline at end of file
+    def _select_rows(self) -> Select:
+        """
+        SELECT of read_columns (all mapped columns if unset) for read-only listings. Rows come
+        back as plain Row tuples with attribute access by column name: no ORM instance,
+        identity map entry or instance state is built per row.
+        """
+        return select(*(self.read_columns or self.model.__table__.columns))
+
+    async def _fetch_rows(self, stmt: Select) -> Sequence[Row]:
+        """Runs a column SELECT on the session's connection: Core execution, the ORM layer is skipped entirely."""
+        connection = await self.session.connection()
+        return (await connection.execute(stmt)).all()
+
+    async def list_page(self, limit: int, after: Optional[Any] = None) -> Page[Row]:
+        """Keyset page of rows over the whole table, ordered by primary key."""
+        pk = inspect(self.model).primary_key[0]
+        return await self._keyset_page(self._select_rows(), pk, limit, after)
+
+    async def _keyset_page(self, stmt: Select, key_column, limit: int, after: Optional[Any] = None) -> Page[Row]:
+        """
+        Runs the column SELECT stmt as one keyset page: rows with key_column > after, ordered by key_column.
+        Seeks through the key's index instead of skipping rows with OFFSET, so every page costs
+        the same however deep it is. Reads one extra row to know whether another page follows.
+        """
+        if after is not None:
+            stmt = stmt.where(key_column > after)
+        rows = await self._fetch_rows(stmt.order_by(key_column).limit(limit + 1))
+        if len(rows) <= limit:
+            return Page(items=rows)
+        items = rows[:limit]
+        return Page(items=items, next_key=getattr(items[-1], key_column.key))
+
+    def stream_all(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Row]:
+        """Streams the rows of the whole table ordered by primary key; see _stream."""
+        pk = inspect(self.model).primary_key[0]
+        return self._stream(self._select_rows().order_by(pk), chunk_size)
+
+    async def _stream(self, stmt: Select, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[Row]:
+        """
+        Yields the rows of the column SELECT stmt through a server-side cursor, chunk_size rows
+        per fetch, so memory stays bounded by one chunk whatever the result size. The session
+        must stay open until the iterator is exhausted.
+        """
+        connection = await self.session.connection()
+        result = await connection.stream(stmt.execution_options(yield_per=chunk_size))
+        async for row in result:
+            yield row
+
+    async def _refresh(self, obj: ModelType) -> ModelType:
+        await self.session.refresh(obj)
+        return obj
+
+    async def _insert_returning(self, **values: Any) -> ModelType:
+        """INSERT ... RETURNING the new row as a loaded model, so no refresh SELECT is needed."""
+        stmt = insert(self.model).values(**values).returning(self.model)
+        return (await self.session.execute(stmt)).scalars().one()
+
+    async def _insert(self, **values: Any) -> ModelType:
+        """
+        INSERT without RETURNING, for rows whose every column is known up front (no generated
+        key or default to read back). Nothing comes back, so the statement can be queued in a
+        pipeline. Returns the inserted row as a model instance built from the values.
+        """
+        await self.session.execute(insert(self.model).values(**values))
+        return self.model(**values)
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[None]:
+        """
+        Sends the statements issued inside the block on the session's connection without
+        waiting for each result: with psycopg they go out in pipeline mode and share one
+        round-trip; with other drivers (asyncpg) this is a no-op.
+        Only statements whose results are not read may run inside the block (SQLAlchemy
+        cannot return rows from a pipelined statement), and an error may surface at a
+        later statement or when the block exits. Do not commit inside the block.
+        """
+        connection = await self.session.connection()
+        if connection.dialect.driver != "psycopg":
+            yield
+            return
+        driver_connection = (await connection.get_raw_connection()).driver_connection
+        if driver_connection is None:
+            # Invalidated connection: let the statements fail on their own
+            yield
+            return
+        async with driver_connection.pipeline():
+            yield
+
+    async def commit(self) -> None:
+        """Commit the transaction of the session shared by the request's repositories."""
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        """Roll back the transaction of the session shared by the request's repositories."""
+        await self.session.rollback()
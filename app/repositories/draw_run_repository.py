@@ -0,0 +1,69 @@
+from app.models.draw_run import DrawRun
+from app.repositories.base_repository import BaseRepository
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+from datetime import date, datetime
+from typing import Optional
+from app.db.database import db
+from fastapi import Depends
+from app.repositories.interfaces.draw_run_repo_interface import DrawRunRepositoryInterface
+
+logger = logging.getLogger("app")
+
+RUN_RUNNING = "running"
+RUN_SUCCEEDED = "succeeded"
+RUN_FAILED = "failed"
+
+
+class DrawRunRepository(BaseRepository[DrawRun], DrawRunRepositoryInterface):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, DrawRun)
+
+    async def get_by_date(self, run_date: date) -> Optional[DrawRun]:
+        """Fetch the DrawRun of run_date, or None if the day was never attempted."""
+        logger.debug(f"Fetching DrawRun for Date={run_date}")
+        stmt = select(self.model).where(self.model.run_date == run_date)
+        return (await self.session.execute(stmt)).scalars().first()
+
+    async def start_run(self, run_date: date) -> DrawRun:
+        """
+        Record the run of run_date as running.
+        A previous attempt of the same day (failed or interrupted) is overwritten.
+        """
+        logger.debug(f"Starting DrawRun for Date={run_date}")
+        stmt = insert(self.model).values(
+            run_date=run_date,
+            status=RUN_RUNNING,
+            started_at=datetime.now(),
+            lotteries_drawn=0,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.run_date],
+            set_={
+                "status": stmt.excluded.status,
+                "started_at": stmt.excluded.started_at,
+                "finished_at": None,
+                "lotteries_drawn": 0,
+                "detail": None,
+            },
+        ).returning(self.model)
+        return (await self.session.execute(stmt)).scalars().one()
+
+    async def finish_run(self, run_date: date, status: str, lotteries_drawn: int, detail: Optional[str] = None) -> Optional[DrawRun]:
+        """Record the outcome of the run of run_date."""
+        logger.debug(f"Finishing DrawRun for Date={run_date} with Status={status}")
+        stmt = (
+            update(self.model)
+            .where(self.model.run_date == run_date)
+            .values(status=status, finished_at=datetime.now(), lotteries_drawn=lotteries_drawn, detail=detail)
+            .returning(self.model)
+        )
+        return (await self.session.execute(stmt)).scalars().first()
+
+
+async def get_draw_run_repository_provider(
+    session: AsyncSession = Depends(db.get_db)
+) -> DrawRunRepositoryInterface:
+    return DrawRunRepository(session=session)
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic 
+from typing import AsyncIterator, List, Optional, TypeVar, Generic, Tuple, Sequence
 from datetime import date
 from app.models.ballot import Ballot 
+from sqlalchemy import Row
 from sqlalchemy.orm import Session 
 from app.repositories.interfaces.base_repo_interface import BaseRepositoryInterface
+from app.schemas.pagination import Page
 
 ModelType = TypeVar('ModelType')
 
@@ -11,17 +13,49 @@ class BallotRepositoryInterface(BaseRepositoryInterface[Ballot]):
 
 
     @abstractmethod
-    def create_ballot(self, user_id: int, lottery_id: int, expiry_date: date) -> Ballot:
+    async def create_ballot(self, user_id: int, lottery_id: int, expiry_date: date) -> Ballot:
         pass
 
     @abstractmethod
-    def get_ballot(self, ballot_id: int) -> Optional[Ballot]: # Often covered by base get
+    async def create_ballots_bulk(self, ballots: List[Tuple[int, int, date]]) -> Sequence[Row]:
         pass
 
     @abstractmethod
-    def list_by_user(self, user_id: int) -> List[Ballot]:
+    async def get_ballot(self, ballot_id: int) -> Optional[Ballot]: # Often covered by base get
         pass
 
     @abstractmethod
-    def list_by_lottery(self, lottery_id: int) -> List[Ballot]:
+    async def list_by_user(self, user_id: int, limit: int, after: Optional[int] = None) -> Page[Row]:
+        """Lists one keyset page of a user's ballot rows, ordered by ballot_id."""
+        pass
+
+    @abstractmethod
+    def stream_by_user(self, user_id: int, chunk_size: int = 1000) -> AsyncIterator[Row]:
+        """Streams every ballot row of a user, ordered by ballot_id."""
+        pass
+
+    @abstractmethod
+    async def list_by_lottery(self, lottery_id: int, limit: int, after: Optional[int] = None) -> Page[Row]:
+        """Lists one keyset page of a lottery's ballot rows, ordered by ballot_id."""
+        pass
+
+    @abstractmethod
+    def stream_by_lottery(self, lottery_id: int, chunk_size: int = 1000) -> AsyncIterator[Row]:
+        """Streams every ballot row of a lottery, ordered by ballot_id."""
+        pass
+
+    @abstractmethod
+    async def count_by_lottery(self, lottery_id: int) -> int:
+        pass
+
+    @abstractmethod
+    async def get_ballot_id_at(self, lottery_id: int, position: int) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    async def get_lowest_ranked_ballot_id(self, lottery_id: int) -> Optional[int]:
+        pass
+
+    @abstractmethod
+    async def has_unranked_ballots(self, lottery_id: int) -> bool:
         pass
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic, Any
+from typing import AsyncContextManager, AsyncIterator, List, Optional, TypeVar, Generic, Any, Sequence
+from sqlalchemy import Row
+from app.schemas.pagination import Page
 
 ModelType = TypeVar('ModelType')
 
@@ -11,11 +13,36 @@ class BaseRepositoryInterface(Generic[ModelType], ABC):
     or define these methods explicitly if preferred for clarity.
     """
     @abstractmethod
-    def get(self, pk: Any) -> Optional[ModelType]:
+    async def get(self, pk: Any) -> Optional[ModelType]:
         """Retrieve an entity by its primary key."""
         pass
 
     @abstractmethod
-    def list_all(self) -> List[ModelType]:
+    async def list_all(self) -> Sequence[ModelType]:
         """List all entities of this type."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def list_page(self, limit: int, after: Optional[Any] = None) -> Page[Row]:
+        """List one keyset page of rows (read columns only) ordered by primary key, starting after the key `after`."""
+        pass
+
+    @abstractmethod
+    def stream_all(self, chunk_size: int = 1000) -> AsyncIterator[Row]:
+        """Stream every row (read columns only) ordered by primary key, fetching chunk_size rows at a time."""
+        pass
+
+    @abstractmethod
+    def pipeline(self) -> AsyncContextManager[None]:
+        """Pipelines the result-less statements issued inside the block (psycopg only; a no-op otherwise)."""
+        pass
+
+    @abstractmethod
+    async def commit(self) -> None:
+        """Commit the current transaction."""
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        """Roll back the current transaction."""
+        pass
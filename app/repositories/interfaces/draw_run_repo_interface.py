@@ -0,0 +1,24 @@
+from abc import abstractmethod
+from typing import Optional
+from datetime import date
+from app.models.draw_run import DrawRun
+from app.repositories.interfaces.base_repo_interface import BaseRepositoryInterface
+
+
+class DrawRunRepositoryInterface(BaseRepositoryInterface[DrawRun]):
+    """Interface for DrawRun repository operations."""
+
+    @abstractmethod
+    async def get_by_date(self, run_date: date) -> Optional[DrawRun]:
+        """Fetches the scheduled draw run of a given day."""
+        pass
+
+    @abstractmethod
+    async def start_run(self, run_date: date) -> DrawRun:
+        """Records a draw run as running, restarting a previous attempt of the same day."""
+        pass
+
+    @abstractmethod
+    async def finish_run(self, run_date: date, status: str, lotteries_drawn: int, detail: Optional[str] = None) -> Optional[DrawRun]:
+        """Records the outcome of a draw run."""
+        pass
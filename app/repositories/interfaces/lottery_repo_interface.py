@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic 
+from typing import Any, AsyncIterator, List, Optional, TypeVar, Generic, Sequence
 from datetime import date
 from app.models.lottery import Lottery 
+from sqlalchemy import Row
 from sqlalchemy.orm import Session 
 from app.repositories.interfaces.base_repo_interface import BaseRepositoryInterface
+from app.schemas.pagination import Page
 
 ModelType = TypeVar('ModelType')
 
@@ -11,31 +13,58 @@ class LotteryRepositoryInterface(BaseRepositoryInterface[Lottery]):
     """Interface for Lottery repository operations."""
 
     @abstractmethod
-    def create_lottery(self, input_date: date, closed: bool = False) -> Optional[Lottery]:
-        """Creates a new lottery."""
+    async def create_lottery(self, input_date: date, closed: bool = False) -> Optional[Lottery]:
+        """Creates a new lottery; returns None if one already exists for the date."""
         pass
 
     @abstractmethod
-    def get_by_date(self, target_date: date) -> Optional[Lottery]:
+    async def get_or_create_by_date(self, target_date: date) -> Lottery:
+        """Returns the lottery for a date, creating it atomically if missing."""
+        pass
+
+    @abstractmethod
+    async def get_by_date(self, target_date: date) -> Optional[Lottery]:
         """Fetches a lottery by its specific date."""
         pass
 
     @abstractmethod
-    def get_lottery(self, lottery_id: any) -> Optional[Lottery]: # 'any' for pk type flexibility
+    async def lock_by_date(self, target_date: date) -> Optional[Lottery]:
+        """Fetches and row-locks a lottery by date, skipping it if already locked."""
+        pass
+
+    @abstractmethod
+    async def close_locked(self, lottery_id: int) -> None:
+        """Flags a lottery whose row is locked by the current transaction as closed, without committing."""
+        pass
+
+    @abstractmethod
+    async def get_lottery(self, lottery_id: Any) -> Optional[Lottery]: # 'Any' for pk type flexibility
         """Retrieves a lottery by its primary key."""
         pass
 
     @abstractmethod
-    def list_lotteries(self) -> List[Lottery]:
-        """Lists all lotteries."""
+    async def list_lotteries(
+        self, limit: int, after: Optional[int] = None,
+        from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> Page[Row]:
+        """Lists one keyset page of lottery rows, optionally within a date range."""
+        pass
+
+    @abstractmethod
+    def stream_lotteries(
+        self, from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> AsyncIterator[Row]:
+        """Streams every lottery row, optionally within a date range."""
         pass
 
     @abstractmethod
-    def mark_as_closed(self, lottery_id: int) -> Optional[Lottery]:
-        """Marks a specified lottery as closed."""
+    async def list_open(self) -> Sequence[Row]:
+        """Lists the rows of the open lotteries, oldest first."""
         pass
 
     @abstractmethod
-    def close_lottery_by_date(self, target_date: date) -> Optional[Lottery]:
-        """Finds a lottery by date and marks it as closed."""
-        pass
\ No newline at end of file
+    async def list_open_before(
+        self, before_date: date, after_date: Optional[date] = None, limit: int = 100
+    ) -> Sequence[Lottery]:
+        """Lists open lotteries dated before a date, oldest first, one page at a time."""
+        pass
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic 
+from typing import Iterable, List, Optional, Set, Tuple, TypeVar, Generic, Sequence
 from datetime import date
 from app.models.participant import Participant 
+from sqlalchemy import Row
 from sqlalchemy.orm import Session 
 from app.repositories.interfaces.base_repo_interface import BaseRepositoryInterface
+from app.schemas.pagination import Page
 
 ModelType = TypeVar('ModelType')
 
@@ -11,21 +13,31 @@ class ParticipantRepositoryInterface(BaseRepositoryInterface[Participant]):
     """Interface for Participant repository operations."""
 
     @abstractmethod
-    def create_participant(self, first_name: str, last_name: str, birth_date: date) -> Participant:
-        """Creates a new participant."""
+    async def create_participant(self, first_name: str, last_name: str, birth_date: date) -> Optional[Participant]:
+        """Creates a new participant; returns None if one with the same first name already exists."""
         pass
 
     @abstractmethod
-    def get_participant_by_id(self, user_id: int) -> Optional[Participant]:
+    async def create_participants_bulk(self, participants: List[Tuple[str, str, date]]) -> Sequence[Row]:
+        """Creates many participants at once, skipping first names already registered; returns the created rows."""
+        pass
+
+    @abstractmethod
+    async def get_participant_by_id(self, user_id: int) -> Optional[Participant]:
         """Retrieves a participant by their ID."""
         pass
 
     @abstractmethod
-    def get_by_first_name(self, first_name: str) -> Optional[Participant]:
+    async def get_by_first_name(self, first_name: str) -> Optional[Participant]:
         """Fetches a participant by their first name."""
         pass
 
     @abstractmethod
-    def list_participants(self) -> List[Participant]:
-        """Lists all participants."""
+    async def get_existing_ids(self, user_ids: Iterable[int]) -> Set[int]:
+        """Returns which of the given participant IDs exist."""
+        pass
+
+    @abstractmethod
+    async def list_participants(self, limit: int, after: Optional[int] = None) -> Page[Row]:
+        """Lists one keyset page of participant rows."""
         pass
\ No newline at end of file
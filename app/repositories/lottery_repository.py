@@ -1,54 +1,85 @@
 from app.models.lottery import Lottery
 from app.repositories.base_repository import BaseRepository
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, select, update, not_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging 
 from datetime import date
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Sequence
 from fastapi import HTTPException
 from app.db.database import db  
+from app.schemas.pagination import Page
 from fastapi import Depends
 from app.repositories.interfaces.lottery_repo_interface import LotteryRepositoryInterface
 
 logger = logging.getLogger("app")
 
 class LotteryRepository(BaseRepository[Lottery], LotteryRepositoryInterface):
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         super().__init__(session, Lottery)
 
-    def _init_lottery(self, input_date: date, closed: bool) -> Optional[Lottery]:
-        l = self.model()
-        l.lottery_date = input_date
-        if closed:
-            return None
-        l.closed = closed
-        return l
-
-    def create_lottery(self, input_date: date, closed: bool = False) -> Optional[Lottery]:
+    async def create_lottery(self, input_date: date, closed: bool = False) -> Optional[Lottery]:
+        """
+        Insert a Lottery for input_date with INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        Returns None if a lottery already exists for that date (the unique constraint on
+        lottery_date decides, so concurrent creators never fail with an integrity error).
+        """
         logger.debug(f"Attempting to create Lottery for Date={input_date}, Closed={closed}")
-        lottery = self._init_lottery(input_date, closed)
-        if lottery is None:
-            logger.warning(f"Initialization of Lottery for Date={input_date} with Closed={closed} returned None. Lottery not created.")
+        if closed:
+            logger.warning(f"Refusing to create Lottery for Date={input_date} already closed. Lottery not created.")
             return None
+        stmt = (
+            insert(self.model)
+            .values(lottery_date=input_date, closed=closed)
+            .on_conflict_do_nothing(index_elements=[self.model.lottery_date])
+            .returning(self.model)
+        )
         try:
-            self.session.add(lottery)
-            self.session.commit()
-            refreshed_lottery = self._refresh(lottery)
-            logger.info(f"Successfully created Lottery with ID={refreshed_lottery.lottery_id} for Date={refreshed_lottery.lottery_date}")
-            return refreshed_lottery
+            lottery = (await self.session.execute(stmt)).scalars().first()
         except Exception as e:
-            self.session.rollback()
             logger.error(f"Failed to create Lottery for Date={input_date}: {e}", exc_info=True)
+            raise
+        if lottery is None:
+            logger.info(f"Lottery for Date={input_date} already exists. Lottery not created.")
             return None
+        logger.info(f"Successfully created Lottery with ID={lottery.lottery_id} for Date={input_date}")
+        return lottery
 
-    def get_by_date(self, target_date: date) -> Optional[Lottery]:
+    async def get_or_create_by_date(self, target_date: date) -> Lottery:
+        """
+        Return the Lottery for target_date, creating it if missing, with
+        INSERT ... ON CONFLICT (lottery_date) DO NOTHING RETURNING and, when the row already
+        exists, a plain SELECT of it. Concurrent callers all get the same lottery instead of
+        failing on the unique constraint. The existing row is never written, so no row lock
+        is taken: ballot inserts (FOR KEY SHARE through their foreign key) and the draw's
+        FOR NO KEY UPDATE SKIP LOCKED are not held up until the caller commits.
+        """
+        logger.debug(f"Getting or creating Lottery for Date={target_date}")
+        stmt = (
+            insert(self.model)
+            .values(lottery_date=target_date, closed=False)
+            .on_conflict_do_nothing(index_elements=[self.model.lottery_date])
+            .returning(self.model)
+        )
+        try:
+            lottery = (await self.session.execute(stmt)).scalars().first()
+            if lottery is None:
+                # The conflicting row is committed by now (ON CONFLICT waits for its inserter)
+                stmt = select(self.model).where(self.model.lottery_date == target_date)
+                lottery = (await self.session.execute(stmt)).scalars().one()
+        except Exception as e:
+            logger.error(f"Failed to get or create Lottery for Date={target_date}: {e}", exc_info=True)
+            raise
+        return lottery
+
+    async def get_by_date(self, target_date: date) -> Optional[Lottery]:
         """
         Fetch the Lottery whose Date == target_date.
         Returns None if no such lottery exists.
         """
         logger.debug(f"Fetching Lottery with Date={target_date}")
         stmt = select(self.model).where(self.model.lottery_date == target_date)
-        result = self.session.execute(stmt)
+        result = await self.session.execute(stmt)
         lottery = result.scalars().first()
         if lottery:
             logger.info(f"Found Lottery ID={lottery.lottery_id} for Date={target_date}")
@@ -57,68 +88,92 @@ class LotteryRepository(BaseRepository[Lottery], LotteryRepositoryInterface):
             logger.warning(f"No Lottery found for Date={target_date}")
             return None
 
-    def get_lottery(self, lottery_id) -> Optional[Lottery]:
-        return self.get(lottery_id)
+    async def lock_by_date(self, target_date: date) -> Optional[Lottery]:
+        """
+        Fetch the Lottery for target_date with SELECT ... FOR NO KEY UPDATE SKIP LOCKED.
+        The row stays locked until the caller commits or rolls back. NO KEY: the draw only
+        changes `closed`, so ballot INSERTs, whose foreign key check takes FOR KEY SHARE on
+        the lottery row, are not blocked while the draw runs.
+        Returns None if no such lottery exists or another transaction holds its lock.
+        """
+        logger.debug(f"Locking Lottery with Date={target_date}")
+        stmt = (
+            select(self.model)
+            .where(self.model.lottery_date == target_date)
+            .with_for_update(skip_locked=True, key_share=True)
+        )
+        return (await self.session.execute(stmt)).scalars().first()
+
+    async def close_locked(self, lottery_id: int) -> None:
+        """
+        Flags a lottery whose row the caller has locked as closed, inside the caller's
+        transaction. Does not commit. The lock guarantees the row is there, so nothing is
+        read back (no RETURNING) and the UPDATE can be pipelined; the loaded instance, if
+        any, is updated in memory.
+        """
+        logger.debug(f"Flagging Lottery ID={lottery_id} as closed")
+        stmt = (
+            update(self.model)
+            .where(self.model.lottery_id == lottery_id)
+            .values(closed=True)
+            .execution_options(synchronize_session="evaluate")
+        )
+        await self.session.execute(stmt)
+
+    async def get_lottery(self, lottery_id) -> Optional[Lottery]:
+        return await self.get(lottery_id)
+
+    def _in_date_range(self, stmt, from_date: Optional[date], to_date: Optional[date]):
+        if from_date is not None:
+            stmt = stmt.where(self.model.lottery_date >= from_date)
+        if to_date is not None:
+            stmt = stmt.where(self.model.lottery_date <= to_date)
+        return stmt
+
+    async def list_lotteries(
+        self, limit: int, after: Optional[int] = None,
+        from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> Page[Row]:
+        """List one page of lottery rows ordered by lottery_id, optionally dated within [from_date, to_date]."""
+        logger.debug(f"Listing Lotteries from Date={from_date} to Date={to_date} after ID={after} (limit {limit})")
+        stmt = self._in_date_range(self._select_rows(), from_date, to_date)
+        return await self._keyset_page(stmt, self.model.lottery_id, limit, after)
 
-    def list_lotteries(self) -> List[Lottery]:
-        return self.list_all()
+    def stream_lotteries(
+        self, from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> AsyncIterator[Row]:
+        """Stream every lottery row ordered by lottery_id, optionally dated within [from_date, to_date]."""
+        stmt = self._in_date_range(self._select_rows(), from_date, to_date).order_by(self.model.lottery_id)
+        return self._stream(stmt)
 
-    def mark_as_closed(self, lottery_id: int) -> Optional[Lottery]:
+    async def list_open(self) -> Sequence[Row]:
         """
-        Marks a lottery as closed by its ID.
-        Sets the 'closed' attribute to True and persists the change.
-        Returns the updated lottery instance or None if not found.
+        List the rows of open lotteries, oldest first. Served by the partial index idx_lotteries_open_date,
+        so the cost follows the number of open lotteries, not the whole history.
         """
-        logger.debug(f"Attempting to mark Lottery ID={lottery_id} as closed")
-        lottery = self.get_lottery(lottery_id)
-        if lottery:
-            if lottery.closed:
-                logger.info(f"Lottery ID={lottery_id} is already closed.")
-                return lottery
-            try:
-                lottery.closed = True
-                self.session.add(lottery) 
-                self.session.commit()
-                refreshed_lottery = self._refresh(lottery)
-                logger.info(f"Successfully marked Lottery ID={refreshed_lottery.lottery_id} as closed.")
-                return refreshed_lottery
-            except Exception as e:
-                self.session.rollback()
-                logger.error(f"Failed to mark Lottery ID={lottery_id} as closed: {e}", exc_info=True)
-                return None 
-        else:
-            logger.warning(f"Lottery ID={lottery_id} not found. Cannot mark as closed.")
-            return None
+        logger.debug("Listing open Lotteries")
+        stmt = self._select_rows().where(not_(self.model.closed)).order_by(self.model.lottery_date)
+        return await self._fetch_rows(stmt)
 
-    def close_lottery_by_date(self, target_date: date) -> Optional[Lottery]:
+    async def list_open_before(
+        self, before_date: date, after_date: Optional[date] = None, limit: int = 100
+    ) -> Sequence[Lottery]:
         """
-        Marks a lottery as closed by its date.
-        Sets the 'closed' attribute to True and persists the change.
-        Returns the updated lottery instance or None if not found.
+        List open lotteries dated strictly before before_date, oldest first.
+        after_date resumes after the last date of a previous page (keyset pagination).
         """
-        logger.debug(f"Attempting to close Lottery for Date={target_date}")
-        lottery = self.get_by_date(target_date)
-        if lottery:
-            if lottery.closed:
-                logger.info(f"Lottery for Date={target_date} (ID={lottery.lottery_id}) is already closed.")
-                return lottery # Already closed
-            try:
-                lottery.closed = True
-                self.session.add(lottery)
-                self.session.commit()
-                refreshed_lottery = self._refresh(lottery)
-                logger.info(f"Successfully closed Lottery ID={refreshed_lottery.lottery_id} for Date={target_date}.")
-                return refreshed_lottery
-            except Exception as e:
-                self.session.rollback()
-                logger.error(f"Failed to close Lottery for Date={target_date}: {e}", exc_info=True)
-                return None
-        else:
-            logger.warning(f"Lottery for Date={target_date} not found. Cannot close.")
-            return None
+        logger.debug(f"Listing open Lotteries before Date={before_date} after Date={after_date} (limit {limit})")
+        stmt = select(self.model).where(
+            not_(self.model.closed),
+            self.model.lottery_date < before_date,
+        )
+        if after_date is not None:
+            stmt = stmt.where(self.model.lottery_date > after_date)
+        stmt = stmt.order_by(self.model.lottery_date).limit(limit)
+        return (await self.session.execute(stmt)).scalars().all()
 
 
-def get_lottery_repository_provider(
-    session: Session = Depends(db.get_db)
+async def get_lottery_repository_provider(
+    session: AsyncSession = Depends(db.get_db)
 ) -> LotteryRepositoryInterface:
     return LotteryRepository(session=session)
@@ -1,52 +1,101 @@
 from app.models.participant import Participant
 from app.repositories.base_repository import BaseRepository
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, Row, Text, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging 
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set, Tuple, Sequence
 from datetime import date
 from app.db.database import db  
+from app.schemas.pagination import Page
 from fastapi import Depends
 from app.repositories.interfaces.participant_repo_interface import ParticipantRepositoryInterface
 
 logger = logging.getLogger("app")
 
 class ParticipantRepository(BaseRepository[Participant],ParticipantRepositoryInterface):
-    def __init__(self, session: Session):
+    def __init__(self, session: AsyncSession):
         super().__init__(session, Participant)
 
-    def _init_participant(self, first_name: str, last_name: str, birth_date: date) -> Participant:
-        p = self.model()
-        p.first_name = first_name
-        p.last_name = last_name
-        p.birth_date = birth_date
-        return p
-
-    def create_participant(self, first_name: str, last_name: str, birth_date: date) -> Participant:
-        """Create and persist a new Participant."""
+    async def create_participant(self, first_name: str, last_name: str, birth_date: date) -> Optional[Participant]:
+        """
+        Insert a Participant with INSERT ... ON CONFLICT DO NOTHING RETURNING; committed with the unit of work.
+        Returns None if a participant with that first name already exists: the unique index on
+        first_name decides in the same round-trip, so concurrent registrations cannot both succeed.
+        """
         logger.debug(f"Creating Participant: {first_name} {last_name}")
-        participant = self._init_participant(first_name=first_name, last_name=last_name, birth_date=birth_date)
-        self.session.add(participant)
-        self.session.commit()
-        self.session.refresh(participant)
+        stmt = (
+            insert(self.model)
+            .values(first_name=first_name, last_name=last_name, birth_date=birth_date)
+            .on_conflict_do_nothing(index_elements=[self.model.first_name])
+            .returning(self.model)
+        )
+        participant = (await self.session.execute(stmt)).scalars().first()
+        if participant is None:
+            logger.info(f"Participant with FirstName={first_name} already exists. Participant not created.")
+            return None
         logger.info(f"Created Participant with ID={participant.user_id}")
         return participant
 
-    def get_participant_by_id(self, user_id: int) -> Optional[Participant]:
+    async def create_participants_bulk(self, participants: List[Tuple[str, str, date]]) -> Sequence[Row]:
+        """
+        Insert many participants, given as (first_name, last_name, birth_date), with one
+        set-based INSERT ... SELECT FROM unnest(...) ON CONFLICT DO NOTHING RETURNING.
+        The batch travels as three array parameters, so the statement keeps the same shape
+        (and stays in the compiled cache) whatever the batch size. Only the created rows
+        come back; first names already registered are skipped by the unique index.
+        Runs in a savepoint: on error only this batch is rolled back, the exception is
+        re-raised and the surrounding unit of work stays usable.
+        """
+        logger.debug(f"Bulk creating {len(participants)} Participants")
+        first_names, last_names, birth_dates = (list(column) for column in zip(*participants)) if participants else ([], [], [])
+        source = func.unnest(
+            bindparam("first_names", first_names, type_=ARRAY(Text)),
+            bindparam("last_names", last_names, type_=ARRAY(Text)),
+            bindparam("birth_dates", birth_dates, type_=ARRAY(Date)),
+        ).table_valued("first_name", "last_name", "birth_date").render_derived(name="batch")
+        stmt = (
+            insert(Participant)
+            .from_select(
+                [Participant.first_name, Participant.last_name, Participant.birth_date],
+                select(source.c.first_name, source.c.last_name, source.c.birth_date),
+            )
+            .on_conflict_do_nothing(index_elements=[Participant.first_name])
+            .returning(Participant.user_id, Participant.first_name, Participant.last_name, Participant.birth_date)
+        )
+        try:
+            async with self.session.begin_nested():
+                rows = (await self.session.execute(stmt)).all()
+        except Exception as e:
+            logger.error(f"Failed to bulk create {len(participants)} Participants. Rolled back to savepoint. Error: {e}")
+            raise
+        logger.info(f"Bulk created {len(rows)} of {len(participants)} Participants")
+        return rows
+
+    async def get_participant_by_id(self, user_id: int) -> Optional[Participant]:
         """Retrieve a Participant by its primary key."""
-        return self.get(user_id)
+        return await self.get(user_id)
 
-    def get_by_first_name(self, first_name: str) -> Optional[Participant]:
+    async def get_by_first_name(self, first_name: str) -> Optional[Participant]:
         """Fetch participants filtering by first name."""
         logger.debug(f"Fetching Participants by FirstName={first_name}")
         stmt = select(Participant).where(Participant.first_name == first_name)
-        result = self.session.execute(stmt)
+        result = await self.session.execute(stmt)
         return result.scalars().first()
 
-    def list_participants(self) -> List[Participant]:
-        """List all participants."""
-        return self.list_all()
+    async def get_existing_ids(self, user_ids: Iterable[int]) -> Set[int]:
+        """Return which of the given participant IDs exist, with a single query."""
+        ids = list(set(user_ids))
+        if not ids:
+            return set()
+        logger.debug(f"Checking existence of {len(ids)} Participants")
+        stmt = select(Participant.user_id).where(Participant.user_id.in_(ids))
+        return set((await self.session.execute(stmt)).scalars().all())
+
+    async def list_participants(self, limit: int, after: Optional[int] = None) -> Page[Row]:
+        """List one page of participant rows ordered by user_id."""
+        return await self.list_page(limit, after)
 
 
-def get_participant_repository_provider(session: Session = Depends(db.get_db)) -> ParticipantRepositoryInterface: 
+async def get_participant_repository_provider(session: AsyncSession = Depends(db.get_db)) -> ParticipantRepositoryInterface: 
     return ParticipantRepository(session=session) 
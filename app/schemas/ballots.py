@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from datetime import date
 
 
@@ -7,22 +7,42 @@ from datetime import date
 class BallotBase(BaseModel):
     user_id: int = Field(..., description="ID of the Participant who owns this ballot")
     lottery_id: int = Field(..., description="ID of the Lottery this ballot belongs to")
-    expiry_date: date = Field(None, example="2025-05-15", description="Date when this ballot expires. This field is optional.")
+    expiry_date: Optional[date] = Field(default=None, examples=["2025-05-15"], description="Date when this ballot expires. This field is optional.")
 
     model_config = ConfigDict(from_attributes=True)
 
 class BallotCreate(BallotBase):
     user_id: int = Field(..., description="ID of the Participant who owns this ballot")
     lottery_id: int = Field(..., description="ID of the Lottery this ballot belongs to")
-    expiry_date: date = Field(None, example="2025-05-15", description="Date when this ballot expires. This field is optional.")
+    expiry_date: Optional[date] = Field(default=None, examples=["2025-05-15"], description="Date when this ballot expires. This field is optional.")
     model_config = ConfigDict(from_attributes=True)
 
 class BallotResponse(BaseModel):
     ballot_id: int = Field(..., description="Primary key of the ballot")
     user_id: int = Field(..., description="ID of the Participant who owns this ballot")
     lottery_id: int = Field(..., description="ID of the Lottery this ballot belongs to")
-    ballot_number: int = Field(None, description="Number assigned to the ballot. Can be None.")
-    expiry_date: date = Field(None,example="2025-05-15", description="Date when this ballot expires. Can be None.")
+    ballot_number: Optional[int] = Field(default=None, description="Number assigned to the ballot. Can be None.")
+    expiry_date: Optional[date] = Field(default=None,examples=["2025-05-15"], description="Date when this ballot expires. Can be None.")
 
     model_config = ConfigDict(from_attributes=True)
 
+class BallotBulkItem(BaseModel):
+    user_id: int = Field(..., description="ID of the Participant who owns this ballot")
+    lottery_date: Optional[date] = Field(default=None, examples=["2025-05-15"], description="Date of an existing open lottery to enter. Defaults to the current lottery.")
+
+class BallotBulkResult(BaseModel):
+    index: int = Field(..., description="Position of the row in the submitted batch")
+    status: str = Field(..., examples=["created"], description="One of: created, failed")
+    ballot_id: Optional[int] = Field(default=None, description="Primary key of the created ballot")
+    user_id: Optional[int] = Field(default=None, description="ID of the Participant who owns this ballot")
+    lottery_id: Optional[int] = Field(default=None, description="ID of the Lottery this ballot belongs to")
+    ballot_number: Optional[int] = Field(default=None, description="Number assigned to the ballot")
+    expiry_date: Optional[date] = Field(default=None, examples=["2025-05-15"], description="Date when this ballot expires")
+    error: Optional[str] = Field(default=None, description="Why the row was not created")
+
+class BallotBulkResponse(BaseModel):
+    created: int = Field(..., examples=["1000"])
+    failed: int = Field(..., examples=["0"])
+    duration_ms: float = Field(..., examples=["85.3"])
+    ballots_per_second: float = Field(..., examples=["11723.3"])
+    results: List[BallotBulkResult] = Field(default_factory=list)
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Generic, Optional, TypeVar
+from pydantic import BaseModel
+
+ItemType = TypeVar("ItemType", bound=BaseModel)
+
+
+@dataclass
+class BulkRow(Generic[ItemType]):
+    """One row of a bulk payload: the validated item, or why it could not be parsed."""
+    index: int
+    item: Optional[ItemType] = None
+    error: Optional[str] = None
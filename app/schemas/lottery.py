@@ -1,19 +1,38 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
-from typing import Optional 
+from typing import Optional, List
 
 class LotteryBase(BaseModel):
-    lottery_id: int = Field(..., example="123")
-    lottery_date: date = Field(..., example="2025-05-15")
+    lottery_id: int = Field(..., examples=["123"])
+    lottery_date: date = Field(..., examples=["2025-05-15"])
 
     model_config = ConfigDict(from_attributes=True)
 
 class LotteryResponse(BaseModel):
-    lottery_id: int = Field(..., example="123")
-    lottery_date: date = Field(..., example="2025-05-15")
-    closed: bool = Field(..., example="false")
+    lottery_id: int = Field(..., examples=["123"])
+    lottery_date: date = Field(..., examples=["2025-05-15"])
+    closed: bool = Field(..., examples=["false"])
 
     model_config = ConfigDict(from_attributes=True)
 
 class CreateLotteryRequest(BaseModel):
-    target_date: date
\ No newline at end of file
+    target_date: date
+
+class LotteryDrawReport(BaseModel):
+    lottery_id: int = Field(..., examples=["123"])
+    lottery_date: date = Field(..., examples=["2025-05-15"])
+    status: str = Field(..., examples=["drawn"], description="One of: drawn, no_ballots, skipped, failed")
+    winning_ballot_id: Optional[int] = Field(default=None, examples=["456"])
+    ballot_count: Optional[int] = Field(default=None, examples=["10000"], description="Ballots the winner was drawn from")
+    duration_ms: float = Field(..., examples=["12.5"])
+    ballots_per_second: Optional[float] = Field(default=None, examples=["800000.0"])
+    detail: Optional[str] = Field(default=None, description="Reason the lottery was skipped or failed")
+
+class CatchUpDrawResponse(BaseModel):
+    before_date: date = Field(..., examples=["2025-05-16"], description="Open lotteries dated before this day were drawn")
+    lotteries_found: int = Field(..., examples=["3"])
+    drawn: int = Field(..., examples=["2"])
+    failed: int = Field(..., examples=["0"])
+    duration_ms: float = Field(..., examples=["40.2"])
+    lotteries_per_second: float = Field(..., examples=["74.6"])
+    reports: List[LotteryDrawReport] = Field(default_factory=list)
@@ -0,0 +1,52 @@
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+
+class ResultCacheStats(BaseModel):
+    entries: int = Field(..., examples=["1250"])
+    bytes: int = Field(..., examples=["187500"])
+    max_entries: int = Field(..., examples=["10000"])
+    max_bytes: int = Field(..., examples=["16777216"])
+    hits: int = Field(..., examples=["98000"])
+    misses: int = Field(..., examples=["2000"])
+    hit_ratio: float = Field(..., examples=["0.98"])
+    evictions: int = Field(..., examples=["0"])
+    not_modified: int = Field(..., examples=["45000"], description="Requests answered with 304 Not Modified")
+
+
+class CheckoutWaitHistogram(BaseModel):
+    count: int = Field(..., examples=["52000"])
+    sum: float = Field(..., examples=["3120.5"], description="Total milliseconds spent waiting")
+    max: float = Field(..., examples=["48.2"], description="Longest wait in milliseconds")
+    buckets: Dict[str, int] = Field(
+        ...,
+        examples=[{"1": 50000, "5": 51500, "+Inf": 52000}],
+        description="Cumulative counts: checkouts that waited at most the key's milliseconds"
+    )
+
+
+class HeldConnection(BaseModel):
+    holder: str = Field(..., examples=["GET /api/v1/ballot/stream [0b8c5e9e-6a47-4c1e-9d3b-3a0f6c2d1e7a]"])
+    held_s: float = Field(..., examples=["75.2"])
+
+
+class PoolStats(BaseModel):
+    name: str = Field(..., examples=["primary"])
+    pool_size: int = Field(..., examples=["20"])
+    max_overflow: int = Field(..., examples=["30"])
+    timeout_s: float = Field(..., examples=["30.0"])
+    checked_out: int = Field(..., examples=["12"])
+    checked_in: int = Field(..., examples=["8"])
+    overflow: int = Field(..., examples=["0"], description="Connections open beyond pool_size")
+    connections: int = Field(..., examples=["20"])
+    oldest_connection_age_s: float = Field(..., examples=["3540.2"])
+    mean_connection_age_s: float = Field(..., examples=["1800.7"])
+    connects: int = Field(..., examples=["45"])
+    closes: int = Field(..., examples=["25"])
+    invalidations: int = Field(..., examples=["0"])
+    checkouts: int = Field(..., examples=["52000"])
+    checkout_timeouts: int = Field(..., examples=["0"])
+    checkout_wait_ms: CheckoutWaitHistogram
+    leak_threshold_s: float = Field(..., examples=["60.0"])
+    leaks: int = Field(..., examples=["0"], description="Connections ever reported as held past the threshold")
+    held_too_long: List[HeldConnection] = Field(..., description="Connections currently held past the threshold")
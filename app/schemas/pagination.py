@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+
+ItemType = TypeVar("ItemType")
+
+
+@dataclass
+class Page(Generic[ItemType]):
+    """One page of a keyset-paginated listing. next_key is set when more rows follow it."""
+    items: Sequence[ItemType] = field(default_factory=list)
+    next_key: Optional[Any] = None
@@ -1,10 +1,11 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
+from typing import List, Optional
 
 class ParticipantBase(BaseModel):
-    first_name: str = Field(..., example="Alice")
-    last_name: str = Field(..., example="Smith")
-    birth_date: date = Field(..., example="2025-05-15")
+    first_name: str = Field(..., examples=["Alice"])
+    last_name: str = Field(..., examples=["Smith"])
+    birth_date: date = Field(..., examples=["2025-05-15"])
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -12,9 +13,26 @@ class ParticipantCreate(ParticipantBase):
     pass
 
 class ParticipantResponse(BaseModel):
-    user_id : int = Field(..., example=231)
-    first_name: str = Field(..., example="Alice")
-    last_name: str = Field(..., example="Smith")
-    birth_date: date = Field(..., example="2025-05-15")
+    user_id : int = Field(..., examples=[231])
+    first_name: str = Field(..., examples=["Alice"])
+    last_name: str = Field(..., examples=["Smith"])
+    birth_date: date = Field(..., examples=["2025-05-15"])
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ParticipantBulkResult(BaseModel):
+    index: int = Field(..., description="Position of the row in the submitted batch")
+    status: str = Field(..., examples=["created"], description="One of: created, duplicate, failed")
+    user_id: Optional[int] = Field(default=None, description="ID of the created Participant")
+    first_name: Optional[str] = Field(default=None, examples=["Alice"])
+    last_name: Optional[str] = Field(default=None, examples=["Smith"])
+    birth_date: Optional[date] = Field(default=None, examples=["2025-05-15"])
+    error: Optional[str] = Field(default=None, description="Why the row was not created")
+
+class ParticipantBulkResponse(BaseModel):
+    created: int = Field(..., examples=["1000"])
+    duplicate: int = Field(..., examples=["0"])
+    failed: int = Field(..., examples=["0"])
+    duration_ms: float = Field(..., examples=["85.3"])
+    participants_per_second: float = Field(..., examples=["11723.3"])
+    results: List[ParticipantBulkResult] = Field(default_factory=list)
@@ -0,0 +1,20 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Type
+from pydantic import BaseModel
+
+# A response item as a plain dict, with the fields of its response model in the model's order
+RowDict = Dict[str, Any]
+
+
+def row_mapper(model: Type[BaseModel]) -> Callable[[Any], RowDict]:
+    """
+    Returns a function copying the fields of `model` off a Row of the repositories' column
+    queries (or an ORM object, or anything with those attributes) into a RowDict. Nothing is validated: meant for list endpoints,
+    where the database already guarantees the types and a pydantic model per row is the
+    main cost. Encoded with app.apis.serialization, the JSON is the same as the model's.
+    """
+    fields = tuple(model.model_fields)
+    get = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda obj: {fields[0]: get(obj)}
+    return lambda obj: dict(zip(fields, get(obj)))
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Sequence
+from sqlalchemy import Row
+from app.db.database import db
+from app.repositories.ballot_repository import BallotRepository
+
+logger = logging.getLogger("app")
+
+
+@dataclass
+class _PendingBallot:
+    user_id: int
+    lottery_id: int
+    expiry_date: date
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class BallotIngestQueue:
+    """
+    Write-behind ingestion for single ballot submissions (BALLOT_INGEST_MODE=queued).
+
+    Requests enqueue their ballot and await a future instead of running their own
+    INSERT and commit. A background flusher task drains the queue every
+    BALLOT_FLUSH_INTERVAL_MS or as soon as BALLOT_FLUSH_MAX_ITEMS are waiting, writes the
+    whole group with one multi-row INSERT ... RETURNING and one commit, then resolves each
+    future with its ballot row. If a group fails, its ballots are retried one by one so a
+    single bad row only fails its own request.
+    """
+    def __init__(self):
+        self.enabled = os.getenv("BALLOT_INGEST_MODE", "direct").lower() == "queued"
+        self.max_items = int(os.getenv("BALLOT_FLUSH_MAX_ITEMS", "500"))
+        self.interval = int(os.getenv("BALLOT_FLUSH_INTERVAL_MS", "10")) / 1000
+        self.timeout = float(os.getenv("BALLOT_INGEST_TIMEOUT_S", "30"))
+        self._queue: Optional["asyncio.Queue[_PendingBallot]"] = None
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Starts the flusher task when queued ingestion is enabled."""
+        if self.enabled:
+            self._ensure_started()
+
+    async def stop(self) -> None:
+        """Stops accepting work after flushing every ballot already queued."""
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._task
+        self._task = None
+        logger.info("BallotIngestQueue: Stopped.")
+
+    def _ensure_started(self) -> "asyncio.Queue[_PendingBallot]":
+        """Starts the flusher if needed and returns the queue it drains."""
+        # Created on the running loop: an asyncio queue and task belong to the loop that uses them.
+        if self._task is None or self._queue is None:
+            self._stopping = False
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run(self._queue), name="ballot-ingest-flusher")
+            logger.info(
+                "BallotIngestQueue: Started (flush every %sms or %s ballots).",
+                int(self.interval * 1000), self.max_items
+            )
+        return self._queue
+
+    async def submit(self, user_id: int, lottery_id: int, expiry_date: date) -> Row:
+        """
+        Queues a ballot and waits until its group is committed.
+        Returns the inserted row (ballot_id, user_id, lottery_id, ballot_number, expiry_date).
+        Raises the insert error, or TimeoutError if the flush takes longer than BALLOT_INGEST_TIMEOUT_S.
+        """
+        queue = self._ensure_started()
+        pending = _PendingBallot(user_id=user_id, lottery_id=lottery_id, expiry_date=expiry_date)
+        queue.put_nowait(pending)
+        # shield: a request that gives up must not cancel the future its group will resolve
+        return await asyncio.wait_for(asyncio.shield(pending.future), timeout=self.timeout)
+
+    async def _run(self, queue: "asyncio.Queue[_PendingBallot]") -> None:
+        while not (self._stopping and queue.empty()):
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # Fail this group only: the flusher must outlive it or every later submit would time out
+                logger.error("BallotIngestQueue: Flushing a group of %s ballots failed: %s", len(batch), e, exc_info=True)
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+
+    async def _flush(self, batch: List[_PendingBallot]) -> None:
+        started = time.perf_counter()
+        try:
+            rows = await self._insert(batch)
+        except Exception as e:
+            logger.warning("BallotIngestQueue: Group of %s ballots failed (%s); retrying one by one.", len(batch), e)
+            for pending in batch:
+                try:
+                    pending.future.set_result((await self._insert([pending]))[0])
+                except Exception as e_single:
+                    pending.future.set_exception(e_single)
+            return
+        for pending, row in zip(batch, rows):
+            pending.future.set_result(row)
+        logger.debug("BallotIngestQueue: Flushed %s ballots in %.1fms", len(batch), (time.perf_counter() - started) * 1000)
+
+    async def _insert(self, batch: List[_PendingBallot]) -> Sequence[Row]:
+        async with db.session_scope() as session:
+            return await BallotRepository(session).create_ballots_bulk(
+                [(p.user_id, p.lottery_id, p.expiry_date) for p in batch]
+            )
+
+
+ballot_ingest_queue = BallotIngestQueue()
@@ -1,26 +1,38 @@
 import logging
-from datetime import date, timedelta
-from typing import Optional, List
+import time
+from datetime import date
+from typing import Dict, AsyncIterator, Optional, List, Tuple
 import random
-from app.schemas.ballots import BallotResponse, BallotCreate
+from app.schemas.ballots import BallotResponse, BallotCreate, BallotBulkItem, BallotBulkResult, BallotBulkResponse
+from app.schemas.bulk import BulkRow
+from app.schemas.pagination import Page
+from app.schemas.rows import RowDict, row_mapper
 from app.schemas.participant import ParticipantResponse
 from fastapi import Depends,HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import db
 from app.repositories.participant_repository import (
+   ParticipantRepository,
    get_participant_repository_provider,
 )
 from app.repositories.lottery_repository import (
+   LotteryRepository,
    get_lottery_repository_provider,
 )
 from app.repositories.ballot_repository import (
+    BallotRepository,
     get_ballot_repository_provider,
 )
 from app.repositories.winner_ballots_repository import (
+    WinningBallotRepository,
     get_winning_ballot_repository_provider,
 )
 from app.repositories.interfaces.ballot_repo_interface import BallotRepositoryInterface
 from app.repositories.interfaces.lottery_repo_interface import LotteryRepositoryInterface
 from app.repositories.interfaces.participant_repo_interface import ParticipantRepositoryInterface
+from app.services.ballot_ingest_queue import ballot_ingest_queue
+from app.cache.lottery_cache import lottery_id_cache
 from app.repositories.interfaces.winner_ballots_repo_interface import WinningBallotRepositoryInterface
 from app.models.ballot import (
   Ballot, 
@@ -35,10 +47,21 @@ from app.middleware.exceptions.ballot_service_exceptions import (
 )
 from app.middleware.exceptions.lottery_service_exceptions import (
     LotteryCreationError as LotteryServiceCreationError,
+    LotteryClosedError,
     LotteryNotFoundError
 )
 logger = logging.getLogger("app")
 
+# Rows per multi-row INSERT ... RETURNING in bulk submissions
+BULK_CHUNK_SIZE = 1000
+
+_ballot_row = row_mapper(BallotResponse)
+
+
+def current_lottery_date() -> date:
+    """Date of the lottery that ballots submitted without a date enter; it is drawn after midnight."""
+    return date.today()
+
 class BallotService:
     def __init__(
         self,
@@ -55,103 +78,257 @@ class BallotService:
         logger.debug("Initialized LotteryService with repos: %s, %s, %s, %s",
                      self.participant_repo, self.lottery_repo, self.ballot_repo, self.winning_repo)
 
-    def _get_or_create_lottery_for_ballot(self, target_date: date) -> Lottery:
+    @classmethod
+    def for_session(cls, session: AsyncSession) -> "BallotService":
+        """Wires the service with repositories sharing one dedicated session (workers, streamed responses)."""
+        return cls(
+            participant_repo=ParticipantRepository(session),
+            lottery_repo=LotteryRepository(session),
+            ballot_repo=BallotRepository(session),
+            winning_repo=WinningBallotRepository(session),
+        )
+
+    async def _get_or_create_lottery_for_ballot(self, target_date: date) -> int:
         """
-        Helper to get an existing open lottery for a date, or create one if it doesn't exist.
+        Helper to get the id of the lottery for a date, creating the lottery if it doesn't exist.
+        The get-or-create is an INSERT ... ON CONFLICT DO NOTHING, so concurrent first ballots of the day all succeed.
+        Ids of open lotteries are cached per process, so only the first ballot of the day hits the DB.
         Raises:
             LotteryServiceCreationError: If lottery creation fails.
+            LotteryClosedError: If the lottery of that date is already closed.
         """
-        lottery: Optional[Lottery] = self.lottery_repo.get_by_date(target_date)
-        if not lottery:
-            logger.debug("No lottery found for %s, creating new one for ballot submission.", target_date)
-            try:
-                lottery = self.lottery_repo.create_lottery(input_date=target_date)
-                if not lottery:
-                    raise LotteryServiceCreationError(target_date, "Repository returned None during implicit creation.")
-                logger.info("Implicitly created lottery %s for date %s", lottery.lottery_id, target_date)
-            except Exception as e: 
-                logger.error(f"Implicit lottery creation failed for ballot on date {target_date}: {e}")
-                raise LotteryServiceCreationError(target_date, f"Implicit creation failed: {str(e)}")
-        return lottery
+        cached_id = lottery_id_cache.get(target_date)
+        if cached_id is not None:
+            return cached_id
+
+        try:
+            lottery = await self.lottery_repo.get_or_create_by_date(target_date)
+            # Committed on its own, ahead of the request's unit of work, so the cached id
+            # never points at a lottery that a failed ballot insert rolled back.
+            await self.lottery_repo.commit()
+        except Exception as e:
+            # Its own step like the commit above: the rest of a bulk batch keeps a usable session
+            await self.lottery_repo.rollback()
+            logger.error(f"Implicit lottery creation failed for ballot on date {target_date}: {e}")
+            raise LotteryServiceCreationError(target_date, f"Implicit creation failed: {str(e)}")
+        if lottery.closed:
+            raise LotteryClosedError(lottery.lottery_id, "Submitting a ballot")
+        lottery_id_cache.put(target_date, lottery.lottery_id)
+        return lottery.lottery_id
+
+    async def _open_lottery_for_ballot(self, lottery_date: Optional[date] = None) -> Tuple[int, date]:
+        """
+        Resolves the lottery a ballot enters and its date, for single and bulk submissions alike.
+        Without lottery_date it is the current lottery (see current_lottery_date), created if
+        missing; a given lottery_date must name an existing lottery. Either way it must be open.
+        Raises:
+            LotteryServiceCreationError: If creating the current lottery fails.
+            LotteryNotFoundError: If no lottery exists for lottery_date.
+            LotteryClosedError: If the lottery is already closed.
+        """
+        if lottery_date is None:
+            target_date = current_lottery_date()
+            return await self._get_or_create_lottery_for_ballot(target_date), target_date
+        lottery = await self.lottery_repo.get_by_date(lottery_date)
+        if lottery is None:
+            raise LotteryNotFoundError(identifier=lottery_date)
+        if lottery.closed:
+            raise LotteryClosedError(lottery.lottery_id, "Submitting a ballot")
+        return lottery.lottery_id, lottery_date
 
     
-    def create_ballot(self, user_id: int) -> BallotResponse:
+    async def create_ballot(self, user_id: int) -> BallotResponse:
         """
-        Submits a new ballot for today's lottery; creates the lottery if missing.
+        Submits a new ballot for the current lottery; creates the lottery if missing.
+        Raises LotteryClosedError if it is already closed.
         """
-        # FIXME: REMOVE TIMEDELTA FROM HERE TO GET CORRECT BEHAVIOUR THIS IS ONLY FOR DEV PURPOSES
-        target_date: date = date.today() - timedelta(days=1)
+        lottery_id, target_date = await self._open_lottery_for_ballot()
         logger.info("Submitting ballot for user %s on %s", user_id, target_date)
 
-        lottery = self._get_or_create_lottery_for_ballot(target_date)
+        try:
+            if ballot_ingest_queue.enabled:
+                # Hand the connection back to the pool before waiting: the flusher writes with its own.
+                await self.ballot_repo.rollback()
+                ballot_model = await ballot_ingest_queue.submit(user_id, lottery_id, target_date)
+            else:
+                ballot_model = await self.ballot_repo.create_ballot(
+                    user_id=user_id,
+                    lottery_id=lottery_id,
+                    expiry_date=target_date
+                )
+            if not ballot_model:
+                raise BallotCreationError(user_id, lottery_id, "Repository returned None.")
+        except Exception as e:
+            logger.error(f"Ballot creation in repository failed for user {user_id}, lottery {lottery_id}: {e}")
+            raise BallotCreationError(user_id, lottery_id, str(e))
+
+        response = BallotResponse.model_validate(ballot_model)
+        logger.info("Ballot %s submitted successfully for lottery %s (user %s)",
+                    ballot_model.ballot_id, lottery_id, user_id)
+        return response
+
+    async def create_ballot_with_date(self, req : BallotCreate ) -> BallotResponse:
+        """
+        Submits a new ballot for the lottery of req.expiry_date, which must exist and be open;
+        without a date it enters the current lottery, as create_ballot does.
+        """
+        lottery_id, target_date = await self._open_lottery_for_ballot(req.expiry_date)
+        logger.info("Submitting ballot for user %s on %s", req.user_id, target_date)
 
         try:
-            ballot_model = self.ballot_repo.create_ballot(
-                user_id=user_id,
-                lottery_id=lottery.lottery_id,
+            ballot_model = await self.ballot_repo.create_ballot(
+                user_id=req.user_id,
+                lottery_id=lottery_id,
                 expiry_date=target_date
             )
             if not ballot_model:
-                raise BallotCreationError(user_id, lottery.lottery_id, "Repository returned None.")
+                raise BallotCreationError(req.user_id, lottery_id, "Repository returned None.")
         except Exception as e:
-            logger.error(f"Ballot creation in repository failed for user {user_id}, lottery {lottery.lottery_id}: {e}")
-            raise BallotCreationError(user_id, lottery.lottery_id, str(e))
+            logger.error(f"Ballot creation in repository failed for user {req.user_id}, lottery {lottery_id}: {e}")
+            raise BallotCreationError(req.user_id, lottery_id, str(e))
 
         response = BallotResponse.model_validate(ballot_model)
         logger.info("Ballot %s submitted successfully for lottery %s (user %s)",
-                    ballot_model.ballot_id, lottery.lottery_id, user_id)
+                    ballot_model.ballot_id, lottery_id, req.user_id)
         return response
 
-    def create_ballot_with_date(self, req : BallotCreate ) -> BallotResponse:
+    async def create_ballots_bulk(self, rows: List[BulkRow[BallotBulkItem]]) -> BallotBulkResponse:
         """
-        Submits a new ballot for today's lottery; creates the lottery if missing.
+        Submits a batch of ballots. Lotteries are resolved once per distinct date and
+        participants are checked with a single query; valid rows are then inserted in
+        chunks of BULK_CHUNK_SIZE, one multi-row INSERT ... RETURNING per chunk.
+        Lotteries are resolved as for a single ballot (see _open_lottery_for_ballot): rows
+        without a lottery_date enter the current lottery, a given lottery_date must name an
+        existing lottery, and the lottery must be open.
+        Every row gets its own result, so an invalid row or a failed chunk does not
+        reject the rest of the batch.
         """
-        # FIXME: REMOVE TIMEDELTA FROM HERE TO GET CORRECT BEHAVIOUR THIS IS ONLY FOR DEV PURPOSES
-        today: date = date.today() - timedelta(days=1)
-        logger.info("Submitting ballot for user %s on %s", req.user_id, today)
-    
-        lottery: Optional[Lottery] = self.lottery_repo.get_by_date(req.expiry_date)
-        if lottery:
+        started = time.perf_counter()
+        current_date = current_lottery_date()
+        logger.info("Submitting bulk batch of %s ballots", len(rows))
+
+        results: Dict[int, BallotBulkResult] = {}
+        valid_rows: List[Tuple[int, BallotBulkItem, date]] = []
+        for row in rows:
+            if row.item is None:
+                results[row.index] = BallotBulkResult(index=row.index, status="failed", error=row.error)
+            else:
+                valid_rows.append((row.index, row.item, row.item.lottery_date or current_date))
+
+        # Keyed by (date, given by the client): only rows without a date may create the current lottery,
+        # so those are resolved first and a row naming its date finds the lottery they created
+        lottery_ids: Dict[Tuple[date, bool], int] = {}
+        lottery_errors: Dict[Tuple[date, bool], str] = {}
+        keys = {(target_date, item.lottery_date is not None) for _, item, target_date in valid_rows}
+        for key in sorted(keys, key=lambda key: key[1]):
+            target_date, requested = key
             try:
-                ballot_model = self.ballot_repo.create_ballot(
-                    user_id=req.user_id,
-                    lottery_id=lottery.lottery_id,
-                    expiry_date=req.target_date
-                )
-                if not ballot_model:
-                    raise BallotCreationError(req.user_id, lottery.lottery_id, "Repository returned None.")
+                lottery_ids[key], _ = await self._open_lottery_for_ballot(target_date if requested else None)
+            except (LotteryServiceCreationError, LotteryNotFoundError, LotteryClosedError) as e:
+                lottery_errors[key] = str(e)
+
+        existing_user_ids = await self.participant_repo.get_existing_ids(item.user_id for _, item, _ in valid_rows)
+
+        pending: List[Tuple[int, int, int, date]] = []
+        for index, item, target_date in valid_rows:
+            key = (target_date, item.lottery_date is not None)
+            if key in lottery_errors:
+                results[index] = BallotBulkResult(index=index, status="failed", user_id=item.user_id, error=lottery_errors[key])
+            elif item.user_id not in existing_user_ids:
+                results[index] = BallotBulkResult(index=index, status="failed", user_id=item.user_id, error=f"Participant {item.user_id} not found.")
+            else:
+                pending.append((index, item.user_id, lottery_ids[key], target_date))
+
+        for start in range(0, len(pending), BULK_CHUNK_SIZE):
+            chunk = pending[start:start + BULK_CHUNK_SIZE]
+            try:
+                created = await self.ballot_repo.create_ballots_bulk([(user_id, lottery_id, target_date) for _, user_id, lottery_id, target_date in chunk])
             except Exception as e:
-                logger.error(f"Ballot creation in repository failed for user {req.user_id}, lottery {lottery.lottery_id}: {e}")
-                raise BallotCreationError(req.user_id, lottery.lottery_id, str(e))
+                logger.error(f"Bulk ballot chunk of {len(chunk)} rows failed: {e}")
+                for index, user_id, lottery_id, _ in chunk:
+                    results[index] = BallotBulkResult(index=index, status="failed", user_id=user_id, lottery_id=lottery_id, error=str(e))
+                continue
+            for (index, _, _, _), ballot in zip(chunk, created):
+                results[index] = BallotBulkResult(
+                    index=index,
+                    status="created",
+                    ballot_id=ballot.ballot_id,
+                    user_id=ballot.user_id,
+                    lottery_id=ballot.lottery_id,
+                    ballot_number=ballot.ballot_number,
+                    expiry_date=ballot.expiry_date,
+                )
 
-            response = BallotResponse.model_validate(ballot_model)
-            logger.info("Ballot %s submitted successfully for lottery %s (user %s)",
-                        ballot_model.ballot_id, lottery.lottery_id, req.user_id)
-            return response
-        logger.error(f"Ballot creation in service failed for user {req.user_id}")
-        raise LotteryNotFoundError(identifier=req.expiry_date)
+        duration = time.perf_counter() - started
+        created_count = sum(1 for r in results.values() if r.status == "created")
+        logger.info("Bulk batch done: %s created, %s failed in %.1fms", created_count, len(results) - created_count, duration * 1000)
+        return BallotBulkResponse(
+            created=created_count,
+            failed=len(results) - created_count,
+            duration_ms=round(duration * 1000, 3),
+            ballots_per_second=round(created_count / duration, 3) if duration > 0 else 0.0,
+            results=[results[index] for index in sorted(results)],
+        )
 
-    def list_ballots_by_user(self, user_id: int) -> List[BallotResponse]:
+    async def list_ballots_by_user(self, user_id: int, limit: int, after: Optional[int] = None) -> Page[RowDict]:
         """
-        Lists all ballots submitted by a given user.
+        Lists one page of the ballots submitted by a given user, ordered by ballot ID,
+        starting after the ballot ID `after`.
         Raises:
             BallotsNotFoundErrorForUser: If the user has no registered ballots.
             BallotServiceError: For other repository/listing errors.
         """
         logger.debug(f"Listing ballots for user ID: {user_id}")
         try:
-            ballot_models: List[Ballot] = self.ballot_repo.list_by_user(user_id=user_id)
-            if not ballot_models:
+            ballot_page: Page[Row] = await self.ballot_repo.list_by_user(user_id=user_id, limit=limit, after=after)
+            if not ballot_page.items and after is None:
                 logger.info(f"No ballots found for user ID {user_id}.")
                 raise BallotsNotFoundErrorForUser(user_id=user_id)
 
-            ballot_list = [BallotResponse.model_validate(p) for p in ballot_models]
+            ballot_list = [_ballot_row(p) for p in ballot_page.items]
             logger.info(f"Found {len(ballot_list)} ballots for user ID {user_id}.")
-            return ballot_list
+            return Page(items=ballot_list, next_key=ballot_page.next_key)
         except BallotsNotFoundErrorForUser: 
             raise
         except Exception as e: 
             logger.error(f"Error listing ballots for user {user_id}: {e}")
             raise BallotServiceError(f"Could not retrieve ballots for user {user_id}: {str(e)}")
 
+    async def stream_ballots_by_user(self, user_id: int) -> AsyncIterator[RowDict]:
+        """Yields every ballot of a user, ordered by ballot ID, through a server-side cursor (NDJSON exports)."""
+        logger.debug(f"Streaming ballots for user ID: {user_id}")
+        async for ballot_model in self.ballot_repo.stream_by_user(user_id=user_id):
+            yield _ballot_row(ballot_model)
+
+    async def list_ballots_by_lottery(self, lottery_id: int, limit: int, after: Optional[int] = None) -> Page[RowDict]:
+        """
+        Lists one page of the ballots of a lottery, ordered by ballot ID, starting after the ballot ID `after`.
+        Raises:
+            BallotServiceError: For repository/listing errors.
+        """
+        logger.debug(f"Listing ballots for lottery ID: {lottery_id}")
+        try:
+            ballot_page: Page[Row] = await self.ballot_repo.list_by_lottery(lottery_id=lottery_id, limit=limit, after=after)
+        except Exception as e:
+            logger.error(f"Error listing ballots for lottery {lottery_id}: {e}")
+            raise BallotServiceError(f"Could not retrieve ballots for lottery {lottery_id}: {str(e)}")
+        return Page(
+            items=[_ballot_row(b) for b in ballot_page.items],
+            next_key=ballot_page.next_key,
+        )
+
+    async def stream_ballots_by_lottery(self, lottery_id: int) -> AsyncIterator[RowDict]:
+        """Yields every ballot of a lottery, ordered by ballot ID, through a server-side cursor (NDJSON exports)."""
+        logger.debug(f"Streaming ballots for lottery ID: {lottery_id}")
+        async for ballot_model in self.ballot_repo.stream_by_lottery(lottery_id=lottery_id):
+            yield _ballot_row(ballot_model)
+
+
+async def get_ballot_service_provider(session: AsyncSession = Depends(db.get_db)) -> BallotService:
+    """Provider for routes: the service on the request's unit of work (see Database.get_db)."""
+    return BallotService.for_session(session)
+
 
+async def get_ballot_read_service_provider(session: AsyncSession = Depends(db.get_read_db)) -> BallotService:
+    """Provider for read-only routes: the service on a read replica session (see Database.get_read_db)."""
+    return BallotService.for_session(session)
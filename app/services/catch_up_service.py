@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from datetime import date
+from typing import List, Optional
+from fastapi import Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import db
+from app.repositories.lottery_repository import (
+    LotteryRepository,
+    get_lottery_repository_provider,
+)
+from app.repositories.interfaces.lottery_repo_interface import LotteryRepositoryInterface
+from app.schemas.lottery import LotteryDrawReport, CatchUpDrawResponse
+from app.services.lottery_service import LotteryService
+from app.middleware.exceptions.lottery_service_exceptions import NoBallotsFoundError
+
+logger = logging.getLogger("app")
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_WORKERS = 4
+
+
+class CatchUpDrawService:
+    """
+    Draws every open lottery dated before today, e.g. after the nightly close was missed.
+    Lotteries are fetched in bounded batches and up to `workers` of them are drawn
+    concurrently; each draw uses its own session, so every draw keeps its own transaction.
+    """
+    def __init__(
+        self,
+        lottery_repo: LotteryRepositoryInterface = Depends(get_lottery_repository_provider),
+    ) -> None:
+        self.lottery_repo = lottery_repo
+        logger.debug("Initialized CatchUpDrawService with repo: %s", self.lottery_repo)
+
+    async def draw_overdue_lotteries(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = DEFAULT_WORKERS,
+        before_date: Optional[date] = None,
+    ) -> CatchUpDrawResponse:
+        """
+        Closes and draws all open lotteries dated before `before_date` (default: today),
+        oldest first. A failing lottery is reported and does not stop the run.
+        """
+        before_date = before_date or date.today()
+        logger.info(
+            "CatchUp: Drawing open lotteries before %s (batch size %s, %s workers)",
+            before_date, batch_size, workers
+        )
+        started = time.perf_counter()
+        reports: List[LotteryDrawReport] = []
+        last_date: Optional[date] = None
+
+        slots = asyncio.Semaphore(workers)
+
+        async def draw_in_slot(lottery_id: int, lottery_date: date) -> LotteryDrawReport:
+            async with slots:
+                return await self._draw_one(lottery_id, lottery_date)
+
+        while True:
+            batch = await self.lottery_repo.list_open_before(before_date, after_date=last_date, limit=batch_size)
+            targets = [(l.lottery_id, l.lottery_date) for l in batch]
+            # End the read transaction: draws run on their own sessions.
+            await self.lottery_repo.rollback()
+            if not targets:
+                break
+            logger.info("CatchUp: Drawing batch of %s lotteries (%s .. %s)", len(targets), targets[0][1], targets[-1][1])
+            reports.extend(await asyncio.gather(*(draw_in_slot(*t) for t in targets)))
+            last_date = targets[-1][1]
+            if len(targets) < batch_size:
+                break
+
+        duration = time.perf_counter() - started
+        drawn = sum(1 for r in reports if r.status == "drawn")
+        failed = sum(1 for r in reports if r.status == "failed")
+        logger.info(
+            "CatchUp: Finished %s lotteries in %.1fms (%s drawn, %s failed)",
+            len(reports), duration * 1000, drawn, failed
+        )
+        return CatchUpDrawResponse(
+            before_date=before_date,
+            lotteries_found=len(reports),
+            drawn=drawn,
+            failed=failed,
+            duration_ms=round(duration * 1000, 3),
+            lotteries_per_second=round(len(reports) / duration, 3) if duration > 0 else 0.0,
+            reports=reports,
+        )
+
+    async def _draw_one(self, lottery_id: int, lottery_date: date) -> LotteryDrawReport:
+        """Draws a single lottery on a fresh session and reports the outcome and its throughput."""
+        started = time.perf_counter()
+        status, detail = "drawn", None
+        winning_ballot_id: Optional[int] = None
+        ballot_count: Optional[int] = None
+        try:
+            async with db.session_scope() as session:
+                winner, ballot_count = await LotteryService.for_session(session).close_and_draw_by_date(lottery_date)
+            winning_ballot_id = winner.ballot_id
+        except NoBallotsFoundError as e:
+            status, detail, ballot_count = "no_ballots", str(e), 0
+        except HTTPException as e:
+            status, detail = "skipped", str(e.detail)
+        except Exception as e:
+            logger.error("CatchUp: Draw failed for lottery %s (date %s): %s", lottery_id, lottery_date, e, exc_info=True)
+            status, detail = "failed", str(e)
+
+        duration = time.perf_counter() - started
+        ballots_per_second = None
+        if ballot_count and duration > 0:
+            ballots_per_second = round(ballot_count / duration, 3)
+        return LotteryDrawReport(
+            lottery_id=lottery_id,
+            lottery_date=lottery_date,
+            status=status,
+            winning_ballot_id=winning_ballot_id,
+            ballot_count=ballot_count,
+            duration_ms=round(duration * 1000, 3),
+            ballots_per_second=ballots_per_second,
+            detail=detail,
+        )
+
+
+async def get_catch_up_service_provider(session: AsyncSession = Depends(db.get_db)) -> CatchUpDrawService:
+    """Provider for routes: the service on the request's session (see Database.get_db)."""
+    return CatchUpDrawService(lottery_repo=LotteryRepository(session))
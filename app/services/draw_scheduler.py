@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import func, select
+from app.db.database import db
+from app.repositories.draw_run_repository import (
+    DrawRunRepository,
+    RUN_FAILED,
+    RUN_SUCCEEDED,
+)
+from app.repositories.lottery_repository import LotteryRepository
+from app.services.catch_up_service import CatchUpDrawService
+
+logger = logging.getLogger("app")
+
+
+class DrawScheduler:
+    """
+    Runs the nightly close-and-draw inside the application instead of an external cron job.
+
+    Every replica runs a scheduler, but a run only proceeds on the replica that wins
+    a Postgres advisory lock; the others re-check later in case the leader dies.
+    Each day's outcome is stored in `drawruns`, so a restart resumes an unfinished
+    or failed day and never redraws a day that already succeeded. The draw itself is
+    the catch-up draw, so nights missed while the service was down are drawn as well.
+    """
+    def __init__(self):
+        self.enabled = os.getenv("DRAW_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.run_at = time.fromisoformat(os.getenv("DRAW_SCHEDULE_TIME", "00:00"))
+        self.retry_seconds = int(os.getenv("DRAW_RETRY_SECONDS", "300"))
+        self.lock_key = int(os.getenv("DRAW_LEADER_LOCK_KEY", "724001"))
+        self._task: Optional[asyncio.Task] = None
+        self._retry_pending = False
+
+    async def start(self) -> None:
+        """Starts the scheduling loop on the running event loop."""
+        if not self.enabled:
+            logger.info("DrawScheduler: Disabled (DRAW_SCHEDULER_ENABLED is false).")
+            return
+        logger.info("DrawScheduler: Starting; daily draw at %s", self.run_at.isoformat())
+        self._task = asyncio.create_task(self._loop(), name="draw-scheduler")
+
+    async def stop(self) -> None:
+        """
+        Cancels the scheduling loop. An in-flight draw is cancelled with it: its transaction
+        rolls back and the day's run stays unfinished, so the next start resumes it.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("DrawScheduler: Stopped.")
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_if_due()
+            except Exception as e:
+                self._retry_pending = True
+                logger.error("DrawScheduler: Scheduled draw check failed: %s", e, exc_info=True)
+            await asyncio.sleep(self._seconds_until_next_check())
+
+    def _seconds_until_next_check(self) -> float:
+        now = datetime.now()
+        next_run = datetime.combine(now.date(), self.run_at)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        delay = (next_run - now).total_seconds()
+        if self._retry_pending:
+            delay = min(delay, self.retry_seconds)
+        return max(delay, 1.0)
+
+    async def run_if_due(self) -> None:
+        """
+        Draws today's run if its scheduled time has passed and it has not succeeded yet.
+        Only the replica holding the leader lock draws; it holds the lock for the whole run
+        in a dedicated transaction, so the lock is released even if the process dies.
+        """
+        now = datetime.now()
+        run_date = now.date()
+        self._retry_pending = False
+        if now.time() < self.run_at or await self._run_succeeded(run_date):
+            return
+
+        async with db.engine.connect() as leader_conn:
+            async with leader_conn.begin():
+                is_leader = (await leader_conn.execute(select(func.pg_try_advisory_xact_lock(self.lock_key)))).scalar()
+                if not is_leader:
+                    logger.info("DrawScheduler: Another replica holds the draw lock for %s; re-checking later.", run_date)
+                    self._retry_pending = True
+                    return
+                # Re-check under the lock: the previous leader may have just finished.
+                if await self._run_succeeded(run_date):
+                    return
+                self._retry_pending = not await self._draw(run_date)
+
+    async def _run_succeeded(self, run_date: date) -> bool:
+        async with db.SessionLocal() as session:
+            run = await DrawRunRepository(session).get_by_date(run_date)
+            return run is not None and run.status == RUN_SUCCEEDED
+
+    async def _draw(self, run_date: date) -> bool:
+        """Performs and records the run of run_date. Returns True if every lottery was handled."""
+        logger.info("DrawScheduler: Leader for %s; drawing overdue lotteries.", run_date)
+        async with db.session_scope() as session:
+            await DrawRunRepository(session).start_run(run_date)
+
+        status, drawn, detail = RUN_FAILED, 0, None
+        try:
+            async with db.SessionLocal() as session:
+                result = await CatchUpDrawService(lottery_repo=LotteryRepository(session)).draw_overdue_lotteries(before_date=run_date)
+            drawn = result.drawn
+            if result.failed:
+                detail = f"{result.failed} of {result.lotteries_found} lotteries failed to draw."
+            else:
+                status = RUN_SUCCEEDED
+        except Exception as e:
+            logger.error("DrawScheduler: Draw run for %s failed: %s", run_date, e, exc_info=True)
+            detail = str(e)
+
+        async with db.session_scope() as session:
+            await DrawRunRepository(session).finish_run(run_date, status, drawn, detail)
+        logger.info("DrawScheduler: Run for %s %s (%s lotteries drawn).", run_date, status, drawn)
+        return status == RUN_SUCCEEDED
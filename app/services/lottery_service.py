@@ -1,28 +1,37 @@
 import logging
+import os
 from datetime import date, timedelta
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 import random
 from app.db.database import db  
 from app.schemas.ballots import BallotResponse
 from app.schemas.lottery import LotteryResponse
+from app.schemas.pagination import Page
+from app.schemas.rows import RowDict, row_mapper
 from fastapi import Depends,HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.participant_repository import (
+   ParticipantRepository,
    get_participant_repository_provider,
 )
 from app.repositories.lottery_repository import (
+   LotteryRepository,
    get_lottery_repository_provider,
 )
 from app.repositories.ballot_repository import (
+    BallotRepository,
     get_ballot_repository_provider,
 )
 from app.repositories.winner_ballots_repository import (
+    WinningBallotRepository,
     get_winning_ballot_repository_provider,
 )
 from app.repositories.interfaces.ballot_repo_interface import BallotRepositoryInterface
 from app.repositories.interfaces.lottery_repo_interface import LotteryRepositoryInterface
 from app.repositories.interfaces.participant_repo_interface import ParticipantRepositoryInterface
 from app.repositories.interfaces.winner_ballots_repo_interface import WinningBallotRepositoryInterface
+from app.models.lottery import Lottery
+from app.cache.lottery_cache import lottery_id_cache
 from app.schemas.winning_ballot import(
     WinningBallotResponse
 )
@@ -40,6 +49,12 @@ from app.middleware.exceptions.lottery_service_exceptions import (
 
 logger = logging.getLogger("app")
 
+_lottery_row = row_mapper(LotteryResponse)
+
+# "offset" (default) draws by counting ballots and picking a random position;
+# "rank" reads the ballot with the lowest precomputed draw_rank, so closing is O(1) in ballot count.
+DRAW_MODE = os.getenv("DRAW_MODE", "offset").lower()
+
 
 
 class LotteryService:
@@ -57,200 +72,254 @@ class LotteryService:
         logger.debug("Initialized LotteryService with repos: %s, %s, %s, %s",
                      self.participant_repo, self.lottery_repo, self.ballot_repo, self.winning_repo)
 
+    @classmethod
+    def for_session(cls, session: AsyncSession) -> "LotteryService":
+        """Wires the service with repositories sharing one dedicated session (workers, streamed responses)."""
+        return cls(
+            participant_repo=ParticipantRepository(session),
+            lottery_repo=LotteryRepository(session),
+            ballot_repo=BallotRepository(session),
+            winning_repo=WinningBallotRepository(session),
+        )
 
-    def close_lottery_and_draw(self) -> WinningBallotResponse: # Return type changed
+
+    async def close_lottery_and_draw(self, closing_date: Optional[date] = None) -> WinningBallotResponse: # Return type changed
         """
         Closes *yesterday’s* lottery (i.e., the one whose date was “today - 1 day”)
-        and selects a random winning ballot.
+        and selects a random winning ballot. Pass `closing_date` to draw another day.
 
-        Note: This method relies on individual repository operations being atomic.
-        Data consistency across multiple distinct repository calls (e.g., creating
-        a winner, then closing the lottery) is not guaranteed by this method if an
-        operation fails mid-sequence.
+        The draw is a single unit of work: the lottery row is locked with
+        SELECT ... FOR NO KEY UPDATE SKIP LOCKED, the winner is inserted and the lottery
+        is flagged closed (pipelined in one round-trip with psycopg), and one commit
+        publishes both.
+        Any failure rolls the whole draw back, so the lottery stays open for a retry.
 
         Returns:
             WinningBallotResponse: The details of the winning ballot if one is drawn.
 
         Raises:
             HTTPException (status_code=404): If no lottery existed for yesterday.
-            HTTPException (status_code=409): If the lottery for yesterday was already closed.
-            NoBallotsFoundError: If the lottery was successfully closed (by its repository call)
-                                 but had no ballots submitted.
-            WinnerPersistenceError: If saving the winning ballot record fails.
-            LotteryUpdateError: If updating the lottery's 'closed' status fails.
-            # Other underlying database exceptions might propagate if not caught by repository layers.
+            HTTPException (status_code=409): If the lottery for yesterday was already closed,
+                                             or another close call currently holds its row lock.
+            NoBallotsFoundError: If the lottery had no ballots; it is closed without a winner.
+            WinnerPersistenceError: If saving the winning ballot record or closing the lottery fails.
+            LotteryUpdateError: If closing a lottery without ballots or committing the draw fails.
+        """
+        if closing_date is None:
+            closing_date = date.today() - timedelta(days=1)
+        response, _ = await self.close_and_draw_by_date(closing_date)
+        return response
+
+    async def close_and_draw_by_date(self, closing_date: date) -> Tuple[WinningBallotResponse, Optional[int]]:
+        """
+        Closes the lottery of `closing_date` and draws its winner, as described in
+        `close_lottery_and_draw`. Also returns how many ballots the draw picked from,
+        or None when the draw mode does not count them.
         """
-        closing_date = date.today() - timedelta(days=1)
-        logger.info("Service: Attempting to close and draw for lottery date %s (session management ignored)", closing_date)
+        logger.info("Service: Attempting to close and draw for lottery date %s", closing_date)
 
-        lottery = self.lottery_repo.get_by_date(closing_date)
+        lottery = await self.lottery_repo.lock_by_date(closing_date)
         if lottery is None:
-            logger.warning("Service: No lottery found for %s; cannot close or draw.", closing_date)
-            raise HTTPException(status_code=404, detail=f"No lottery found for given date: {closing_date}")
+            existing_lottery = await self.lottery_repo.get_by_date(closing_date)
+            # Read the id before rolling back: rollback expires the instance and an async session cannot reload it implicitly.
+            existing_id = existing_lottery.lottery_id if existing_lottery is not None else None
+            await self.lottery_repo.rollback()
+            if existing_id is None:
+                logger.warning("Service: No lottery found for %s; cannot close or draw.", closing_date)
+                raise HTTPException(status_code=404, detail=f"No lottery found for given date: {closing_date}")
+            logger.warning("Service: Lottery %s (date %s) is locked by a concurrent close; skipping.", existing_id, closing_date)
+            raise HTTPException(status_code=409, detail=f"Lottery for date {closing_date} (ID: {existing_id}) is already being closed.")
 
+        try:
+            return await self._draw_locked_lottery(lottery, closing_date)
+        except Exception:
+            await self.lottery_repo.rollback()
+            raise
+        finally:
+            # Ballots must stop resolving to this lottery once it is closed.
+            lottery_id_cache.invalidate(closing_date)
+
+    async def _draw_locked_lottery(self, lottery: Lottery, closing_date: date) -> Tuple[WinningBallotResponse, Optional[int]]:
+        """
+        Draws a winner for a lottery whose row is locked by the current transaction,
+        closes it and commits. The caller rolls back if anything raises.
+        Returns the winner and the number of ballots it was drawn from (None if not counted).
+        """
         if lottery.closed:
             logger.info("Service: Lottery %s (date %s) already closed; skipping.", lottery.lottery_id, closing_date)
             raise HTTPException(status_code=409, detail=f"Lottery for date {closing_date} (ID: {lottery.lottery_id}) is already closed.")
 
-        ballots = self.ballot_repo.list_by_lottery(lottery.lottery_id)
-        win_record_model = None 
+        winner_ballot_id, ballot_count = await self._pick_winner_ballot_id(lottery.lottery_id)
 
-        if not ballots:
+        if winner_ballot_id is None:
             logger.warning(
-                "Service: No ballots submitted for lottery %s on %s. Attempting to close without a winner.",
+                "Service: No ballots submitted for lottery %s on %s. Closing without a winner.",
                 lottery.lottery_id, closing_date
             )
-            try:
-                closed_lottery_no_ballots = self.lottery_repo.mark_as_closed(lottery.lottery_id)
-                if not closed_lottery_no_ballots or not closed_lottery_no_ballots.closed:
-                    raise LotteryUpdateError(
-                        lottery_id=lottery.lottery_id,
-                        operation="mark_as_closed_no_ballots",
-                        reason="Repository failed to confirm lottery closure or returned an unexpected state."
-                    )
-                logger.info("Service: Lottery %s (assumed) marked as closed by repository (no ballots).", lottery.lottery_id)
-                raise NoBallotsFoundError(lottery_id=lottery.lottery_id, lottery_date=closing_date)
-            except NoBallotsFoundError:
-                raise
-            except Exception as e_close_no_ballot:
-                logger.error(
-                    "Service: Failed to process lottery %s closure (no ballots scenario): %s",
-                    lottery.lottery_id, e_close_no_ballot, exc_info=True
-                )
-                if not isinstance(e_close_no_ballot, LotteryUpdateError):
-                    raise LotteryUpdateError(
-                        lottery_id=lottery.lottery_id,
-                        operation="mark_as_closed_no_ballots",
-                        reason=str(e_close_no_ballot)
-                    ) from e_close_no_ballot
-                else:
-                    raise 
-
-        winner_ballot = random.choice(ballots)
+            await self._close_locked_lottery(lottery.lottery_id, operation="mark_as_closed_no_ballots")
+            lottery_id = lottery.lottery_id
+            await self.lottery_repo.commit()
+            logger.info("Service: Lottery %s marked as closed (no ballots).", lottery_id)
+            raise NoBallotsFoundError(lottery_id=lottery_id, lottery_date=closing_date)
+
         logger.info(
-            "Service: Selected winner ballot %s for lottery %s on %s",
-            winner_ballot.ballot_id, lottery.lottery_id, closing_date
+            "Service: Selected winner ballot %s (out of %s) for lottery %s on %s",
+            winner_ballot_id, ballot_count, lottery.lottery_id, closing_date
         )
 
+        # Winner and closure read nothing back: pipelined (psycopg), they share one round-trip.
+        # A pipelined error may surface at the later statement, so both map to one error.
         try:
-            win_record_model = self.winning_repo.create_winning_ballot(
-                lottery_id=lottery.lottery_id,
-                ballot_id=winner_ballot.ballot_id,
-                winning_date=closing_date,
-            )
-            if win_record_model is None:
-                raise WinnerPersistenceError(lottery.lottery_id, winner_ballot.ballot_id, "Repository returned None upon winning ballot creation.")
-            logger.info("Service: Winning record (assumed) created by repository for lottery %s: ballot %s",
-                        lottery.lottery_id, winner_ballot.ballot_id)
+            async with self.winning_repo.pipeline():
+                win_record_model = await self.winning_repo.add_winning_ballot(
+                    lottery_id=lottery.lottery_id,
+                    ballot_id=winner_ballot_id,
+                    winning_date=closing_date,
+                )
+                await self.lottery_repo.close_locked(lottery.lottery_id)
         except Exception as e_persist:
-            logger.error("Service: Failed to persist winning ballot for lottery %s: %s", lottery.lottery_id, e_persist, exc_info=True)
+            logger.error("Service: Failed to persist the draw of lottery %s: %s", lottery.lottery_id, e_persist, exc_info=True)
             raise WinnerPersistenceError(
                 lottery_id=lottery.lottery_id,
-                ballot_id=winner_ballot.ballot_id,
+                ballot_id=winner_ballot_id,
                 reason=str(e_persist)
             ) from e_persist
 
-
+        # Build the response before committing: commit expires loaded instances.
+        response = WinningBallotResponse.model_validate(win_record_model)
         try:
-            closed_lottery_with_winner = self.lottery_repo.mark_as_closed(lottery.lottery_id)
-            if not closed_lottery_with_winner or not closed_lottery_with_winner.closed:
-                raise LotteryUpdateError(
-                    lottery_id=lottery.lottery_id,
-                    operation="mark_as_closed_after_draw",
-                    reason="Repository failed to confirm lottery closure or returned an unexpected state after draw."
-                )
-            logger.info("Service: Lottery %s (assumed) marked as closed by repository after successful draw.", lottery.lottery_id)
-        except Exception as e_close_final:
-            logger.error(
-                "Service: CRITICAL - Failed to mark lottery %s as closed AFTER winner persistence. DATA INCONSISTENCY IS LIKELY: %s",
-                lottery.lottery_id, e_close_final, exc_info=True
-            )
-            # A winner IS PERSISTED, but lottery closing FAILED.
+            await self.lottery_repo.commit()
+        except Exception as e_commit:
+            logger.error("Service: Failed to commit draw for lottery %s: %s", lottery.lottery_id, e_commit, exc_info=True)
             raise LotteryUpdateError(
                 lottery_id=lottery.lottery_id,
-                operation="mark_as_closed_after_draw_CRITICAL",
-                reason=f"Winner persisted, but final lottery closure failed. Data inconsistency likely. Reason: {str(e_close_final)}"
-            ) from e_close_final
+                operation="commit_draw",
+                reason=str(e_commit)
+            ) from e_commit
+
+        logger.info("Service: Lottery %s closed with winner ballot %s for date %s.", response.lottery_id, winner_ballot_id, closing_date)
+        return response, ballot_count
+
+    async def _pick_winner_ballot_id(self, lottery_id: int) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Picks the winning ballot of a lottery without loading its ballots.
+        Returns (ballot_id, ballot_count); ballot_id is None if the lottery has no ballots.
 
-        # If all individual repository operations succeeded in sequence:
-        logger.info("Service: Lottery close and draw process for date %s completed all steps.", closing_date)
-        return WinningBallotResponse.model_validate(win_record_model)
+        In "rank" draw mode the winner is the ballot with the lowest draw_rank, assigned
+        at insert time: a single index probe whose cost does not depend on the number of
+        ballots, so the count is not computed (None). Otherwise the ballots are counted
+        and the one at a random position is taken. A lottery holding ballots from before
+        ranks were assigned (NULL draw_rank) is drawn by position too, so those ballots
+        keep their chance.
+        """
+        if DRAW_MODE == "rank":
+            if not await self.ballot_repo.has_unranked_ballots(lottery_id):
+                return await self.ballot_repo.get_lowest_ranked_ballot_id(lottery_id), None
+            logger.info("Service: Lottery %s has ballots without a draw rank, drawing by position", lottery_id)
+
+        ballot_count = await self.ballot_repo.count_by_lottery(lottery_id)
+        if ballot_count == 0:
+            return None, 0
+        ballot_id = await self.ballot_repo.get_ballot_id_at(lottery_id, random.randrange(ballot_count))
+        if ballot_id is None:
+            raise LotteryServiceError(
+                f"Ballot set for lottery {lottery_id} changed during the draw; no ballot found at the drawn position."
+            )
+        return ballot_id, ballot_count
+
+    async def _close_locked_lottery(self, lottery_id: int, operation: str) -> None:
+        """Flags a locked lottery as closed inside the current transaction."""
+        try:
+            await self.lottery_repo.close_locked(lottery_id)
+        except Exception as e_close:
+            logger.error("Service: Failed to mark lottery %s as closed: %s", lottery_id, e_close, exc_info=True)
+            raise LotteryUpdateError(lottery_id=lottery_id, operation=operation, reason=str(e_close)) from e_close
 
-    def create_lottery(self, target_date: date) -> LotteryResponse:
+    async def create_lottery(self, target_date: date) -> LotteryResponse:
         """
         Creates a new lottery for the specified date.
         Raises LotteryAlreadyExistsError if a lottery for that date already exists.
         Raises LotteryServiceError if creation fails.
         """
         logger.info(f"Attempting to create lottery for date: {target_date}")
-        existing_lottery = self.lottery_repo.get_by_date(target_date)
-        if existing_lottery:
-            logger.warning(f"Lottery already exists for date {target_date} with ID {existing_lottery.lottery_id}")
-            raise LotteryAlreadyExistsError(target_date)
         try:
-            lottery_model = self.lottery_repo.create_lottery(input_date=target_date)
-            if lottery_model is None: 
-                logger.error(f"Repository returned None when creating lottery for date {target_date}.")
-                raise LotteryCreationError(target_date, "Repository returned None.")
+            lottery_model = await self.lottery_repo.create_lottery(input_date=target_date)
         except Exception as e:
             logger.error(f"Repository failed to create lottery for date {target_date}: {e}")
             raise LotteryCreationError(target_date, str(e))
+        if lottery_model is None:
+            logger.warning(f"Lottery already exists for date {target_date}")
+            raise LotteryAlreadyExistsError(target_date)
 
         logger.info(f"Successfully created lottery ID {lottery_model.lottery_id} for date {target_date}")
         return LotteryResponse.model_validate(lottery_model)
 
-    def get_lottery(self, lottery_id: int) -> LotteryResponse:
+    async def get_lottery(self, lottery_id: int) -> LotteryResponse:
         """
         Retrieves a lottery by its ID.
         Raises LotteryNotFoundError if not found.
         """
         logger.debug(f"Fetching lottery by ID: {lottery_id}")
-        lottery_model = self.lottery_repo.get_lottery(lottery_id)
+        lottery_model = await self.lottery_repo.get_lottery(lottery_id)
         if lottery_model is None:
             logger.warning(f"Lottery with ID {lottery_id} not found.")
             raise LotteryNotFoundError(identifier=lottery_id)
         return LotteryResponse.model_validate(lottery_model)
 
-    def get_lottery_by_target_date(self, target_date: date) -> LotteryResponse:
+    async def get_lottery_by_target_date(self, target_date: date) -> LotteryResponse:
         """
         Retrieves a lottery by its target date.
         Raises LotteryNotFoundError if not found.
         """
         logger.debug(f"Fetching lottery by date: {target_date}")
-        lottery_model = self.lottery_repo.get_by_date(target_date)
+        lottery_model = await self.lottery_repo.get_by_date(target_date)
         if lottery_model is None:
             logger.warning(f"Lottery for date {target_date} not found.")
             raise LotteryNotFoundError(identifier=target_date)
         return LotteryResponse.model_validate(lottery_model)
 
-    def get_all_lotteries(self) -> List[LotteryResponse]:
+    async def get_all_lotteries(
+        self, limit: int, after: Optional[int] = None,
+        from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> Page[RowDict]:
         """
-        Retrieves all lotteries.
+        Retrieves one page of lotteries, ordered by lottery ID, starting after the lottery ID `after`.
+        `from_date` and `to_date` (inclusive) restrict the lotteries to a date range.
         """
-        logger.debug("Fetching all lotteries.")
+        logger.debug(f"Fetching lotteries from {from_date} to {to_date} after {after} (limit {limit}).")
         try:
-            lottery_models = self.lottery_repo.list_lotteries()
-            return [LotteryResponse.model_validate(l) for l in lottery_models]
+            lottery_page = await self.lottery_repo.list_lotteries(limit=limit, after=after, from_date=from_date, to_date=to_date)
+            return Page(
+                items=[_lottery_row(l) for l in lottery_page.items],
+                next_key=lottery_page.next_key,
+            )
         except Exception as e:
             logger.error(f"Error fetching all lotteries: {e}")
             raise LotteryServiceError(f"Failed to retrieve all lotteries: {str(e)}")
 
 
-    def get_open_lotteries(self) -> List[LotteryResponse]:
+    async def stream_all_lotteries(
+        self, from_date: Optional[date] = None, to_date: Optional[date] = None
+    ) -> AsyncIterator[RowDict]:
+        """Yields every lottery in the optional date range, ordered by lottery ID, through a server-side cursor (NDJSON exports)."""
+        logger.debug("Streaming lotteries from %s to %s.", from_date, to_date)
+        async for lottery_model in self.lottery_repo.stream_lotteries(from_date=from_date, to_date=to_date):
+            yield _lottery_row(lottery_model)
+
+    async def get_open_lotteries(self) -> List[RowDict]:
         """
         Retrieves all lotteries that are currently open (not closed).
         """
         logger.debug("Fetching all open lotteries.")
         try:
-            all_lotteries = self.lottery_repo.list_lotteries()
-            open_lotteries = [l for l in all_lotteries if not l.closed]
-            return [LotteryResponse.model_validate(l) for l in open_lotteries]
+            open_lotteries = await self.lottery_repo.list_open()
+            return [_lottery_row(l) for l in open_lotteries]
         except Exception as e:
             logger.error(f"Error fetching open lotteries: {e}")
             raise LotteryServiceError(f"Failed to retrieve open lotteries: {str(e)}")
 
 
-    def get_active_lottery_for_today(self) -> Optional[LotteryResponse]:
+    async def get_active_lottery_for_today(self) -> Optional[LotteryResponse]:
         """
         Retrieves the active (open) lottery for the current date.
         Returns None if no lottery exists for today or if it's already closed.
@@ -259,7 +328,7 @@ class LotteryService:
         today = date.today()
 
         try:
-            lottery_model = self.lottery_repo.get_by_date(today)
+            lottery_model = await self.lottery_repo.get_by_date(today)
         except Exception as e:
             logger.error(f"Error fetching lottery for today ({today}): {e}")
             raise LotteryServiceError(f"Failed to retrieve open lotteries for today: {str(e)}")
@@ -271,3 +340,13 @@ class LotteryService:
             logger.info(f"Lottery for today (ID: {lottery_model.lottery_id}) found but is closed.")
         elif not lottery_model:
             logger.info(f"No lottery found for today ({today}).")
+
+
+async def get_lottery_service_provider(session: AsyncSession = Depends(db.get_db)) -> LotteryService:
+    """Provider for routes: the service on the request's unit of work (see Database.get_db)."""
+    return LotteryService.for_session(session)
+
+
+async def get_lottery_read_service_provider(session: AsyncSession = Depends(db.get_read_db)) -> LotteryService:
+    """Provider for read-only routes: the service on a read replica session (see Database.get_read_db)."""
+    return LotteryService.for_session(session)
@@ -1,15 +1,20 @@
 import logging
-from typing import Optional, List
+import time
+from typing import AsyncIterator, Dict, Optional, List, Tuple
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import db 
 from app.models.participant import Participant
-from app.repositories.participant_repository import ( get_participant_repository_provider)
-from app.repositories.ballot_repository import ( get_ballot_repository_provider)
+from app.schemas.bulk import BulkRow
+from app.schemas.pagination import Page
+from app.schemas.rows import RowDict, row_mapper
+from app.repositories.participant_repository import ( ParticipantRepository, get_participant_repository_provider)
+from app.repositories.ballot_repository import ( BallotRepository, get_ballot_repository_provider)
 from app.repositories.interfaces.ballot_repo_interface import BallotRepositoryInterface
 from app.repositories.interfaces.participant_repo_interface import ParticipantRepositoryInterface
 from app.schemas.participant import (
-    ParticipantCreate, ParticipantResponse,
+    ParticipantCreate, ParticipantResponse, ParticipantBulkResult, ParticipantBulkResponse,
 )
 from app.middleware.exceptions.participant_service_exceptions import (
     ParticipantServiceError,
@@ -21,6 +26,11 @@ from app.middleware.exceptions.participant_service_exceptions import (
 
 logger = logging.getLogger("app")
 
+# Rows per set-based INSERT ... ON CONFLICT DO NOTHING RETURNING in bulk registrations
+BULK_CHUNK_SIZE = 1000
+
+_participant_row = row_mapper(ParticipantResponse)
+
 class ParticipantService:
     """
     Service for managing lottery participants.
@@ -37,7 +47,12 @@ class ParticipantService:
         self.participant_repo: ParticipantRepositoryInterface = participant_repo
         logger.debug("Initialized ParticipantService with ParticipantRepository: %s", self.participant_repo)
 
-    def register_participant(
+    @classmethod
+    def for_session(cls, session: AsyncSession) -> "ParticipantService":
+        """Wires the service on a dedicated session, e.g. for a response streamed after the request's session closed."""
+        return cls(ballot_repo=BallotRepository(session), participant_repo=ParticipantRepository(session))
+
+    async def register_participant(
         self, request: ParticipantCreate
     ) -> ParticipantResponse:
         """
@@ -56,46 +71,12 @@ class ParticipantService:
         logger.info("Attempting to register participant: %s %s", request.first_name, request.last_name)
 
         try:
-            existing_participant: Optional[Participant] = self.participant_repo.get_by_first_name(
-                first_name=request.first_name
-            )
-
-            if existing_participant:
-                logger.warning(
-                    "Registration failed: participant with first name '%s' already exists. Requested for: %s %s, DOB: %s",
-                    request.first_name, request.first_name, request.last_name, request.birth_date
-                )
-                raise ParticipantAlreadyExistsError(
-                    identifier_field="first name",
-                    identifier_value=request.first_name
-                )
-        except ParticipantAlreadyExistsError:
-            raise # Re-raise the specific error
-        except Exception as e:
-            logger.error(
-                "Error during pre-check for participant %s %s: %s",
-                request.first_name, request.last_name, str(e), exc_info=True
-            )
-            raise ParticipantServiceError(
-                message=f"Failed during existence check for participant {request.first_name}: {str(e)}",
-                operation="register_participant_check"
-            )
-
-        try:
-            new_participant_model = self.participant_repo.create_participant(
+            # One round-trip: the unique index on first_name rejects duplicates, no pre-check needed
+            new_participant_model: Optional[Participant] = await self.participant_repo.create_participant(
                 first_name=request.first_name,
                 last_name=request.last_name,
                 birth_date=request.birth_date
             )
-            if new_participant_model is None: # Should be handled by repo raising error
-                raise ParticipantCreationError(
-                    request.first_name, request.last_name, "Repository returned None."
-                )
-
-            response = ParticipantResponse.model_validate(new_participant_model)
-            logger.info("Participant created successfully: UserID %s, Name: %s %s",
-                        response.user_id, response.first_name, response.last_name)
-            return response
         except Exception as e: 
             logger.error(
                 "Error during participant creation for %s %s: %s",
@@ -105,31 +86,136 @@ class ParticipantService:
                 request.first_name, request.last_name, reason=str(e)
             )
 
-    def list_all_participants(self) -> List[ParticipantResponse]:
+        if new_participant_model is None:
+            logger.warning(
+                "Registration failed: participant with first name '%s' already exists. Requested for: %s %s, DOB: %s",
+                request.first_name, request.first_name, request.last_name, request.birth_date
+            )
+            raise ParticipantAlreadyExistsError(
+                identifier_field="first name",
+                identifier_value=request.first_name
+            )
+
+        response = ParticipantResponse.model_validate(new_participant_model)
+        logger.info("Participant created successfully: UserID %s, Name: %s %s",
+                    response.user_id, response.first_name, response.last_name)
+        return response
+
+    async def register_participants_bulk(self, rows: List[BulkRow[ParticipantCreate]]) -> ParticipantBulkResponse:
+        """
+        Registers a batch of participants. Repeated first names within the batch are
+        dropped in memory (the first occurrence is kept); the rest is inserted in chunks
+        of BULK_CHUNK_SIZE, one set-based INSERT ... ON CONFLICT DO NOTHING RETURNING per
+        chunk, so names already registered are skipped by the unique index in the same
+        statement. Every row gets its own result: created, duplicate or failed.
+        """
+        started = time.perf_counter()
+        logger.info("Registering bulk batch of %s participants", len(rows))
+
+        results: Dict[int, ParticipantBulkResult] = {}
+        first_seen: Dict[str, int] = {}
+        pending: List[Tuple[int, ParticipantCreate]] = []
+        for row in rows:
+            if row.item is None:
+                results[row.index] = ParticipantBulkResult(index=row.index, status="failed", error=row.error)
+            elif row.item.first_name in first_seen:
+                results[row.index] = ParticipantBulkResult(
+                    index=row.index,
+                    status="duplicate",
+                    first_name=row.item.first_name,
+                    error=f"First name already used by row {first_seen[row.item.first_name]} of this batch.",
+                )
+            else:
+                first_seen[row.item.first_name] = row.index
+                pending.append((row.index, row.item))
+
+        for start in range(0, len(pending), BULK_CHUNK_SIZE):
+            chunk = pending[start:start + BULK_CHUNK_SIZE]
+            try:
+                created = await self.participant_repo.create_participants_bulk(
+                    [(item.first_name, item.last_name, item.birth_date) for _, item in chunk]
+                )
+            except Exception as e:
+                logger.error(f"Bulk participant chunk of {len(chunk)} rows failed: {e}")
+                for index, item in chunk:
+                    results[index] = ParticipantBulkResult(index=index, status="failed", first_name=item.first_name, error=str(e))
+                continue
+            # First names are unique, so they tie the returned rows back to the batch
+            created_by_name = {participant.first_name: participant for participant in created}
+            for index, item in chunk:
+                participant = created_by_name.get(item.first_name)
+                if participant is None:
+                    results[index] = ParticipantBulkResult(
+                        index=index,
+                        status="duplicate",
+                        first_name=item.first_name,
+                        error=f"Participant with first name '{item.first_name}' already exists.",
+                    )
+                else:
+                    results[index] = ParticipantBulkResult(
+                        index=index,
+                        status="created",
+                        user_id=participant.user_id,
+                        first_name=participant.first_name,
+                        last_name=participant.last_name,
+                        birth_date=participant.birth_date,
+                    )
+
+        duration = time.perf_counter() - started
+        created_count = sum(1 for r in results.values() if r.status == "created")
+        duplicate_count = sum(1 for r in results.values() if r.status == "duplicate")
+        failed_count = len(results) - created_count - duplicate_count
+        logger.info("Bulk registration done: %s created, %s duplicate, %s failed in %.1fms",
+                    created_count, duplicate_count, failed_count, duration * 1000)
+        return ParticipantBulkResponse(
+            created=created_count,
+            duplicate=duplicate_count,
+            failed=failed_count,
+            duration_ms=round(duration * 1000, 3),
+            participants_per_second=round(created_count / duration, 3) if duration > 0 else 0.0,
+            results=[results[index] for index in sorted(results)],
+        )
+
+    async def list_all_participants(self, limit: int, after: Optional[int] = None) -> Page[RowDict]:
         """
-        Retrieves a list of all registered participants.
+        Retrieves one page of registered participants, ordered by user ID.
+
+        Args:
+            limit: Maximum number of participants in the page.
+            after: Key of the last participant of the previous page (None for the first page).
 
         Returns:
-            A list of participant details. Returns an empty list if no participants are found.
+            A page of participant details as plain dicts (see app.schemas.rows), with the key
+            to continue from if more follow.
+            The page is empty if no participants are found.
         
         Raises:
             ParticipantListingError: If an unexpected error occurs during retrieval.
         """
-        logger.info("Attempting to retrieve all participants.")
+        logger.info("Attempting to retrieve participants after %s (limit %s).", after, limit)
         try:
-            participants_models: List[Participant] = self.participant_repo.list_participants()
+            participants_page: Page[Row] = await self.participant_repo.list_participants(limit=limit, after=after)
             
-            response_list = [ParticipantResponse.model_validate(p) for p in participants_models]
+            response_list = [_participant_row(p) for p in participants_page.items]
             
             logger.info(f"Successfully retrieved {len(response_list)} participants.")
-            return response_list
+            return Page(items=response_list, next_key=participants_page.next_key)
         except Exception as e:
             logger.error(
                 "Error during listing all participants: %s", str(e), exc_info=True
             )
             raise ParticipantListingError(reason=str(e))
 
-    def get_participant_by_id(self, user_id: int) -> ParticipantResponse:
+    async def stream_all_participants(self) -> AsyncIterator[RowDict]:
+        """
+        Yields every registered participant, ordered by user ID, reading them through a
+        server-side cursor. Used for NDJSON exports.
+        """
+        logger.info("Streaming all participants.")
+        async for participant in self.participant_repo.stream_all():
+            yield _participant_row(participant)
+
+    async def get_participant_by_id(self, user_id: int) -> ParticipantResponse:
         """
         Retrieves a participant by their unique ID.
 
@@ -145,7 +231,7 @@ class ParticipantService:
         """
         logger.info(f"Attempting to retrieve participant by ID: {user_id}")
         try:
-            participant_model: Optional[Participant] = self.participant_repo.get_participant_by_id(user_id=user_id)
+            participant_model: Optional[Participant] = await self.participant_repo.get_participant_by_id(user_id=user_id)
             
             if participant_model is None:
                 logger.warning(f"Participant with ID {user_id} not found.")
@@ -163,4 +249,14 @@ class ParticipantService:
             raise ParticipantServiceError(
                 message=f"An unexpected error occurred while retrieving participant ID {user_id}: {str(e)}",
                 operation="get_participant_by_id"
-            )
\ No newline at end of file
+            )
+
+
+async def get_participant_service_provider(session: AsyncSession = Depends(db.get_db)) -> ParticipantService:
+    """Provider for routes: the service on the request's unit of work (see Database.get_db)."""
+    return ParticipantService.for_session(session)
+
+
+async def get_participant_read_service_provider(session: AsyncSession = Depends(db.get_read_db)) -> ParticipantService:
+    """Provider for read-only routes: the service on a read replica session (see Database.get_read_db)."""
+    return ParticipantService.for_session(session)
@@ -1,11 +1,17 @@
 import logging
 from datetime import date
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import db
 from fastapi import Depends, HTTPException
 from app.repositories.interfaces.winner_ballots_repo_interface import WinningBallotRepositoryInterface
 from app.models.winning_ballots import WinningBallot
 from app.schemas.winning_ballot import WinningBallotResponse
+from app.schemas.pagination import Page
+from app.schemas.rows import RowDict, row_mapper
 from app.repositories.winner_ballots_repository import (
+     WinningBallotRepository,
      get_winning_ballot_repository_provider,
 )
 from app.middleware.exceptions.winner_service_exceptions import (
@@ -16,6 +22,8 @@ from app.middleware.exceptions.winner_service_exceptions import (
 
 logger = logging.getLogger("app")
 
+_winning_ballot_row = row_mapper(WinningBallotResponse)
+
 class WinnerService:
     def __init__(
         self,
@@ -24,8 +32,13 @@ class WinnerService:
         self.winning_repo = winning_repo
         logger.debug("Initialized WinnerService")
 
+    @classmethod
+    def for_session(cls, session: AsyncSession) -> "WinnerService":
+        """Wires the service on a dedicated session, e.g. for a response streamed after the request's session closed."""
+        return cls(winning_repo=WinningBallotRepository(session))
+
 
-    def get_winner_by_winning_date(self, winning_date: date) -> WinningBallotResponse:
+    async def get_winner_by_winning_date(self, winning_date: date) -> WinningBallotResponse:
         """
         Retrieves the winning ballot for a specific winning date.
 
@@ -35,7 +48,7 @@ class WinnerService:
         """
         logger.info(f"Attempting to retrieve winner for date {winning_date}")
         try:
-            win_model: Optional[WinningBallot] = self.winning_repo.get_by_winning_date(winning_date)
+            win_model: Optional[WinningBallot] = await self.winning_repo.get_by_winning_date(winning_date)
         except Exception as e:
             logger.error(f"Repository error while fetching winner for date {winning_date}: {str(e)}", exc_info=True)
             raise WinnerServiceError(message=f"Failed to retrieve winner for date {winning_date} due to repository error: {str(e)}", operation="get_winner_by_winning_date")
@@ -49,31 +62,35 @@ class WinnerService:
         )
         return WinningBallotResponse.model_validate(win_model)
 
-    def list_all_winning_ballots(self) -> List[WinningBallotResponse]:
+    async def list_all_winning_ballots(self, limit: int, after: Optional[int] = None) -> Page[RowDict]:
         """
-        Retrieves a list of all winning ballots with their details.
-        Returns an empty list if no winning ballots are found (does not raise error for empty list).
+        Retrieves one page of winning ballots, ordered by lottery ID, starting after the lottery ID `after`.
+        Returns an empty page if no winning ballots are found (does not raise error for empty list).
 
         Raises:
             WinnerListingError: If an unexpected error occurs during retrieval from the repository.
         """
-        logger.info("Attempting to retrieve all winning ballots.")
+        logger.info(f"Attempting to retrieve winning ballots after LotteryID={after} (limit {limit}).")
         try:
-            winning_ballots_models: List[WinningBallot] = self.winning_repo.list_winning_ballots()
+            winning_ballots_page: Page[Row] = await self.winning_repo.list_winning_ballots(limit=limit, after=after)
             
-            response_list = [
-                WinningBallotResponse.model_validate(wb_model) for wb_model in winning_ballots_models
-            ]
+            response_list = [_winning_ballot_row(wb_model) for wb_model in winning_ballots_page.items]
             
             logger.info(f"Successfully retrieved {len(response_list)} winning ballots.")
-            return response_list
+            return Page(items=response_list, next_key=winning_ballots_page.next_key)
         except Exception as e:
             logger.error(
                 f"Repository error during listing all winning ballots: {str(e)}", exc_info=True
             )
             raise WinnerListingError(reason=str(e))
 
-    def get_winner_by_lottery_id(self, lottery_id: int) -> Optional[WinningBallotResponse]:
+    async def stream_all_winning_ballots(self) -> AsyncIterator[RowDict]:
+        """Yields every winning ballot, ordered by lottery ID, through a server-side cursor (NDJSON exports)."""
+        logger.info("Streaming all winning ballots.")
+        async for wb_model in self.winning_repo.stream_all():
+            yield _winning_ballot_row(wb_model)
+
+    async def get_winner_by_lottery_id(self, lottery_id: int) -> WinningBallotResponse:
         """
         Retrieves the winning ballot for a specific lottery ID.
         Returns None if not found, or raises WinnerNotFoundError if preferred.
@@ -84,7 +101,7 @@ class WinnerService:
         """
         logger.info(f"Attempting to retrieve winner for LotteryID={lottery_id}")
         try:
-            win_model: Optional[WinningBallot] = self.winning_repo.get_by_lottery(lottery_id)
+            win_model: Optional[WinningBallot] = await self.winning_repo.get_by_lottery(lottery_id)
         except AttributeError:
              logger.error(f"Repository method 'get_by_lottery_id' not found. Cannot fetch winner by lottery ID.")
              raise WinnerServiceError(message="Underlying repository does not support fetching winner by lottery ID.", operation="get_winner_by_lottery_id")
@@ -100,4 +117,8 @@ class WinnerService:
             f"Found winning record (BallotID: {win_model.ballot_id}) for LotteryID={lottery_id}"
         )
         return WinningBallotResponse.model_validate(win_model)
-            
\ No newline at end of file
+
+
+async def get_winner_read_service_provider(session: AsyncSession = Depends(db.get_read_db)) -> WinnerService:
+    """Provider for read-only routes: the service on a read replica session (see Database.get_read_db)."""
+    return WinnerService.for_session(session)
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import random
+import time
+from array import array
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.models.ballot import BALLOT_NUMBER_SEQUENCE
+from app.repositories.ballot_number_allocator import (
+    BALLOT_NUMBER_BLOCK_SIZE,
+    BALLOT_NUMBER_MIN,
+    BALLOT_NUMBER_SPACE,
+    BallotNumberAllocator,
+    FeistelPermutation,
+    _load_key,
+)
+
+# Domains checked exhaustively: tiny, odd, around powers of two, and a prime
+BIJECTION_DOMAINS = (1, 2, 3, 1000, 4095, 4096, 4097, 65_536, 1_000_003)
+
+# The uniqueness check sorts numbers into this many ranges and checks one range at a time
+UNIQUENESS_BUCKETS = 256
+
+
+def check_bijection(key):
+    """Permutes every value of each small domain and checks every output is in the domain and distinct."""
+    for domain_size in BIJECTION_DOMAINS:
+        permutation = FeistelPermutation(key, domain_size)
+        seen = bytearray(domain_size)
+        for value in range(domain_size):
+            output = permutation.permute(value)
+            if not 0 <= output < domain_size or seen[output]:
+                raise SystemExit(f"FeistelPermutation is not a bijection of [0, {domain_size}): {value} -> {output}")
+            seen[output] = 1
+        print(f"bijection of [0, {domain_size}): ok")
+
+
+async def check_unique_numbers(key, ids, seed):
+    """
+    Allocates `ids` ballot numbers through BallotNumberAllocator, BALLOT_NUMBER_BLOCK_SIZE at a
+    time like the bulk insert, from blocks sampled at random over the whole sequence range
+    (as handed out over the years), and checks they are 11-digit and pairwise distinct.
+    Numbers are kept per range of the number space (8 bytes each) and each range is then
+    checked for duplicates with a bitmap of its own (about 44 MB).
+    """
+    rng = random.Random(seed)
+    blocks = iter(rng.sample(range(BALLOT_NUMBER_SPACE // BALLOT_NUMBER_BLOCK_SIZE), -(-ids // BALLOT_NUMBER_BLOCK_SIZE)))
+
+    async def next_block():
+        return next(blocks) * BALLOT_NUMBER_BLOCK_SIZE
+
+    allocator = BallotNumberAllocator(key)
+    bucket_span = -(-BALLOT_NUMBER_SPACE // UNIQUENESS_BUCKETS)
+    buckets = [array("q") for _ in range(UNIQUENESS_BUCKETS)]
+    started = time.perf_counter()
+    allocated = 0
+    while allocated < ids:
+        for number in await allocator.allocate(next_block, count=min(BALLOT_NUMBER_BLOCK_SIZE, ids - allocated)):
+            offset = number - BALLOT_NUMBER_MIN
+            if not 0 <= offset < BALLOT_NUMBER_SPACE:
+                raise SystemExit(f"Ballot number {number} is not 11 digits")
+            buckets[offset // bucket_span].append(offset)
+        allocated += min(BALLOT_NUMBER_BLOCK_SIZE, ids - allocated)
+    for index, bucket in enumerate(buckets):
+        seen = bytearray(bucket_span // 8 + 1)
+        for offset in bucket:
+            bit = offset - index * bucket_span
+            if seen[bit >> 3] & (1 << (bit & 7)):
+                raise SystemExit(f"Duplicate ballot number {BALLOT_NUMBER_MIN + offset}")
+            seen[bit >> 3] |= 1 << (bit & 7)
+        buckets[index] = array("q")
+    print(f"{ids} sampled ballot numbers unique: ok ({time.perf_counter() - started:.1f}s)")
+
+
+async def allocator_throughput(key, duration, database_url):
+    """
+    Ballot numbers allocated per second, one at a time (single ballot submission) and
+    BALLOT_NUMBER_BLOCK_SIZE at a time (bulk insert). Blocks come from ballot_number_seq
+    when a database is given, else from an in-memory counter.
+    """
+    engine = create_async_engine(database_url) if database_url else None
+    counter = iter(range(0, BALLOT_NUMBER_SPACE, BALLOT_NUMBER_BLOCK_SIZE))
+
+    async def next_block():
+        if engine is None:
+            return next(counter)
+        async with engine.connect() as connection:
+            return (await connection.execute(select(BALLOT_NUMBER_SEQUENCE.next_value()))).scalar_one()
+
+    allocator = BallotNumberAllocator(key)
+    for label, count in (("one at a time", 1), (f"{BALLOT_NUMBER_BLOCK_SIZE} at a time", BALLOT_NUMBER_BLOCK_SIZE)):
+        allocated = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < duration:
+            allocated += len(await allocator.allocate(next_block, count=count))
+        elapsed = time.perf_counter() - started
+        print(f"allocate {label}: {allocated / elapsed:,.0f} numbers/s ({elapsed / allocated * 1e6:.2f}us per number)")
+    if engine is not None:
+        await engine.dispose()
+
+
+async def ballot_number_benchmark(ids, duration, seed, database_url):
+    """
+    Checks that ballot numbers are unique by construction and measures how fast they are handed out:
+    an exhaustive bijectivity check of FeistelPermutation on small domains, a uniqueness check of
+    `ids` numbers from BallotNumberAllocator, and the allocator's throughput.
+
+    Args:
+        ids (int): Ballot numbers allocated for the uniqueness check.
+        duration (float): Seconds of each throughput run.
+        seed (int): Seed of the sampled sequence blocks, to replay a run.
+        database_url (str): Optional database whose ballot_number_seq feeds the throughput runs.
+
+    Returns:
+        None: Prints one line per check; exits with an error on the first failure.
+    """
+    key = _load_key()
+    check_bijection(key)
+    await check_unique_numbers(key, ids, seed)
+    await allocator_throughput(key, duration, database_url)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that ballot numbers never collide and measure the allocator's throughput."
+    )
+    parser.add_argument(
+        "-n", "--ids",
+        type=int,
+        default=10_000_000,
+        help="Ballot numbers allocated for the uniqueness check. Default is 10000000; 100000000 takes about 30 minutes."
+    )
+    parser.add_argument(
+        "-d", "--duration",
+        type=float,
+        default=3,
+        help="Seconds of each throughput run. Default is 3."
+    )
+    parser.add_argument(
+        "-s", "--seed",
+        type=int,
+        default=0,
+        help="Seed of the sampled sequence blocks. Default is 0."
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Take blocks from this database's ballot_number_seq in the throughput runs, given as an async URL "
+             "(postgresql+asyncpg://...). Default is an in-memory counter."
+    )
+
+    args = parser.parse_args()
+    asyncio.run(ballot_number_benchmark(args.ids, args.duration, args.seed, args.database_url))
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+from datetime import date
+from logging.config import dictConfig
+
+from app.configs.config import LOGGING_CONFIG
+from app.db.database import db
+from app.repositories.lottery_repository import LotteryRepository
+from app.services.catch_up_service import CatchUpDrawService, DEFAULT_BATCH_SIZE, DEFAULT_WORKERS
+
+
+async def catch_up(batch_size, workers, before_date=None):
+    """
+    Closes and draws every open lottery dated before `before_date` (default: today).
+
+    Args:
+        batch_size (int): Lotteries fetched and drawn per batch.
+        workers (int): Lotteries drawn concurrently.
+        before_date (date, optional): Only lotteries dated before this day are drawn.
+
+    Returns:
+        None: Prints one line per lottery and a summary.
+    """
+    try:
+        async with db.SessionLocal() as session:
+            service = CatchUpDrawService(lottery_repo=LotteryRepository(session))
+            result = await service.draw_overdue_lotteries(batch_size=batch_size, workers=workers, before_date=before_date)
+    finally:
+        await db.dispose()
+
+    for report in result.reports:
+        line = f"{report.lottery_date} (ID {report.lottery_id}): {report.status} in {report.duration_ms:.1f}ms"
+        if report.winning_ballot_id is not None:
+            line += f", winner ballot {report.winning_ballot_id}"
+        if report.ballots_per_second is not None:
+            line += f", {report.ballot_count} ballots at {report.ballots_per_second:.0f} ballots/s"
+        if report.detail:
+            line += f" - {report.detail}"
+        print(line)
+    print("-" * 20)
+    print(
+        f"{result.lotteries_found} lotteries before {result.before_date}: {result.drawn} drawn, "
+        f"{result.failed} failed, {result.duration_ms:.1f}ms ({result.lotteries_per_second:.1f} lotteries/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Close and draw every open lottery dated before today (catch-up after missed nightly runs)."
+    )
+    parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Lotteries fetched and drawn per batch. Default is {DEFAULT_BATCH_SIZE}."
+    )
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Lotteries drawn concurrently. Default is {DEFAULT_WORKERS}."
+    )
+    parser.add_argument(
+        "--before",
+        type=date.fromisoformat,
+        default=None,
+        help="Draw lotteries dated before this day (YYYY-MM-DD). Default is today."
+    )
+
+    args = parser.parse_args()
+
+    dictConfig(LOGGING_CONFIG)
+    asyncio.run(catch_up(args.batch_size, args.workers, args.before))
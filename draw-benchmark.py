@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from sqlalchemy import delete, insert, select, text, update
+from app.db.database import db
+from app.models.ballot import Ballot
+from app.models.lottery import Lottery
+from app.models.participant import Participant
+from app.models.winning_ballots import WinningBallot
+from app.services.lottery_service import DRAW_MODE, LotteryService
+
+# Benchmark lotteries are dated from here on, far from real ones
+FIRST_BENCHMARK_DATE = date(1900, 1, 1)
+
+
+async def _seed_lottery(target_date, ballots):
+    """Creates the lottery of target_date with `ballots` ballots, generated server-side, and refreshes the statistics."""
+    async with db.session_scope() as session:
+        if (await session.execute(select(Lottery.lottery_id).where(Lottery.lottery_date == target_date))).first():
+            raise SystemExit(f"A lottery already exists for {target_date}; remove it before benchmarking.")
+        user_id = (await session.execute(select(Participant.user_id).limit(1))).scalar()
+        if user_id is None:
+            user_id = (await session.execute(
+                insert(Participant)
+                .values(first_name="draw-benchmark", last_name="draw-benchmark", birth_date=date(2000, 1, 1))
+                .returning(Participant.user_id)
+            )).scalar_one()
+        lottery = Lottery(lottery_date=target_date, closed=False)
+        session.add(lottery)
+        await session.flush()
+        lottery_id = lottery.lottery_id
+        # ballot_number stays NULL (allowed by the unique constraint) so real numbers are not used up
+        await session.execute(
+            text(
+                "INSERT INTO ballots (user_id, lottery_id, expiry_date, draw_rank) "
+                "SELECT :user_id, :lottery_id, :expiry_date, (random() * 9.2e18)::bigint "
+                "FROM generate_series(1, :ballots)"
+            ),
+            {"user_id": user_id, "lottery_id": lottery_id, "expiry_date": target_date, "ballots": ballots},
+        )
+    # VACUUM cannot run in a transaction; it sets the visibility map the index-only scans rely on
+    async with db.engine.connect() as connection:
+        await (await connection.execution_options(isolation_level="AUTOCOMMIT")).execute(text("VACUUM ANALYZE ballots"))
+    return lottery_id
+
+
+async def _reopen(lottery_id):
+    async with db.session_scope() as session:
+        await session.execute(delete(WinningBallot).where(WinningBallot.lottery_id == lottery_id))
+        await session.execute(update(Lottery).where(Lottery.lottery_id == lottery_id).values(closed=False))
+
+
+async def _draw(target_date):
+    """The nightly draw of target_date through the service: lock, pick the winner, close, commit."""
+    async with db.session_scope() as session:
+        await LotteryService.for_session(session).close_and_draw_by_date(target_date)
+
+
+async def _load_all_draw(lottery_id):
+    """The draw before count-plus-offset: load every ballot of the lottery and pick one in Python."""
+    async with db.session_scope() as session:
+        ballots = (await session.execute(select(Ballot).where(Ballot.lottery_id == lottery_id))).scalars().all()
+        return random.choice(ballots).ballot_id
+
+
+async def _measure(draw, repeat):
+    """Median seconds of `repeat` runs, then the peak Python heap of one more run traced by tracemalloc."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await draw()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    await draw()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+async def draw_benchmark(sizes, repeat, load_all_max, keep):
+    """
+    Seeds one lottery per size with that many ballots and measures the draw on it:
+    median draw time and peak Python memory of LotteryService.close_and_draw_by_date
+    (the lottery is reopened between runs), and, up to `load_all_max` ballots, the same
+    for the former draw that loaded every ballot. Runs against DATABASE_URL; the
+    benchmark lotteries and their ballots are deleted afterwards.
+
+    Args:
+        sizes (list): Ballot counts, one lottery each.
+        repeat (int): Timed draws per lottery.
+        load_all_max (int): Largest lottery the load-every-ballot draw is measured on, 0 for none.
+        keep (bool): Keep the seeded lotteries.
+
+    Returns:
+        None: Prints one block per size.
+    """
+    print(f"DRAW_MODE={DRAW_MODE}")
+    seeded = []
+    try:
+        for index, ballots in enumerate(sizes):
+            target_date = FIRST_BENCHMARK_DATE + timedelta(days=index)
+            started = time.perf_counter()
+            lottery_id = await _seed_lottery(target_date, ballots)
+            seeded.append(lottery_id)
+            print(f"{ballots} ballots (seeded in {time.perf_counter() - started:.1f}s):")
+
+            async def draw():
+                await _draw(target_date)
+                await _reopen(lottery_id)
+
+            seconds, peak = await _measure(draw, repeat)
+            print(f"  {'draw':18s} {seconds * 1000:10.1f}ms  peak {peak / 1024:12,.0f} KiB")
+            if ballots <= load_all_max:
+                seconds, peak = await _measure(lambda: _load_all_draw(lottery_id), repeat)
+                print(f"  {'load every ballot':18s} {seconds * 1000:10.1f}ms  peak {peak / 1024:12,.0f} KiB")
+    finally:
+        if not keep:
+            async with db.session_scope() as session:
+                await session.execute(delete(WinningBallot).where(WinningBallot.lottery_id.in_(seeded)))
+                await session.execute(delete(Ballot).where(Ballot.lottery_id.in_(seeded)))
+                await session.execute(delete(Lottery).where(Lottery.lottery_id.in_(seeded)))
+        await db.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure draw time and peak memory against lotteries of growing ballot counts."
+    )
+    parser.add_argument(
+        "-s", "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=[10_000, 1_000_000, 10_000_000],
+        help="Comma separated ballot counts, one lottery each. Default is 10000,1000000,10000000."
+    )
+    parser.add_argument(
+        "-r", "--repeat",
+        type=int,
+        default=5,
+        help="Timed draws per lottery, the median is reported. Default is 5."
+    )
+    parser.add_argument(
+        "--load-all-max",
+        type=int,
+        default=1_000_000,
+        help="Largest lottery on which the former load-every-ballot draw is also measured, 0 for none. Default is 1000000."
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the seeded lotteries and ballots."
+    )
+
+    args = parser.parse_args()
+    asyncio.run(draw_benchmark(args.sizes, args.repeat, args.load_all_max, args.keep))
@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import os
+import time
+from datetime import date
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.db.database import _async_url
+from app.models.ballot import Ballot
+from app.models.lottery import Lottery
+from app.models.participant import Participant
+from app.models.winning_ballots import WinningBallot
+from app.repositories.ballot_repository import BallotRepository
+from app.repositories.lottery_repository import LotteryRepository
+from app.repositories.participant_repository import ParticipantRepository
+from app.repositories.winner_ballots_repository import WinningBallotRepository
+
+# (label, driver, psycopg prepare_threshold)
+CONFIGURATIONS = [
+    ("asyncpg", "asyncpg", None),
+    ("psycopg, not prepared", "psycopg", None),
+    ("psycopg, prepared", "psycopg", 5),
+]
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _start_delay_proxy(url, rtt_ms):
+    """
+    TCP proxy to the database that holds every chunk for half the round-trip time in each
+    direction, to see what the drivers do over a real network.
+    Returns a coroutine function that stops the proxy, and the URL through it.
+    """
+    delay = rtt_ms / 2000
+    handlers, writers = set(), set()
+
+    async def pipe(reader, writer):
+        # Chunks leave in order, each `delay` after it arrived
+        queue = asyncio.Queue()
+
+        async def forward():
+            while True:
+                arrived, data = await queue.get()
+                await asyncio.sleep(max(0.0, arrived + delay - time.perf_counter()))
+                if not data:
+                    writer.close()
+                    return
+                writer.write(data)
+                await writer.drain()
+
+        forwarder = asyncio.create_task(forward())
+        try:
+            while True:
+                data = await reader.read(65536)
+                await queue.put((time.perf_counter(), data))
+                if not data:
+                    break
+            await forwarder
+        finally:
+            forwarder.cancel()
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        handlers.add(asyncio.current_task())
+        socket_dir = url.query.get("host")
+        if socket_dir:
+            server_reader, server_writer = await asyncio.open_unix_connection(f"{socket_dir}/.s.PGSQL.{url.port or 5432}")
+        else:
+            server_reader, server_writer = await asyncio.open_connection(url.host, url.port or 5432)
+        writers.update((client_writer, server_writer))
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer), return_exceptions=True)
+
+    async def close():
+        # Closing both ends of every connection lets the handlers finish on end of stream
+        server.close()
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await server.wait_closed()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return close, url.set(host="127.0.0.1", port=port).difference_update_query(["host"])
+
+
+async def _sample(session_factory):
+    """Ids the queries look up: a participant, and the undrawn lottery with the most ballots."""
+    async with session_factory() as session:
+        user_id = (await session.execute(select(func.min(Participant.user_id)))).scalar()
+        lottery_id = (await session.execute(
+            select(Ballot.lottery_id)
+            .where(Ballot.lottery_id.not_in(select(WinningBallot.lottery_id)))
+            .group_by(Ballot.lottery_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )).scalar()
+        lottery = await session.get(Lottery, lottery_id) if lottery_id is not None else None
+        ballot_id = (await session.execute(select(func.min(Ballot.ballot_id)).where(Ballot.lottery_id == lottery_id))).scalar()
+    if user_id is None or lottery is None:
+        raise SystemExit("The database needs a participant and a lottery with ballots and no winner to benchmark against.")
+    return user_id, lottery, ballot_id
+
+
+def _queries(user_id, lottery):
+    """The repository calls behind the busiest endpoints, by name."""
+    return {
+        "participant by id": lambda s: ParticipantRepository(s).get_participant_by_id(user_id),
+        "participants page": lambda s: ParticipantRepository(s).list_participants(limit=20),
+        "lottery by date": lambda s: LotteryRepository(s).get_by_date(lottery.lottery_date),
+        "ballots of lottery page": lambda s: BallotRepository(s).list_by_lottery(lottery.lottery_id, limit=20),
+        "ballot count": lambda s: BallotRepository(s).count_by_lottery(lottery.lottery_id),
+    }
+
+
+async def _draw_writes(session_factory, lottery, ballot_id, pipelined):
+    """
+    The writes that persist a draw (winner INSERT, lottery close UPDATE) after locking the
+    lottery row, rolled back so the run can repeat. Returns the seconds the two writes took.
+    """
+    async with session_factory() as session:
+        lottery_repo, winning_repo = LotteryRepository(session), WinningBallotRepository(session)
+        await lottery_repo.lock_by_date(lottery.lottery_date)
+        started = time.perf_counter()
+        if pipelined:
+            async with winning_repo.pipeline():
+                await winning_repo.add_winning_ballot(lottery.lottery_id, ballot_id, date.today())
+                await lottery_repo.close_locked(lottery.lottery_id)
+        else:
+            await winning_repo.add_winning_ballot(lottery.lottery_id, ballot_id, date.today())
+            await lottery_repo.close_locked(lottery.lottery_id)
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+    return elapsed
+
+
+async def driver_benchmark(database_url, iterations, concurrency, duration, rtt_ms):
+    """
+    Runs the repository queries behind the existing endpoints through asyncpg, psycopg
+    without prepared statements and psycopg with prepared statements, and reports:
+    per-query latency (sequential calls on one connection), mixed-query throughput with
+    `concurrency` sessions, and the latency of the draw's two writes with and without
+    pipeline mode. Reads and rolled-back writes only: the database is left unchanged.
+
+    Args:
+        database_url (str): Database to benchmark against, any PostgreSQL URL.
+        iterations (int): Calls per query for the latency figures.
+        concurrency (int): Concurrent sessions for the throughput figure.
+        duration (float): Seconds of the throughput run.
+        rtt_ms (float): Simulated network round-trip time added by a local proxy, 0 for none.
+
+    Returns:
+        None: Prints one block per configuration.
+    """
+    for label, driver, prepare_threshold in CONFIGURATIONS:
+        url = _async_url(database_url, driver)
+        close_proxy = None
+        if rtt_ms > 0:
+            close_proxy, url = await _start_delay_proxy(url, rtt_ms)
+        connect_args = {"prepare_threshold": prepare_threshold} if driver == "psycopg" else {}
+        engine = create_async_engine(url, pool_size=concurrency, max_overflow=0, connect_args=connect_args)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        user_id, lottery, ballot_id = await _sample(session_factory)
+        queries = _queries(user_id, lottery)
+        print(f"{label}:")
+
+        async with session_factory() as session:
+            for name, query in queries.items():
+                for _ in range(min(iterations, 20)):
+                    await query(session)
+                latencies = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    await query(session)
+                    latencies.append(time.perf_counter() - started)
+                latencies.sort()
+                print(
+                    f"  {name:24s} p50 {_percentile(latencies, 0.50) * 1e6:8.0f}us  "
+                    f"p99 {_percentile(latencies, 0.99) * 1e6:8.0f}us"
+                )
+
+        deadline = time.perf_counter() + duration
+        completed = [0] * concurrency
+
+        async def worker(index):
+            calls = list(queries.values())
+            async with session_factory() as session:
+                i = index
+                while time.perf_counter() < deadline:
+                    await calls[i % len(calls)](session)
+                    i += 1
+                    completed[index] += 1
+
+        await asyncio.gather(*(worker(index) for index in range(concurrency)))
+        print(f"  {'mixed throughput':24s} {sum(completed) / duration:8.0f} queries/s with {concurrency} sessions")
+
+        for pipelined in (False, True):
+            if pipelined and driver != "psycopg":
+                continue
+            timings = sorted([await _draw_writes(session_factory, lottery, ballot_id, pipelined) for _ in range(iterations)])
+            print(f"  {'draw writes' + (' pipelined' if pipelined else ''):24s} p50 {_percentile(timings, 0.50) * 1e6:8.0f}us")
+
+        await engine.dispose()
+        if close_proxy is not None:
+            await close_proxy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare per-query latency and throughput of the repository queries across database drivers."
+    )
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL"),
+        help="Database to benchmark against. Default is DATABASE_URL."
+    )
+    parser.add_argument(
+        "-n", "--iterations",
+        type=int,
+        default=500,
+        help="Calls per query for the latency figures. Default is 500."
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=16,
+        help="Concurrent sessions for the throughput figure. Default is 16."
+    )
+    parser.add_argument(
+        "-d", "--duration",
+        type=float,
+        default=5,
+        help="Seconds of the throughput run. Default is 5."
+    )
+    parser.add_argument(
+        "--rtt-ms",
+        type=float,
+        default=0,
+        help="Simulated network round-trip time in milliseconds, added by a local proxy. Default is 0."
+    )
+
+    args = parser.parse_args()
+    asyncio.run(driver_benchmark(args.database_url, args.iterations, args.concurrency, args.duration, args.rtt_ms))
@@ -1,6 +1,6 @@
 CREATE TABLE Participants (
     user_id SERIAL PRIMARY KEY,
-    first_name TEXT NOT NULL,
+    first_name TEXT NOT NULL UNIQUE, -- registration dedupes on first name
     last_name TEXT NOT NULL,
     birth_date DATE NOT NULL
 );
@@ -17,11 +17,15 @@ CREATE TABLE Ballots (
     lottery_id INTEGER NOT NULL REFERENCES Lotteries(lottery_id),
     ballot_number BIGINT UNIQUE,
     expiry_date DATE,
+    draw_rank BIGINT,
     CONSTRAINT fk_participant FOREIGN KEY (user_id) REFERENCES Participants(user_id),
     CONSTRAINT chk_ballot_number CHECK (ballot_number > 0 AND ballot_number <= 99999999999)
 
 );
 
+-- Each nextval reserves a block of 1000 ballot number seeds (see BALLOT_NUMBER_BLOCK_SIZE)
+CREATE SEQUENCE ballot_number_seq INCREMENT BY 1000;
+
 CREATE TABLE WinningBallots (
     lottery_id INTEGER PRIMARY KEY, 
     ballot_id INTEGER NOT NULL UNIQUE, 
@@ -33,6 +37,19 @@ CREATE TABLE WinningBallots (
 );
 
 -- Indexes remain conceptually the same, referencing integer columns now
-CREATE INDEX idx_ballots_user ON Ballots(user_id);
-CREATE INDEX idx_ballots_lottery ON Ballots(lottery_id);
-CREATE INDEX idx_winning_date ON WinningBallots(winning_date);
\ No newline at end of file
+CREATE INDEX idx_ballots_user ON Ballots(user_id, ballot_id);
+CREATE INDEX idx_ballots_lottery ON Ballots(lottery_id, ballot_id);
+CREATE INDEX idx_ballots_lottery_rank ON Ballots(lottery_id, draw_rank);
+CREATE INDEX idx_winning_date ON WinningBallots(winning_date);
+-- Only the few open lotteries are indexed: open-lottery lookups stay small as closed history grows
+CREATE INDEX idx_lotteries_open_date ON Lotteries(lottery_date) WHERE NOT closed;
+
+-- One row per scheduled nightly draw, so a restarted scheduler does not draw twice
+CREATE TABLE DrawRuns (
+    run_date DATE PRIMARY KEY,
+    status TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP,
+    lotteries_drawn INTEGER NOT NULL DEFAULT 0,
+    detail TEXT
+);
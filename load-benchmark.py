@@ -0,0 +1,129 @@
+import argparse
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+DEFAULT_REQUESTS = [
+    "GET /api/v1/participant?limit=20",
+    "GET /api/v1/lottery?limit=20",
+    "GET /api/v1/ballot/1?limit=20",
+    "GET /api/v1/winner-ballot?limit=20",
+]
+
+_local = threading.local()
+
+
+def _session():
+    # One keep-alive connection per client thread, as a real client pool would hold
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def load_benchmark(base_url, request_lines, concurrency, duration, warmup, body=None):
+    """
+    Sends the given requests round-robin from `concurrency` client threads for `duration`
+    seconds and reports throughput and latency percentiles.
+    Run it against two builds of the service (e.g. before and after a change) to compare them.
+
+    Args:
+        base_url (str): Server root, e.g. http://localhost:8000.
+        request_lines (list): Requests as "METHOD /path?query" strings.
+        concurrency (int): Number of client threads sending requests in parallel.
+        duration (float): Measured seconds, after the warm-up.
+        warmup (float): Seconds of traffic sent before measuring (fills pools and caches).
+        body (str): Optional JSON body sent with every request; "{n}" is replaced by a
+            counter unique across the run, e.g. to register distinct participants.
+
+    Returns:
+        None: Prints one summary line per phase.
+    """
+    targets = []
+    for line in request_lines:
+        method, path = line.split(" ", 1)
+        targets.append((method.upper(), base_url.rstrip("/") + path.strip()))
+    counter = itertools.count()
+
+    def client(worker, deadline, latencies, errors):
+        i = worker
+        while time.perf_counter() < deadline:
+            method, url = targets[i % len(targets)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                data = body.replace("{n}", str(next(counter))) if body else None
+                headers = {"Content-Type": "application/json"} if body else None
+                response = _session().request(method, url, data=data, headers=headers, timeout=30)
+                ok = response.status_code < 500
+            except requests.exceptions.RequestException:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors.append(url)
+
+    for phase, seconds in (("warm-up", warmup), ("measured", duration)):
+        if seconds <= 0:
+            continue
+        latencies, errors = [], []
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for worker in range(concurrency):
+                pool.submit(client, worker, deadline, latencies, errors)
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        print(
+            f"{phase}: {len(latencies)} requests in {elapsed:.1f}s with {concurrency} clients -> "
+            f"{len(latencies) / elapsed:.0f} req/s, "
+            f"p50 {_percentile(latencies, 0.50) * 1000:.1f}ms, "
+            f"p99 {_percentile(latencies, 0.99) * 1000:.1f}ms, "
+            f"{len(errors)} errors"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load the running service with concurrent clients and report req/s, p50 and p99 latency."
+    )
+    parser.add_argument("base_url", help="Root URL of the service, e.g. http://localhost:8000.")
+    parser.add_argument(
+        "-r", "--request",
+        action="append",
+        help="Request to send as 'METHOD /path', e.g. 'POST /api/v1/ballot/1'. Can be used multiple times. "
+             "Default is a mix of list endpoints."
+    )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=int,
+        default=64,
+        help="Number of concurrent clients. Default is 64."
+    )
+    parser.add_argument(
+        "-d", "--duration",
+        type=float,
+        default=20,
+        help="Measured seconds. Default is 20."
+    )
+    parser.add_argument(
+        "-w", "--warmup",
+        type=float,
+        default=3,
+        help="Warm-up seconds before measuring. Default is 3."
+    )
+    parser.add_argument(
+        "-b", "--body",
+        help="JSON body sent with every request; {n} is replaced by a unique counter, "
+             "e.g. '{\"first_name\": \"bench-{n}\", \"last_name\": \"B\", \"birth_date\": \"2000-01-01\"}'."
+    )
+
+    args = parser.parse_args()
+    load_benchmark(args.base_url, args.request or DEFAULT_REQUESTS, args.concurrency, args.duration, args.warmup, args.body)
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import date
+from sqlalchemy import delete, func, select
+from app.db.database import db
+from app.models.lottery import Lottery
+from app.repositories.lottery_repository import LotteryRepository
+
+
+async def _first_ballot_of_the_day(target_date, start):
+    """What the first ballot of a day does: get or create the day's lottery in its own unit of work."""
+    await start.wait()
+    async with db.session_scope() as session:
+        lottery = await LotteryRepository(session).get_or_create_by_date(target_date)
+        return lottery.lottery_id
+
+
+async def lottery_concurrency_check(calls, target_date, keep):
+    """
+    Fires `calls` concurrent get_or_create_by_date calls for a date that has no lottery yet,
+    each in its own session like concurrent first ballots of the day, and checks that every
+    call succeeds, that they all get the same lottery and that exactly one lottery row exists.
+    Uses the application's database (DATABASE_URL) and pool; the lottery is deleted afterwards.
+
+    Args:
+        calls (int): Number of concurrent calls.
+        target_date (date): Date of the lottery to create; must not have a lottery yet.
+        keep (bool): Keep the created lottery instead of deleting it.
+
+    Returns:
+        None: Prints the outcome; exits with an error if a check fails.
+    """
+    async with db.session_scope() as session:
+        if (await session.execute(select(Lottery.lottery_id).where(Lottery.lottery_date == target_date))).first():
+            raise SystemExit(f"A lottery already exists for {target_date}; pick another date with --date.")
+
+    start = asyncio.Event()
+    tasks = [asyncio.create_task(_first_ballot_of_the_day(target_date, start)) for _ in range(calls)]
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    start.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    lottery_ids = Counter(result for result in results if not isinstance(result, BaseException))
+    async with db.session_scope() as session:
+        rows = (await session.execute(
+            select(func.count()).select_from(Lottery).where(Lottery.lottery_date == target_date)
+        )).scalar_one()
+        if not keep:
+            await session.execute(delete(Lottery).where(Lottery.lottery_date == target_date))
+    await db.dispose()
+
+    print(f"{calls} concurrent calls in {elapsed * 1000:.0f}ms: {calls - len(failures)} succeeded, {len(failures)} failed")
+    print(f"lottery ids returned: {dict(lottery_ids)}; lottery rows for {target_date}: {rows}")
+    for failure in failures[:5]:
+        print(f"  {type(failure).__name__}: {failure}")
+    if failures or len(lottery_ids) != 1 or rows != 1:
+        raise SystemExit("FAILED")
+    print("ok")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that concurrent first ballots of a day create exactly one lottery."
+    )
+    parser.add_argument(
+        "-n", "--calls",
+        type=int,
+        default=500,
+        help="Number of concurrent get_or_create_by_date calls. Default is 500."
+    )
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=date(2999, 12, 31),
+        help="Date of the lottery to create, without a lottery yet. Default is 2999-12-31."
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the created lottery instead of deleting it."
+    )
+
+    args = parser.parse_args()
+    asyncio.run(lottery_concurrency_check(args.calls, args.date, args.keep))
@@ -5,6 +5,10 @@ from app.apis.main import main_router
 from app.middleware.exception_handler import register_exception_handlers
 from app.configs.config import LOGGING_CONFIG
 from app.middleware.request_logger import log_requests 
+from app.middleware.read_routing import route_reads
+from app.services.draw_scheduler import DrawScheduler
+from app.services.ballot_ingest_queue import ballot_ingest_queue
+from app.db.database import db
 
 backend_server = FastAPI( title="JS Programming Labs", description="server side backend renderer", version="1.0.0")
 
@@ -16,9 +20,20 @@ def create_app(app : FastAPI) -> FastAPI:
     app.include_router(main_router) 
     
     #Middlewares
+    app.middleware("http")(route_reads)
     app.middleware("http")(log_requests) 
     app = register_exception_handlers(app)
 
+    app.add_event_handler("startup", db.check_pool_budget)
+
+    #Background jobs
+    draw_scheduler = DrawScheduler()
+    app.add_event_handler("startup", draw_scheduler.start)
+    app.add_event_handler("shutdown", draw_scheduler.stop)
+    app.add_event_handler("startup", ballot_ingest_queue.start)
+    app.add_event_handler("shutdown", ballot_ingest_queue.stop)
+    app.add_event_handler("shutdown", db.dispose)
+
     logger.info("FastAPI app created")
     return app
 
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import os
+import re
+from datetime import date, timedelta
+from sqlalchemy import select
+
+# The nightly draw must not run while the requests below are counted
+os.environ.setdefault("DRAW_SCHEDULER_ENABLED", "false")
+
+from fastapi.testclient import TestClient
+from app.db.database import db
+from app.models.lottery import Lottery
+from main import backend_server
+
+# Requests in the order they are sent; {user_id} is the participant created by the first one
+SCENARIOS = [
+    ("POST /api/v1/participant", "POST", "/api/v1/participant",
+     {"first_name": "query-count", "last_name": "benchmark", "birth_date": "2000-01-01"}),
+    ("POST /api/v1/ballot/{id}, first today", "POST", "/api/v1/ballot/{user_id}", None),
+    ("POST /api/v1/ballot/{id}", "POST", "/api/v1/ballot/{user_id}", None),
+    ("POST /api/v1/lottery", "POST", "/api/v1/lottery", {"target_date": "{target_date}"}),
+    ("POST /api/v1/lottery/close", "POST", "/api/v1/lottery/close", None),
+]
+
+# Statements per request before writes used INSERT/UPDATE ... RETURNING (commit, then session.refresh())
+BEFORE = {
+    "POST /api/v1/participant": 3,
+    "POST /api/v1/ballot/{id}, first today": 5,
+    "POST /api/v1/ballot/{id}": 2,
+    "POST /api/v1/lottery": 2,
+    "POST /api/v1/lottery/close": 5,
+}
+
+_SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) statement')
+
+
+async def _has_lottery(target_date):
+    async with db.session_scope() as session:
+        found = (await session.execute(select(Lottery.lottery_id).where(Lottery.lottery_date == target_date))).first()
+    await db.dispose()
+    return found is not None
+
+
+def _open_yesterdays_lottery(client, user_id):
+    """The draw closes yesterday's lottery: creates it with one ballot of user_id, not counted."""
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    response = client.post("/api/v1/lottery", json={"target_date": yesterday})
+    if response.status_code < 400:
+        response = client.post("/api/v1/ballot", json={
+            "user_id": user_id, "lottery_id": response.json()["lottery_id"], "expiry_date": yesterday
+        })
+    if response.status_code >= 400:
+        raise SystemExit(f"Could not open yesterday's lottery: {response.status_code}: {response.text}")
+
+
+def query_count_benchmark(target_date):
+    """
+    Sends the write requests of a day in-process (participant, first and later ballots,
+    lottery creation, the draw) and reports the statements each ran, as counted by the
+    request's QueryStats and returned in its Server-Timing header, next to the counts
+    from before writes returned their rows. Writes to DATABASE_URL and, like the nightly
+    draw, closes yesterday's lottery, which it creates with one ballot beforehand: use a
+    scratch database without a lottery for today or yesterday.
+
+    Args:
+        target_date (date): Date of the lottery created by POST /api/v1/lottery; must not have one yet.
+
+    Returns:
+        None: Prints one line per request.
+    """
+    for lottery_date in (date.today(), date.today() - timedelta(days=1), target_date):
+        if asyncio.run(_has_lottery(lottery_date)):
+            raise SystemExit(f"A lottery already exists for {lottery_date}; use a scratch database.")
+
+    values = {"target_date": target_date.isoformat()}
+    print(f"{'request':40s} {'status':>6s} {'statements':>17s} {'db time':>10s}")
+    with TestClient(backend_server) as client:
+        for label, method, path, body in SCENARIOS:
+            if body is not None:
+                body = {key: value.format(**values) for key, value in body.items()}
+            if label == "POST /api/v1/lottery/close":
+                _open_yesterdays_lottery(client, values["user_id"])
+            response = client.request(method, path.format(**values), json=body)
+            if response.status_code >= 400:
+                raise SystemExit(f"{label} failed with {response.status_code}: {response.text}")
+            if label == "POST /api/v1/participant":
+                values["user_id"] = response.json()["user_id"]
+            timing = _SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+            if timing is None:
+                raise SystemExit(f"{label} returned no db Server-Timing metric")
+            milliseconds, statements = float(timing.group(1)), int(timing.group(2))
+            print(f"{label:40s} {response.status_code:6d} {BEFORE[label]:8d} -> {statements:5d} {milliseconds:8.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Count the database statements each write endpoint runs, before and after RETURNING writes."
+    )
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=date(2999, 12, 30),
+        help="Date of the lottery created by POST /api/v1/lottery, without a lottery yet. Default is 2999-12-30."
+    )
+
+    args = parser.parse_args()
+    query_count_benchmark(args.date)
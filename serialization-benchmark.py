@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+from typing import List
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.apis.serialization import json_bytes
+from app.models.ballot import Ballot
+from app.schemas.ballots import BallotResponse
+from app.schemas.rows import row_mapper
+
+
+def _best_of(repeat, fn):
+    best, body = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+
+def serialization_benchmark(rows, repeat):
+    """
+    Measures the per-row cost of turning a list of ORM ballots into a JSON response body,
+    the way list endpoints used to (model_validate per row, then FastAPI's response_model
+    validation and encoding) and the way they do now (row_mapper dicts encoded by orjson).
+    No database is needed: the ballots are built in memory.
+
+    Args:
+        rows (int): Number of ballots in the list.
+        repeat (int): Runs per path; the best one is reported.
+
+    Returns:
+        None: Prints one line per path and whether both bodies are byte-identical.
+    """
+    ballots = [
+        Ballot(ballot_id=i, user_id=i % 500, lottery_id=1, ballot_number=1_000_000_000 + i, expiry_date=date(2025, 5, 15))
+        for i in range(rows)
+    ]
+    response_field = create_model_field(name="Response_list_ballots", type_=List[BallotResponse])
+    to_row = row_mapper(BallotResponse)
+
+    def validated():
+        items = [BallotResponse.model_validate(ballot) for ballot in ballots]
+        content = asyncio.run(serialize_response(field=response_field, response_content=items))
+        # Same settings as fastapi.responses.JSONResponse.render
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    def fast_path():
+        return json_bytes([to_row(ballot) for ballot in ballots])
+
+    bodies = []
+    for label, fn in (("model_validate + response_model", validated), ("row_mapper + orjson", fast_path)):
+        elapsed, body = _best_of(repeat, fn)
+        bodies.append(body)
+        print(f"{label}: {rows} rows in {elapsed * 1000:.1f}ms -> {elapsed / rows * 1e6:.2f}us per row")
+    print(f"identical JSON: {bodies[0] == bodies[1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the per-row cost of the validated and the fast JSON serialization of list responses."
+    )
+    parser.add_argument(
+        "-n", "--rows",
+        type=int,
+        default=100_000,
+        help="Number of rows in the serialized list. Default is 100000."
+    )
+    parser.add_argument(
+        "-r", "--repeat",
+        type=int,
+        default=3,
+        help="Runs per path, the best one is reported. Default is 3."
+    )
+
+    args = parser.parse_args()
+    serialization_benchmark(args.rows, args.repeat)